@@ -0,0 +1,270 @@
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncGenerator, Callable, Iterable, Sequence
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
+from types import TracebackType
+from typing import NamedTuple, Self, override
+
+import aiohttp
+
+from .canonical import CanonicalRules
+from .crawl import (
+    AsyncCrawler,
+    PageSink,
+    ParseExecutor,
+    make_executor,
+)
+from .frontier import CrawlOrder
+from .pagestore import PageStore
+from .retry import RetryPolicy
+from .scheduler import HostPolicy, HostScheduler, RequestSlot
+from .stats import CrawlStats, trace_config
+from .transport import TransportConfig
+from .visited import VisitedMode
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SITE_CONCURRENCY = 4
+
+
+class FairLimiter:
+    """Caps concurrent requests across sites, sharing free slots round-robin.
+
+    While requests wait, each freed slot goes to the next site in turn
+    rather than to the longest-waiting request, so a site with many queued
+    requests cannot starve the others: every site with work gets an equal
+    share of the budget, and a site that needs less leaves the rest to the
+    others.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit: int = limit
+        self.active: int = 0
+        # sites in turn order; a site moves to the back once it is served
+        self._waiting: dict[str, deque[asyncio.Future[None]]] = {}
+
+    @asynccontextmanager
+    async def slot(self, site: str) -> AsyncGenerator[None]:
+        """Wait for a free request slot for site, and release it afterwards."""
+        if self.active < self.limit and not self._waiting:
+            self.active += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiting.setdefault(site, deque()).append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # the slot was handed over just before the cancel
+                    self._release()
+                else:
+                    self._forget(site, waiter)
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        # hand the slot straight to the next site in turn, if any is waiting
+        if not self._waiting:
+            self.active -= 1
+            return
+        site = next(iter(self._waiting))
+        waiters = self._waiting.pop(site)
+        waiters.popleft().set_result(None)
+        if waiters:
+            self._waiting[site] = waiters
+
+    def _forget(self, site: str, waiter: asyncio.Future[None]) -> None:
+        waiters = self._waiting[site]
+        waiters.remove(waiter)
+        if not waiters:
+            del self._waiting[site]
+
+
+class SiteResult(NamedTuple):
+    base_url: str
+    pages: PageStore
+    error: str | None = None
+
+
+class BatchCrawler(AsyncCrawler):
+    """Crawler for one site of a batch.
+
+    The HTTP session, parse pool and host scheduler belong to the batch and
+    are shared by every site; each fetch also takes a slot from the batch's
+    FairLimiter once its host is ready to be requested, so the sites share
+    one global concurrency budget that hosts waiting out their limits or a
+    ``Retry-After`` do not use up.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        site_concurrency: int,
+        max_pages: int,
+        limiter: FairLimiter,
+        session: aiohttp.ClientSession,
+        executor: Executor | None,
+        scheduler: HostScheduler,
+        sinks: Sequence[PageSink] = (),
+        store_pages: bool = True,
+        stats: CrawlStats | None = None,
+        transport: TransportConfig | None = None,
+        robots: bool = False,
+        sitemaps: bool = False,
+        order: CrawlOrder = CrawlOrder.BFS,
+        max_depth: int | None = None,
+        visited: VisitedMode = VisitedMode.FINGERPRINT,
+        canonical: CanonicalRules | None = None,
+        retry: RetryPolicy | None = None,
+    ) -> None:
+        super().__init__(
+            base_url,
+            site_concurrency,
+            max_pages,
+            sinks=sinks,
+            store_pages=store_pages,
+            stats=stats,
+            transport=transport,
+            robots=robots,
+            sitemaps=sitemaps,
+            order=order,
+            max_depth=max_depth,
+            visited=visited,
+            canonical=canonical,
+            retry=retry,
+        )
+        self.limiter: FairLimiter = limiter
+        self.scheduler: HostScheduler = scheduler
+        self.session: aiohttp.ClientSession | None = session
+        self.executor: Executor | None = executor
+
+    @override
+    async def __aenter__(self) -> Self:
+        return self
+
+    @override
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        # the session and pool are closed by the batch
+        pass
+
+    @override
+    @asynccontextmanager
+    async def _slot(self, url: str) -> AsyncGenerator[RequestSlot]:
+        # take the global slot only once the host is ready, so a site waiting
+        # out a Retry-After does not hold one while it sleeps
+        async with (
+            self.scheduler.slot(url) as slot,
+            self.limiter.slot(self.base_url),
+        ):
+            # the request is sent only now, so its latency is measured from here
+            slot.started = asyncio.get_running_loop().time()
+            yield slot
+
+
+async def crawl_batch(
+    base_urls: Iterable[str],
+    max_concurrency: int,
+    max_pages: int,
+    site_concurrency: int = DEFAULT_SITE_CONCURRENCY,
+    parse_executor: ParseExecutor = ParseExecutor.PROCESS,
+    host_policy: HostPolicy | None = None,
+    sinks: Callable[[str], Sequence[PageSink]] = lambda _: (),
+    store_pages: bool = True,
+    stats: CrawlStats | None = None,
+    transport: TransportConfig | None = None,
+    robots: bool = False,
+    sitemaps: bool = False,
+    order: CrawlOrder = CrawlOrder.BFS,
+    max_depth: int | None = None,
+    visited: VisitedMode = VisitedMode.FINGERPRINT,
+    canonical: CanonicalRules | None = None,
+    retry: RetryPolicy | None = None,
+) -> list[SiteResult]:
+    """Crawl many websites concurrently in one process.
+
+    Every site is crawled at once, with its own frontier and ``max_pages``,
+    over one shared connection pool and parse pool. At most
+    ``max_concurrency`` requests are in flight across all sites, and free
+    slots go to sites in turn, so slow sites do not hold back fast ones and
+    the batch takes about as long as its slowest site. Per-host limits are
+    shared too, so sites on the same host are polite together.
+
+    A site whose crawl fails is reported with its error; the others go on.
+
+    Args:
+        base_urls: URL to start crawling each site from.
+        max_concurrency: Maximum concurrent requests across all sites.
+        max_pages: Maximum pages to crawl per site.
+        site_concurrency: Maximum concurrent requests per site.
+        parse_executor: Where HTML extraction runs, shared by all sites.
+        host_policy: Per-host connection, pacing and backoff limits.
+        sinks: Returns the consumers for a site's pages, given its base URL,
+            such as a ReportWriter per site or one shared by all sites.
+        store_pages: Whether to also keep pages in memory.
+        stats: Collector for the whole batch.
+        transport: Connection settings for the shared session.
+        robots: Whether to skip URLs disallowed by each site's robots.txt.
+        sitemaps: Whether to seed each site from its sitemaps.
+        order: Crawl order within each site.
+        max_depth: Maximum click depth to crawl on each site.
+        visited: How each site's seen URLs are stored.
+        canonical: Rules reducing URLs to the keys pages are deduplicated
+            and reported under.
+        retry: How pages that fail with transient errors are retried.
+
+    Returns:
+        One SiteResult per base URL, in order.
+    """
+    transport = transport or TransportConfig()
+    limiter = FairLimiter(max_concurrency)
+    scheduler = HostScheduler(host_policy)
+    executor = make_executor(parse_executor)
+    trace_configs = [trace_config(stats)] if stats is not None else None
+
+    async def crawl_site(session: aiohttp.ClientSession, base_url: str) -> SiteResult:
+        crawler = BatchCrawler(
+            base_url,
+            site_concurrency,
+            max_pages,
+            limiter,
+            session,
+            executor,
+            scheduler,
+            sinks(base_url),
+            store_pages,
+            stats,
+            transport,
+            robots,
+            sitemaps,
+            order,
+            max_depth,
+            visited,
+            canonical,
+            retry,
+        )
+        async with crawler:
+            try:
+                pages = await crawler.crawl()
+            except Exception as e:
+                logger.warning("crawl of %s failed: %r", base_url, e)
+                return SiteResult(base_url, crawler.pages, repr(e))
+        return SiteResult(base_url, pages)
+
+    try:
+        async with transport.session(trace_configs) as session:
+            return await asyncio.gather(
+                *(crawl_site(session, base_url) for base_url in base_urls)
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
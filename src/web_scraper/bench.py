@@ -0,0 +1,443 @@
+"""End-to-end crawl benchmark against a local synthetic site.
+
+Run with ``python -m web_scraper.bench``. The site is served by a separate
+process on 127.0.0.1, so the crawler's CPU and memory figures are not mixed
+with the server's and no network access is needed. Each run is appended to a
+JSON lines results file together with the package version and git commit,
+and compared with the previous run of the same configuration.
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import multiprocessing
+import platform
+import queue
+import random
+import resource
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass, field, replace
+from datetime import UTC, datetime
+from enum import StrEnum
+from importlib.metadata import PackageNotFoundError, version
+from multiprocessing.queues import Queue
+from pathlib import Path
+from typing import cast
+
+import typer
+from aiohttp import web
+
+from .crawl import ParseExecutor, crawl_site_async
+from .retry import RetryPolicy
+from .scheduler import HostPolicy
+from .shard import crawl_sharded
+from .stats import CrawlStats
+from .transport import TransportConfig
+
+DEFAULT_RESULTS = Path("benchmarks", "results.jsonl")
+# what a bare aiohttp.ClientSession uses, for comparison with our defaults
+AIOHTTP_DEFAULTS = TransportConfig(
+    keepalive_timeout=15.0,
+    dns_ttl=10,
+    connect_timeout=0.0,
+    read_timeout=0.0,
+    total_timeout=300.0,
+)
+# how runs behaved before these config fields were added: the site was
+# neither bandwidth limited nor gzipped, and crawls ran in one process
+SITE_FIELDS_BEFORE: dict[str, object] = {"bandwidth": 0.0, "gzip": False}
+CRAWL_FIELDS_BEFORE: dict[str, object] = {"workers": 1}
+FILLER = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua. "
+)
+
+
+class LatencyDistribution(StrEnum):
+    FIXED = "fixed"
+    UNIFORM = "uniform"
+    EXPONENTIAL = "exponential"
+
+
+@dataclass(frozen=True)
+class SiteConfig:
+    """Shape of a synthetic site.
+
+    Page ``i`` is served at ``/p/i`` (page 0 at ``/``) and links to page
+    ``i + 1`` plus random other pages, so every page is reachable from the
+    root. ``latency`` is the mean response delay in seconds. ``bandwidth``
+    limits each response to that many bytes per second (0 is unlimited),
+    and with ``gzip`` the body is gzipped for clients that accept it, so the
+    limit applies to compressed bytes. Pages and their failures are derived
+    from ``seed``, so a config always yields the same site; only the latency
+    draws vary between requests.
+    """
+
+    pages: int = 500
+    links_per_page: int = 20
+    page_size: int = 20_000
+    latency: float = 0.02
+    latency_distribution: LatencyDistribution = LatencyDistribution.EXPONENTIAL
+    error_rate: float = 0.01
+    bandwidth: float = 0.0
+    gzip: bool = True
+    seed: int = 0
+
+
+def page_path(page: int) -> str:
+    return "/" if page == 0 else f"/p/{page}"
+
+
+def render_page(config: SiteConfig, page: int) -> str:
+    """Return the HTML of one synthetic page, padded to about page_size bytes."""
+    rng = random.Random(config.seed * 1_000_003 + page)
+    links = [(page + 1) % config.pages]
+    links += [rng.randrange(config.pages) for _ in range(config.links_per_page - 1)]
+
+    parts = [
+        f"<html><head><title>Page {page}</title></head><body>",
+        f"<h1>Page {page}</h1><main><p>Synthetic page {page}.</p></main><ul>",
+    ]
+    parts += [f"<li><a href='{page_path(link)}'>page {link}</a></li>" for link in links]
+    parts.append(f"</ul><img src='/img/{page}.png' alt='page {page}'>")
+
+    size = sum(map(len, parts))
+    while size < config.page_size:
+        parts.append(f"<p>{FILLER}</p>")
+        size += len(FILLER) + 7
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def is_error_page(config: SiteConfig, page: int) -> bool:
+    """Whether a page always answers 500; the root never does."""
+    rng = random.Random(config.seed * 1_000_003 + page + 0x5EED)
+    return page != 0 and rng.random() < config.error_rate
+
+
+def make_site(config: SiteConfig) -> web.Application:
+    """Build the aiohttp application serving a synthetic site."""
+    latency_rng = random.Random(config.seed)
+
+    def delay() -> float:
+        match config.latency_distribution:
+            case LatencyDistribution.FIXED:
+                return config.latency
+            case LatencyDistribution.UNIFORM:
+                return latency_rng.uniform(0, 2 * config.latency)
+            case LatencyDistribution.EXPONENTIAL:
+                return latency_rng.expovariate(1 / config.latency)
+
+    async def handler(request: web.Request) -> web.Response:
+        path = request.path
+        if path == "/":
+            page = 0
+        elif path.startswith("/p/") and path[3:].isdigit():
+            page = int(path[3:])
+        else:
+            raise web.HTTPNotFound()
+        if page >= config.pages:
+            raise web.HTTPNotFound()
+
+        if config.latency > 0:
+            await asyncio.sleep(delay())
+        if is_error_page(config, page):
+            raise web.HTTPInternalServerError()
+
+        body = render_page(config, page).encode()
+        headers: dict[str, str] = {}
+        if config.gzip and "gzip" in request.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        if config.bandwidth > 0:
+            await asyncio.sleep(len(body) / config.bandwidth)
+        return web.Response(
+            body=body, content_type="text/html", charset="utf-8", headers=headers
+        )
+
+    app = web.Application()
+    _ = app.router.add_get("/{tail:.*}", handler)
+    return app
+
+
+def _serve(config: SiteConfig, urls: Queue[str]) -> None:
+    async def run() -> None:
+        runner = web.AppRunner(make_site(config), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = cast(tuple[str, int], runner.addresses[0])[:2]
+        urls.put(f"http://{host}:{port}")
+        _ = await asyncio.Event().wait()
+
+    asyncio.run(run())
+
+
+class SiteServer:
+    """Serves a synthetic site from a child process for the duration of a block."""
+
+    def __init__(self, config: SiteConfig) -> None:
+        self.config: SiteConfig = config
+        self.url: str = ""
+        self._urls: Queue[str] = multiprocessing.Queue()
+        self._process: multiprocessing.Process = multiprocessing.Process(
+            target=_serve, args=(config, self._urls), daemon=True
+        )
+
+    def __enter__(self) -> str:
+        self._process.start()
+        try:
+            self.url = self._urls.get(timeout=30)
+        except queue.Empty:
+            self._process.kill()
+            raise RuntimeError("synthetic site server failed to start") from None
+        return self.url
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._process.kill()
+        self._process.join()
+
+
+@dataclass(frozen=True)
+class CrawlConfig:
+    max_concurrency: int = 32
+    parse_executor: ParseExecutor = ParseExecutor.PROCESS
+    per_host_connections: int = 32
+    workers: int = 1
+    transport: TransportConfig = field(default_factory=TransportConfig)
+
+
+@dataclass(frozen=True)
+class BenchResult:
+    pages: int
+    failures: int
+    seconds: float
+    pages_per_second: float
+    p50_latency: float
+    p99_latency: float
+    fetch_cpu_seconds: float
+    parse_cpu_seconds: float
+    peak_rss_mb: float
+
+
+def run_benchmark(site: SiteConfig, crawl: CrawlConfig) -> BenchResult:
+    """Serve a synthetic site, crawl all of it and measure the crawl.
+
+    Fetch CPU is the crawler's CPU time minus extraction; it covers the HTTP
+    client, scheduling and the event loop. With ``workers`` above 1 the crawl
+    is sharded and the CPU time and peak RSS of the shard processes are
+    included; otherwise they are those of this process alone and exclude
+    process pool workers.
+
+    Args:
+        site: Synthetic site to serve.
+        crawl: Crawler settings.
+
+    Returns:
+        Measurements of the crawl.
+    """
+    stats = CrawlStats()
+    policy = HostPolicy(
+        max_connections=crawl.per_host_connections,
+        initial_connections=crawl.per_host_connections,
+    )
+    # error pages always fail, so retrying them would only add idle time
+    retry = RetryPolicy(max_retries=0)
+    with SiteServer(site) as base_url:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        start = time.perf_counter()
+        if crawl.workers > 1:
+            _ = crawl_sharded(
+                base_url,
+                crawl.workers,
+                crawl.max_concurrency,
+                site.pages,
+                policy,
+                store_pages=False,
+                stats=stats,
+                transport=crawl.transport,
+                retry=retry,
+            )
+        else:
+            _ = asyncio.run(
+                crawl_site_async(
+                    base_url,
+                    crawl.max_concurrency,
+                    site.pages,
+                    crawl.parse_executor,
+                    policy,
+                    store_pages=False,
+                    stats=stats,
+                    transport=crawl.transport,
+                    retry=retry,
+                )
+            )
+        seconds = time.perf_counter() - start
+        end_usage = resource.getrusage(resource.RUSAGE_SELF)
+        end_child_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    cpu = _cpu_seconds(usage, end_usage)
+    peak_rss = end_usage.ru_maxrss
+    in_process_parse = 0.0
+    if crawl.workers > 1:
+        # the site server is still running, so only shard processes are reaped
+        cpu += _cpu_seconds(child_usage, end_child_usage)
+        peak_rss = max(peak_rss, end_child_usage.ru_maxrss)
+        in_process_parse = stats.parse_cpu_seconds
+    elif crawl.parse_executor != ParseExecutor.PROCESS:
+        in_process_parse = stats.parse_cpu_seconds
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss_unit = 1 if sys.platform == "darwin" else 1024
+
+    return BenchResult(
+        pages=stats.pages,
+        failures=stats.failures,
+        seconds=seconds,
+        pages_per_second=stats.pages / seconds if seconds else 0.0,
+        p50_latency=stats.latency(0.5),
+        p99_latency=stats.latency(0.99),
+        fetch_cpu_seconds=max(cpu - in_process_parse, 0.0),
+        parse_cpu_seconds=stats.parse_cpu_seconds,
+        peak_rss_mb=peak_rss * rss_unit / 2**20,
+    )
+
+
+def _cpu_seconds(start: resource.struct_rusage, end: resource.struct_rusage) -> float:
+    return (end.ru_utime - start.ru_utime) + (end.ru_stime - start.ru_stime)
+
+
+def _package_version() -> str | None:
+    try:
+        return version("web-scraper")
+    except PackageNotFoundError:
+        return None
+
+
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def save_result(
+    path: Path, site: SiteConfig, crawl: CrawlConfig, result: BenchResult
+) -> dict[str, object] | None:
+    """Append a result to the results file.
+
+    Records written before a config field existed are compared with the
+    value that field's behaviour had before it was added, where there was
+    one, such as an uncompressed site for ``gzip``; a record missing any
+    other field matches no current config.
+
+    Returns:
+        The previous record with the same site and crawl config, if any.
+    """
+    record: dict[str, object] = {
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "version": _package_version(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "site": asdict(site),
+        "crawl": asdict(crawl),
+        "result": asdict(result),
+    }
+    previous = None
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                old = cast(dict[str, object], json.loads(line))
+                old_site = _backfill(old["site"], SITE_FIELDS_BEFORE)
+                old_crawl = _backfill(old["crawl"], CRAWL_FIELDS_BEFORE)
+                if old_site == record["site"] and old_crawl == record["crawl"]:
+                    previous = old
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        _ = f.write(json.dumps(record) + "\n")
+    return previous
+
+
+def _backfill(config: object, before: dict[str, object]) -> dict[str, object]:
+    # fields still missing after this leave the record unequal to any config
+    return {**before, **cast(dict[str, object], config)}
+
+
+app = typer.Typer()
+
+
+@app.command()
+def bench(
+    pages: int = SiteConfig.pages,
+    links_per_page: int = SiteConfig.links_per_page,
+    page_size: int = SiteConfig.page_size,
+    latency: float = SiteConfig.latency,
+    latency_distribution: LatencyDistribution = SiteConfig.latency_distribution,
+    error_rate: float = SiteConfig.error_rate,
+    bandwidth: float = SiteConfig.bandwidth,
+    gzip: bool = SiteConfig.gzip,
+    seed: int = SiteConfig.seed,
+    max_concurrency: int = CrawlConfig.max_concurrency,
+    parse_executor: ParseExecutor = CrawlConfig.parse_executor,
+    per_host_connections: int = CrawlConfig.per_host_connections,
+    workers: int = CrawlConfig.workers,
+    compression: bool = TransportConfig.compression,
+    aiohttp_defaults: bool = False,
+    results: Path = DEFAULT_RESULTS,
+    save: bool = True,
+):
+    logging.basicConfig(level=logging.ERROR)
+    site = SiteConfig(
+        pages,
+        links_per_page,
+        page_size,
+        latency,
+        latency_distribution,
+        error_rate,
+        bandwidth,
+        gzip,
+        seed,
+    )
+    transport = AIOHTTP_DEFAULTS if aiohttp_defaults else TransportConfig()
+    crawl = CrawlConfig(
+        max_concurrency,
+        parse_executor,
+        per_host_connections,
+        workers,
+        replace(transport, compression=compression),
+    )
+    result = run_benchmark(site, crawl)
+
+    print(f"pages:        {result.pages} ok, {result.failures} failed")
+    print(f"throughput:   {result.pages_per_second:.1f} pages/s")
+    print(
+        f"latency:      p50 {result.p50_latency * 1000:.1f} ms, "
+        + f"p99 {result.p99_latency * 1000:.1f} ms"
+    )
+    print(
+        f"cpu:          fetch {result.fetch_cpu_seconds:.2f}s, "
+        + f"parse {result.parse_cpu_seconds:.2f}s"
+    )
+    print(f"peak rss:     {result.peak_rss_mb:.1f} MB")
+
+    if not save:
+        return
+    previous = save_result(results, site, crawl, result)
+    if previous is not None:
+        old = cast(dict[str, float], previous["result"])["pages_per_second"]
+        change = (result.pages_per_second - old) / old if old else 0.0
+        print(f"vs {previous['commit']}: {old:.1f} pages/s ({change:+.1%})")
+
+
+if __name__ == "__main__":
+    app()
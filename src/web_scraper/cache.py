@@ -0,0 +1,161 @@
+import json
+import logging
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from types import TracebackType
+from typing import NamedTuple, Self, cast
+
+from .html_parse import PageData
+
+logger = logging.getLogger(__name__)
+
+COMMIT_EVERY = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL,
+    page_data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+)
+"""
+
+
+class CachedPage(NamedTuple):
+    etag: str | None
+    last_modified: str | None
+    page_data: PageData
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Return the validator headers for a conditional GET."""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Persistent SQLite cache of response bodies, validators and PageData.
+
+    Writes are committed in batches of ``COMMIT_EVERY`` and on close, so the
+    cache adds little overhead to a crawl.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path: Path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db: sqlite3.Connection = sqlite3.connect(self.path)
+        _ = self.db.execute("PRAGMA journal_mode=WAL")
+        _ = self.db.execute(_SCHEMA)
+        self.hits: int = 0
+        self.misses: int = 0
+        self._pending: int = 0
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, url: str) -> CachedPage | None:
+        """Look up the cached validators and PageData for a normalized URL.
+
+        Args:
+            url: Normalized URL used as the cache key.
+
+        Returns:
+            CachedPage, or None if the URL has not been cached.
+        """
+        row = cast(
+            tuple[str | None, str | None, str] | None,
+            self.db.execute(
+                "SELECT etag, last_modified, page_data FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone(),
+        )
+        if row is None:
+            return None
+
+        etag, last_modified, page_data = row
+        return CachedPage(etag, last_modified, cast(PageData, json.loads(page_data)))
+
+    def body(self, url: str) -> str | None:
+        """Look up the cached response body for a normalized URL.
+
+        Args:
+            url: Normalized URL used as the cache key.
+
+        Returns:
+            Decoded body, or None if the URL has not been cached.
+        """
+        row = cast(
+            tuple[bytes] | None,
+            self.db.execute(
+                "SELECT body FROM responses WHERE url = ?", (url,)
+            ).fetchone(),
+        )
+        if row is None:
+            return None
+        return zlib.decompress(row[0]).decode()
+
+    def put(
+        self,
+        url: str,
+        body: str,
+        page_data: PageData,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """Store a freshly fetched page.
+
+        Args:
+            url: Normalized URL used as the cache key.
+            body: Decoded response body.
+            page_data: Data extracted from the body.
+            etag: ``ETag`` response header, if any.
+            last_modified: ``Last-Modified`` response header, if any.
+        """
+        _ = self.db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                url,
+                etag,
+                last_modified,
+                zlib.compress(body.encode()),
+                json.dumps(page_data),
+                time.time(),
+            ),
+        )
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self.commit()
+
+    def commit(self) -> None:
+        self.db.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.commit()
+        self.db.close()
+        logger.info(
+            "cache: %d hits, %d misses (%.0f%% hit rate)",
+            self.hits,
+            self.misses,
+            self.hit_rate * 100,
+        )
@@ -0,0 +1,176 @@
+import fnmatch
+import re
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit
+
+DEFAULT_CACHE_SIZE = 65536
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# hosts the fast path may take as they are: lowercase, no port or userinfo
+_SIMPLE_HOST = re.compile(r"[a-z0-9.-]+")
+
+
+@dataclass(frozen=True)
+class CanonicalRules:
+    """How URLs are reduced to the keys used for deduplication and reports.
+
+    The defaults drop the scheme, port, userinfo, query string, fragment,
+    leading ``www.`` and trailing slashes, and lowercase the host, so
+    ``https://www.Example.com:8080/path/?q=1#top`` becomes
+    ``example.com/path``.
+
+    With ``keep_query`` the query string is kept, with its parameters sorted,
+    less any matching a ``strip_params`` glob such as ``utm_*``; if
+    ``keep_params`` is set, only parameters matching one of its globs are
+    kept. ``keep_port`` keeps ports other than the scheme's default.
+    ``respect_canonical`` makes the crawler treat a page whose
+    ``rel=canonical`` names another URL as a duplicate of that URL.
+    """
+
+    keep_scheme: bool = False
+    keep_port: bool = False
+    lowercase_host: bool = True
+    strip_www: bool = True
+    strip_trailing_slash: bool = True
+    keep_query: bool = False
+    keep_params: tuple[str, ...] | None = None
+    strip_params: tuple[str, ...] = ("utm_*", "gclid", "fbclid")
+    keep_fragment: bool = False
+    respect_canonical: bool = False
+
+
+class Canonicalizer:
+    """Applies CanonicalRules, memoizing results in bounded LRU caches.
+
+    Crawls see the same navigation links on every page, so most lookups are
+    cache hits. On a miss, http(s) URLs with a plain lowercase host take a
+    fast path that slices the path out directly and reuses the host's
+    normalized form, falling back to ``urlsplit`` for anything else.
+    """
+
+    def __init__(
+        self,
+        rules: CanonicalRules | None = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        self.rules: CanonicalRules = rules or CanonicalRules()
+        self._cached: Callable[[str], str] = lru_cache(maxsize=cache_size)(
+            self._normalize
+        )
+        # hosts seen by the fast path, bounded like the URLs themselves
+        self._host: Callable[[str], str] = lru_cache(maxsize=cache_size)(
+            self._strip_www
+        )
+
+    def normalize(self, url: str) -> str:
+        """Return the canonical key of an absolute URL.
+
+        Raises:
+            ValueError: If url is empty.
+        """
+        if not url:
+            raise ValueError("url cannot be empty")
+        return self._cached(url)
+
+    def normalize_all(self, urls: Iterable[str]) -> list[str]:
+        """Normalize a page's links in one call, in order."""
+        normalize = self._cached
+        return [normalize(url) for url in urls if url]
+
+    def resolve_all(self, page_url: str, hrefs: Iterable[str]) -> list[str]:
+        """Resolve a page's raw href values against its URL, in order.
+
+        Each distinct href is joined once per page, since navigation
+        markup tends to repeat the same links.
+        """
+        resolved: dict[str, str] = {}
+        urls: list[str] = []
+        for href in hrefs:
+            url = resolved.get(href)
+            if url is None:
+                url = resolved[href] = resolve_url(page_url, href)
+            urls.append(url)
+        return urls
+
+    def _normalize(self, url: str) -> str:
+        rules = self.rules
+        if not rules.keep_scheme and not rules.keep_port:
+            scheme, sep, rest = url.partition("://")
+            if (
+                sep
+                and scheme in DEFAULT_PORTS
+                and url.isprintable()
+                and not url.endswith(" ")
+            ):
+                netloc, slash, tail = rest.partition("/")
+                if _SIMPLE_HOST.fullmatch(netloc):
+                    end = len(tail)
+                    for mark in "?#":
+                        if (i := tail.find(mark, 0, end)) >= 0:
+                            end = i
+                    if end == len(tail) or not (
+                        rules.keep_query or rules.keep_fragment
+                    ):
+                        return self._host(netloc) + self._path(slash + tail[:end])
+
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+        if not rules.lowercase_host:
+            host = parts.netloc.rpartition("@")[2]
+            host = host.rsplit(":", 1)[0] if parts.port is not None else host
+        key = self._strip_www(host)
+        if rules.keep_port and parts.port not in (
+            None,
+            DEFAULT_PORTS.get(parts.scheme),
+        ):
+            key += f":{parts.port}"
+        if rules.keep_scheme:
+            key = f"{parts.scheme}://{key}"
+        path = self._path(parts.path)
+        # schemeless input such as "www.example.com/path" is all path
+        key += path if host else self._strip_www(path)
+        if rules.keep_query and parts.query:
+            query = self._query(parts.query)
+            if query:
+                key += "?" + query
+        if rules.keep_fragment and parts.fragment:
+            key += "#" + parts.fragment
+        return key
+
+    def _strip_www(self, host: str) -> str:
+        while self.rules.strip_www and host.startswith("www."):
+            host = host[4:]
+        return host
+
+    def _path(self, path: str) -> str:
+        return path.rstrip("/") if self.rules.strip_trailing_slash else path
+
+    def _query(self, query: str) -> str:
+        params = [
+            (name, value)
+            for name, value in parse_qsl(query, keep_blank_values=True)
+            if self._keeps(name)
+        ]
+        return urlencode(sorted(params))
+
+    def _keeps(self, name: str) -> bool:
+        rules = self.rules
+        if rules.keep_params is not None and not any(
+            fnmatch.fnmatchcase(name, pattern) for pattern in rules.keep_params
+        ):
+            return False
+        return not any(
+            fnmatch.fnmatchcase(name, pattern) for pattern in rules.strip_params
+        )
+
+
+def resolve_url(base_url: str, url: str) -> str:
+    """Resolve an href against the URL of the page it appears on."""
+    # handle common malformed url edge case
+    if url.startswith("www."):
+        url = "https://" + url
+
+    # urljoin will not join absolute urls
+    return urljoin(base_url, url)
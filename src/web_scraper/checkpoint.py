@@ -0,0 +1,188 @@
+import json
+import logging
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import NamedTuple, Self, TextIO, cast
+
+from .html_parse import PageData, normalize_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+# reason given to failures journaled before reasons were recorded
+UNKNOWN_FAILURE = "unknown"
+
+
+class CheckpointState(NamedTuple):
+    pages: dict[str, PageData]
+    # pages that could not be crawled, with the reason and whether the URL
+    # is broken, as FailureSink.write_failure takes them
+    failed: dict[str, tuple[str, bool]]
+    # pages completed without data of their own, such as duplicates
+    skipped: set[str]
+    # queued URLs not yet completed, with their click depth
+    pending: list[tuple[str, int]]
+
+
+class Checkpoint:
+    """Append-only journal of crawl progress for resuming interrupted crawls.
+
+    Each line is a JSON record: ``{"q": url, "d": depth}`` when a URL enters
+    the frontier at a click depth, and when a page completes either
+    ``{"p": normalized, "d": page_data}``, ``{"p": normalized, "e": reason,
+    "b": broken}`` if it failed, or ``{"p": normalized, "s": true}`` if it
+    was skipped as a duplicate of another page. Every record is written
+    exactly once, so the cost of checkpointing grows with the crawl rather
+    than with the number of checkpoints taken. Buffered writes are flushed at
+    most every ``flush_interval`` seconds; a crash loses at most that window,
+    and a torn final line is ignored on resume and cut from the journal
+    before new records are appended.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        resume: bool = False,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        self.path: Path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval: float = flush_interval
+        self.restored: CheckpointState = CheckpointState({}, {}, set(), [])
+        if resume and self.path.exists():
+            self.restored = load_checkpoint(self.path)
+            _truncate_torn_line(self.path)
+
+        self.file: TextIO = open(self.path, "a" if resume else "w", encoding="utf-8")
+        self.records: int = 0
+        self.bytes_written: int = 0
+        self.write_seconds: float = 0.0
+        self._last_flush: float = time.monotonic()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def record_queued(self, urls: list[str], depth: int = 0) -> None:
+        """Journal URLs newly admitted to the frontier at a click depth."""
+        for url in urls:
+            self._write({"q": url, "d": depth})
+
+    def record_page(self, normalized: str, data: PageData) -> None:
+        """Journal a completed page."""
+        self._write({"p": normalized, "d": data})
+
+    def record_failure(self, normalized: str, reason: str, broken: bool = True) -> None:
+        """Journal a page that could not be crawled, and why."""
+        self._write({"p": normalized, "e": reason, "b": broken})
+
+    def record_skipped(self, normalized: str) -> None:
+        """Journal a page completed without data, such as a duplicate."""
+        self._write({"p": normalized, "s": True})
+
+    def _write(self, record: dict[str, object]) -> None:
+        start = time.perf_counter()
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        self.bytes_written += self.file.write(line)
+        self.records += 1
+        if start - self._last_flush >= self.flush_interval:
+            self.flush()
+        self.write_seconds += time.perf_counter() - start
+
+    def flush(self) -> None:
+        self.file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        if self.file.closed:
+            return
+        start = time.perf_counter()
+        self.file.close()
+        self.write_seconds += time.perf_counter() - start
+        logger.info(
+            "checkpoint: %d records, %d bytes, %.3fs writing",
+            self.records,
+            self.bytes_written,
+            self.write_seconds,
+        )
+
+
+def load_checkpoint(path: str | Path) -> CheckpointState:
+    """Replay a checkpoint journal.
+
+    Args:
+        path: Journal written by ``Checkpoint``.
+
+    Returns:
+        CheckpointState with the completed, failed and skipped pages and the
+        queued URLs that had not completed, with their depth, in the order
+        they were queued. URLs journaled without a depth are restored at
+        depth 0, and pages journaled with null data, as older journals
+        record failures, are restored as failed.
+    """
+    queued: list[tuple[str, int]] = []
+    pages: dict[str, PageData] = {}
+    failed: dict[str, tuple[str, bool]] = {}
+    skipped: set[str] = set()
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                # a torn final line, cut off by a crash mid-write
+                logger.warning("skipping torn checkpoint record in %s", path)
+                continue
+            try:
+                record = cast(dict[str, object], json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning("skipping torn checkpoint record in %s", path)
+                continue
+
+            if "q" in record:
+                queued.append((cast(str, record["q"]), cast(int, record.get("d", 0))))
+            elif "p" in record:
+                url = cast(str, record["p"])
+                data = cast(PageData | None, record.get("d"))
+                if "s" in record:
+                    skipped.add(url)
+                elif data is None:
+                    failed[url] = (
+                        cast(str, record.get("e", UNKNOWN_FAILURE)),
+                        cast(bool, record.get("b", True)),
+                    )
+                else:
+                    pages[url] = data
+
+    pending = [
+        (url, depth)
+        for url, depth in queued
+        if (normalized := normalize_url(url)) not in pages
+        and normalized not in failed
+        and normalized not in skipped
+    ]
+    return CheckpointState(pages, failed, skipped, pending)
+
+
+def _truncate_torn_line(path: Path) -> None:
+    # cut a final line left without its newline by a crash, so records
+    # appended on resume start on a line of their own
+    with open(path, "rb+") as f:
+        end = f.seek(0, 2)
+        offset = end
+        while offset > 0:
+            start = max(0, offset - 4096)
+            _ = f.seek(start)
+            newline = f.read(offset - start).rfind(b"\n")
+            if newline >= 0:
+                offset = start + newline + 1
+                break
+            offset = start
+        if offset < end:
+            _ = f.truncate(offset)
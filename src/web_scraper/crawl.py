@@ -1,28 +1,134 @@
 import asyncio
+import codecs
 import logging
+import time
+from collections.abc import AsyncGenerator, Callable, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import AbstractAsyncContextManager
+from enum import StrEnum
 from types import TracebackType
-from typing import Self, TypeAlias
+from typing import NamedTuple, Protocol, Self, TypeAlias, runtime_checkable
+from urllib.parse import urljoin
 
 import aiohttp
 
-from .html_parse import PageData, extract_page_data, normalize_url
+from .cache import CachedPage, ResponseCache
+from .canonical import CanonicalRules, Canonicalizer
+from .checkpoint import Checkpoint
+from .dedup import DuplicateDetector, content_digest, page_simhash
+from .frontier import CrawlOrder, Frontier, QueuedUrl
+from .html_parse import PageData, PageDataParser, extract_page_data
+from .pagestore import PageStore
+from .retry import RetryPolicy, failure_reason, is_broken, is_transient
+from .robots import MAX_ROBOTS_BYTES, RobotsRules, parse_robots, robots_url
+from .scheduler import HostPolicy, HostScheduler, HostUnavailable, RequestSlot
+from .sitemap import SitemapUrl, read_sitemap
+from .stats import CrawlStats, timed_extract, trace_config
+from .transport import TransportConfig
+from .visited import VisitedMode
 
 logger = logging.getLogger(__name__)
 
-Pages: TypeAlias = dict[str, PageData | None]
+USER_AGENT = "BootCrawler/1.0"
+# bounds the sitemap indexes followed on a site
+MAX_SITEMAPS = 1000
+DEFAULT_PAGE_BUFFER = 16
+
+Pages: TypeAlias = PageStore
+
+
+class ParseExecutor(StrEnum):
+    INLINE = "inline"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+def make_executor(parse_executor: ParseExecutor) -> Executor | None:
+    """Create the pool pages are parsed in, or None to parse on the loop."""
+    match parse_executor:
+        case ParseExecutor.THREAD:
+            return ThreadPoolExecutor()
+        case ParseExecutor.PROCESS:
+            return ProcessPoolExecutor()
+        case ParseExecutor.INLINE:
+            return None
+
+
+class PageSink(Protocol):
+    def write(self, url: str, page: PageData) -> None: ...
+
+
+@runtime_checkable
+class FailureSink(Protocol):
+    """A PageSink that also records pages that could not be crawled.
+
+    ``broken`` is False when the server served the URL but the body could
+    not be crawled, such as a page that is not HTML.
+    """
+
+    def write_failure(self, url: str, reason: str, broken: bool = True) -> None: ...
+
+
+class Fetched(NamedTuple):
+    status: int
+    html: str
+    etag: str | None = None
+    last_modified: str | None = None
+    page: PageData | None = None
 
 
 class AsyncCrawler:
-    def __init__(self, base_url: str, max_concurrency: int, max_pages: int) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        max_concurrency: int,
+        max_pages: int,
+        parse_executor: ParseExecutor = ParseExecutor.PROCESS,
+        host_policy: HostPolicy | None = None,
+        cache: ResponseCache | None = None,
+        checkpoint: Checkpoint | None = None,
+        sinks: Sequence[PageSink] = (),
+        store_pages: bool = True,
+        stats: CrawlStats | None = None,
+        transport: TransportConfig | None = None,
+        robots: bool = False,
+        sitemaps: bool = False,
+        order: CrawlOrder = CrawlOrder.BFS,
+        max_depth: int | None = None,
+        visited: VisitedMode = VisitedMode.FINGERPRINT,
+        canonical: CanonicalRules | None = None,
+        retry: RetryPolicy | None = None,
+        duplicates: DuplicateDetector | None = None,
+    ) -> None:
         self.base_url: str = base_url
-        self.pages: Pages = {}
+        self.pages: Pages = PageStore()
         self.max_pages: int = max_pages
-        self.lock: asyncio.Lock = asyncio.Lock()
+        self.canonicalizer: Canonicalizer = Canonicalizer(canonical)
+        self.frontier: Frontier = Frontier(
+            base_url, max_pages, order, max_depth, visited, self.canonicalizer
+        )
+        self.scheduler: HostScheduler = HostScheduler(host_policy)
+        self.cache: ResponseCache | None = cache
+        self.checkpoint: Checkpoint | None = checkpoint
+        self.sinks: Sequence[PageSink] = sinks
+        self.store_pages: bool = store_pages
+        self.stats: CrawlStats | None = stats
+        self.transport: TransportConfig = transport or TransportConfig()
+        self.retry: RetryPolicy = retry or RetryPolicy()
+        self._retries: set[asyncio.Task[None]] = set()
+        self.duplicates: DuplicateDetector | None = duplicates
+        self._results: asyncio.Queue[tuple[str, PageData]] | None = None
+        self.robots: bool = robots
+        self.sitemaps: bool = sitemaps
         self.max_concurrency: int = max_concurrency
+        self.parse_executor: ParseExecutor = parse_executor
         self.session: aiohttp.ClientSession | None = None
+        self.executor: Executor | None = None
 
     async def __aenter__(self) -> Self:
-        self.session = aiohttp.ClientSession()
+        trace_configs = [trace_config(self.stats)] if self.stats is not None else None
+        self.session = self.transport.session(trace_configs)
+        self.executor = make_executor(self.parse_executor)
         return self
 
     async def __aexit__(
@@ -33,98 +139,583 @@ class AsyncCrawler:
     ) -> None:
         assert self.session is not None
         await self.session.close()
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
 
-    async def _add_page_visit(self, normalized_url: str) -> bool:
-        async with self.lock:
-            if normalized_url in self.pages:
-                return True
+    def _slot(self, url: str) -> AbstractAsyncContextManager[RequestSlot]:
+        """Wait for permission to fetch a page from its host."""
+        return self.scheduler.slot(url)
 
-            self.pages[normalized_url] = None
-            return False
-
-    async def _get_html(self, url: str) -> str:
+    async def _fetch(self, url: str, cached: CachedPage | None = None) -> Fetched:
         assert self.session is not None
-        async with self.session.get(
-            url, headers={"User-Agent": "BootCrawler/1.0"}, raise_for_status=True
-        ) as r:
-            assert "text/html" in r.headers.get("content-type", "")
-            return await r.text()
-
-    async def _crawl_page(self, current_url: str, queue: asyncio.Queue[str]) -> None:
-        async with self.lock:
-            if len(self.pages) >= self.max_pages:
-                return _clear_queue(queue)
-
-        if not current_url.startswith(self.base_url):
-            return
+        headers = {"User-Agent": USER_AGENT}
+        if cached is not None:
+            headers.update(cached.conditional_headers())
 
-        normalized = normalize_url(current_url)
-        if await self._add_page_visit(normalized):
-            return
+        requested = asyncio.get_running_loop().time()
+        async with (
+            self._slot(url) as slot,
+            self.session.get(url, headers=headers) as r,
+        ):
+            slot.observe(r.status, r.headers.get("Retry-After"))
+            if self.stats is not None:
+                self.stats.record("host_wait", slot.started - requested)
+            r.raise_for_status()
+            if r.status == 304:
+                return Fetched(r.status, "")
+
+            content_type = r.headers.get("content-type", "")
+            if "text/html" not in content_type:
+                raise ValueError(f"not an HTML page: {content_type or 'no type'}")
+
+            download_started = time.monotonic()
+            html, page = await self._read_html(r, url)
+            if self.stats is not None:
+                self.stats.record("download", time.monotonic() - download_started)
+            return Fetched(
+                r.status,
+                html,
+                r.headers.get("ETag"),
+                r.headers.get("Last-Modified"),
+                page,
+            )
+
+    async def _read_html(
+        self, r: aiohttp.ClientResponse, url: str
+    ) -> tuple[str, PageData | None]:
+        """Read a response body in chunks, stopping at the transport's size cap.
+
+        With the inline parse executor each chunk is fed to the parser as it
+        arrives, so extraction overlaps the download and the page data is
+        returned too; otherwise it is None and the page is parsed afterwards.
+
+        Raises:
+            ValueError: If the body looks binary.
+        """
+        limit = self.transport.max_body_bytes
+        try:
+            decoder = codecs.getincrementaldecoder(r.charset or "utf-8")()
+        except LookupError:
+            decoder = codecs.getincrementaldecoder("utf-8")()
+        parser = PageDataParser(url) if self.executor is None else None
+        parse_cpu = 0.0
+
+        parts: list[str] = []
+        size = 0
+        truncated = False
+        async for chunk in r.content.iter_chunked(self.transport.chunk_size):
+            if size == 0 and b"\x00" in chunk[:1024]:
+                raise ValueError("binary content served as HTML")
+            if size + len(chunk) > limit:
+                chunk = chunk[: limit - size]
+                truncated = True
+            size += len(chunk)
+            if self.stats is not None:
+                self.stats.bytes_received += len(chunk)
+
+            text = decoder.decode(chunk)
+            parts.append(text)
+            if parser is not None:
+                start = time.thread_time()
+                parser.feed(text)
+                parse_cpu += time.thread_time() - start
+            if truncated:
+                logger.warning("truncated %s at %d bytes", url, limit)
+                if self.stats is not None:
+                    self.stats.counters["truncated"] += 1
+                break
+
+        text = decoder.decode(b"", final=not truncated)
+        parts.append(text)
+        html = "".join(parts)
+        if parser is None or not html:
+            return html, None
+
+        start = time.thread_time()
+        parser.feed(text)
+        parser.close()
+        page = parser.page_data()
+        parse_cpu += time.thread_time() - start
+        if self.stats is not None:
+            self.stats.record("parse", parse_cpu)
+            self.stats.parse_cpu_seconds += parse_cpu
+        return html, page
+
+    async def _parse(self, html: str, url: str) -> PageData:
+        if self.stats is not None:
+            return await self._timed_parse(html, url, self.stats)
+        if self.executor is None:
+            return extract_page_data(html, url)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, extract_page_data, html, url)
+
+    async def _timed_parse(self, html: str, url: str, stats: CrawlStats) -> PageData:
+        start = time.monotonic()
+        if self.executor is None:
+            data, cpu_seconds = timed_extract(html, url)
+        else:
+            loop = asyncio.get_running_loop()
+            data, cpu_seconds = await loop.run_in_executor(
+                self.executor, timed_extract, html, url
+            )
+        stats.record("parse", time.monotonic() - start)
+        stats.parse_cpu_seconds += cpu_seconds
+        return data
+
+    async def _crawl_page(self, queued: QueuedUrl) -> bool:
+        """Fetch, parse and store one page.
+
+        Returns:
+            False if the page failed transiently and was scheduled for a
+            retry, True once it is finished, successfully or not.
+        """
+        current_url, normalized, _, depth, _ = queued
+        started = time.monotonic()
+        cached = self.cache.get(normalized) if self.cache is not None else None
 
         logger.info("Scraping data from %s", current_url)
         try:
-            html = await self._get_html(current_url)
+            fetched = await self._fetch(current_url, cached)
         except Exception as e:
-            logger.warning("failed to fetch %s: %s", current_url, e)
-            async with self.lock:
-                self.pages[normalized] = None
-            return
+            if self._retry_later(queued, e):
+                return False
+            reason = failure_reason(e)
+            logger.warning("failed to fetch %s: %s", current_url, reason)
+            self._fail(normalized, reason, is_broken(e))
+            return True
+
+        if self.stats is not None:
+            self.stats.record("fetch", time.monotonic() - started)
+        if (
+            fetched.status == 304
+            and self.cache is not None
+            and self.duplicates is not None
+        ):
+            # a 304 has no body, so dedup compares the unchanged cached one
+            fetched = fetched._replace(html=self.cache.body(normalized) or "")
+        if self._exact_duplicate(normalized, fetched.html):
+            # same body as a page already crawled, so same data and links
+            if self.checkpoint is not None:
+                self.checkpoint.record_skipped(normalized)
+            return True
 
-        data = extract_page_data(html, current_url)
+        if fetched.status == 304 and cached is not None:
+            data = cached.page_data
+        elif fetched.page is not None:
+            data = fetched.page
+        else:
+            try:
+                data = await self._parse(fetched.html, current_url)
+            except Exception as e:
+                reason = failure_reason(e)
+                logger.warning("failed to parse %s: %s", current_url, reason)
+                self._fail(normalized, reason, broken=False)
+                return True
 
-        async with self.lock:
-            self.pages[normalized] = data
+        if self.cache is not None:
+            if fetched.status == 304:
+                self.cache.hits += 1
+            else:
+                self.cache.misses += 1
+                self.cache.put(
+                    normalized,
+                    fetched.html,
+                    data,
+                    fetched.etag,
+                    fetched.last_modified,
+                )
+        if self.duplicates is not None and fetched.html:
+            await self._near_duplicate(normalized, fetched.html, self.duplicates)
+        canonical = self._canonical_elsewhere(normalized, data)
+        if canonical is None:
+            self._store(normalized, data)
 
         logger.info("Scraped data from %s", current_url)
         logger.debug("scraped data: %s", data)
 
-        for link in data["outgoing_links"]:
-            await queue.put(link)
+        # journal the links before the page, so a resumed crawl never has a
+        # completed page whose links were lost
+        self._enqueue(data["outgoing_links"], depth + 1)
+        if canonical is not None:
+            self._enqueue([canonical], depth)
+        if self.checkpoint is not None and canonical is None:
+            self.checkpoint.record_page(normalized, data)
+        elif self.checkpoint is not None:
+            self.checkpoint.record_skipped(normalized)
+        if self.stats is not None:
+            self.stats.pages += 1
+            self.stats.record("page", time.monotonic() - started)
+        if self._results is not None and canonical is None:
+            # blocks this worker while the consumer is behind
+            await self._results.put((normalized, data))
+        return True
+
+    def _exact_duplicate(self, normalized: str, html: str) -> bool:
+        if self.duplicates is None or not html:
+            return False
+        original = self.duplicates.exact_duplicate(normalized, content_digest(html))
+        if original is None:
+            return False
+        logger.info("%s duplicates %s", normalized, original)
+        if self.stats is not None:
+            self.stats.counters["duplicates"] += 1
+        return True
+
+    async def _near_duplicate(
+        self, normalized: str, html: str, duplicates: DuplicateDetector
+    ) -> None:
+        if self.executor is None:
+            fingerprint = page_simhash(html)
+        else:
+            loop = asyncio.get_running_loop()
+            fingerprint = await loop.run_in_executor(self.executor, page_simhash, html)
+        original = duplicates.near_duplicate(normalized, fingerprint)
+        if original is not None:
+            logger.info("%s nearly duplicates %s", normalized, original)
+            if self.stats is not None:
+                self.stats.counters["near_duplicates"] += 1
+
+    def _retry_later(self, queued: QueuedUrl, error: Exception) -> bool:
+        """Schedule a retry of a transient failure, unless retries are used up."""
+        if queued.attempt >= self.retry.max_retries or not is_transient(error):
+            return False
+
+        delay = self.retry.backoff(queued.attempt)
+        if isinstance(error, HostUnavailable):
+            delay += max(error.retry_at - asyncio.get_running_loop().time(), 0.0)
+        logger.info(
+            "retrying %s in %.1fs: %s", queued.url, delay, failure_reason(error)
+        )
+        if self.stats is not None:
+            self.stats.counters["retries"] += 1
+        task = asyncio.create_task(
+            self._requeue(queued._replace(attempt=queued.attempt + 1), delay)
+        )
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+        return True
+
+    async def _requeue(self, queued: QueuedUrl, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self.frontier.requeue(queued)
+
+    def _fail(self, normalized: str, reason: str, broken: bool) -> None:
+        self._store_failure(normalized, reason, broken)
+        if self.checkpoint is not None:
+            self.checkpoint.record_failure(normalized, reason, broken)
+        if self.stats is not None:
+            self.stats.failures += 1
+
+    def _canonical_elsewhere(self, normalized: str, data: PageData) -> str | None:
+        """Return the page's rel=canonical URL if it is respected and not the page.
+
+        Such a page is a duplicate: it is left out of the results and its
+        canonical URL is crawled in its place.
+        """
+        canonical = data.get("canonical_url")
+        if not self.canonicalizer.rules.respect_canonical or not canonical:
+            return None
+        if self.canonicalizer.normalize(canonical) == normalized:
+            return None
+        if self.stats is not None:
+            self.stats.counters["canonicalized"] += 1
+        return canonical
+
+    def _store(self, normalized: str, data: PageData | None) -> None:
+        if self.store_pages:
+            self.pages.add(normalized, data)
+        if data is not None:
+            for sink in self.sinks:
+                sink.write(normalized, data)
+
+    def _store_failure(self, normalized: str, reason: str, broken: bool) -> None:
+        self._store(normalized, None)
+        for sink in self.sinks:
+            if isinstance(sink, FailureSink):
+                sink.write_failure(normalized, reason, broken)
+
+    def _enqueue(self, urls: list[str], depth: int = 0) -> None:
+        self._record_queued(self.frontier.add_all(urls, depth), depth)
+
+    def _enqueue_sitemap(self, entries: list[SitemapUrl]) -> None:
+        # sitemap pages count as one click from the start page
+        added: list[str] = []
+        for url, priority in entries:
+            if self.frontier.full:
+                break
+            if self.frontier.add(url, 1, priority):
+                added.append(url)
+        self._record_queued(added, 1)
+
+    def _record_queued(self, added: list[str], depth: int) -> None:
+        if self.stats is not None:
+            self.stats.counters["queued"] += len(added)
+        if self.checkpoint is not None and added:
+            self.checkpoint.record_queued(added, depth)
+
+    def _restore(self) -> bool:
+        if self.checkpoint is None:
+            return False
+
+        pages, failed, skipped, pending = self.checkpoint.restored
+        if not pages and not failed and not skipped and not pending:
+            return False
+
+        # replayed to the sinks, so the report covers the whole crawl
+        for normalized, data in pages.items():
+            self.frontier.mark_seen(normalized)
+            self._store(normalized, data)
+        for normalized, (reason, broken) in failed.items():
+            self.frontier.mark_seen(normalized)
+            self._store_failure(normalized, reason, broken)
+        for normalized in skipped:
+            self.frontier.mark_seen(normalized)
+        for url, depth in pending:
+            _ = self.frontier.add(url, depth)
+        logger.info(
+            "resuming: %d pages done, %d failed, %d pending",
+            len(pages) + len(skipped),
+            len(failed),
+            len(pending),
+        )
+        return True
+
+    async def _load_robots(self) -> RobotsRules:
+        """Fetch and parse robots.txt, as RFC 9309 says to treat each outcome.
+
+        A missing robots.txt (4xx) allows everything; a server error or an
+        unreachable server disallows everything.
+        """
+        assert self.session is not None
+        url = robots_url(self.base_url)
+        try:
+            async with (
+                self.scheduler.slot(url) as slot,
+                self.session.get(url, headers={"User-Agent": USER_AGENT}) as r,
+            ):
+                slot.observe(r.status, r.headers.get("Retry-After"))
+                if 400 <= r.status < 500:
+                    return RobotsRules([])
+                r.raise_for_status()
+                body = await r.content.read(MAX_ROBOTS_BYTES)
+        except Exception as e:
+            logger.warning("robots.txt unavailable, disallowing all: %s", e)
+            return RobotsRules.disallow_all()
+
+        return parse_robots(body.decode("utf-8", "replace"), USER_AGENT)
+
+    async def _seed_from_sitemaps(self, roots: list[str]) -> None:
+        """Queue the pages listed in sitemaps, following sitemap indexes.
+
+        Sitemaps are fetched concurrently, subject to the host scheduler, and
+        each one's URLs are queued as soon as it is parsed, so workers start
+        on them while the rest are still downloading.
+        """
+        seen: set[str] = set()
+        async with asyncio.TaskGroup() as group:
+
+            def visit(urls: list[str]) -> None:
+                for url in urls:
+                    if url in seen or len(seen) >= MAX_SITEMAPS:
+                        continue
+                    if self.frontier.full:
+                        return
+                    seen.add(url)
+                    _ = group.create_task(self._read_sitemap(url, visit))
+
+            visit(roots)
+
+    async def _read_sitemap(self, url: str, visit: Callable[[list[str]], None]) -> None:
+        assert self.session is not None
+        try:
+            async with (
+                self.scheduler.slot(url) as slot,
+                self.session.get(url, headers={"User-Agent": USER_AGENT}) as r,
+            ):
+                slot.observe(r.status, r.headers.get("Retry-After"))
+                r.raise_for_status()
+                sitemap = await read_sitemap(r, self.transport.chunk_size)
+        except Exception as e:
+            logger.warning("failed to read sitemap %s: %s", url, e)
+            return
+
+        logger.info(
+            "sitemap %s: %d pages, %d sitemaps",
+            url,
+            len(sitemap.urls),
+            len(sitemap.sitemaps),
+        )
+        if self.stats is not None:
+            self.stats.counters["sitemaps"] += 1
+            self.stats.counters["sitemap_urls"] += len(sitemap.urls)
+        self._enqueue_sitemap(sitemap.urls)
+        visit(sitemap.sitemaps)
+
+    async def _worker(self) -> None:
+        queue = self.frontier.queue
+        while True:
+            queued = await self.frontier.get()
+            if self.stats is not None:
+                self.stats.record("queue_wait", time.monotonic() - queued.queued_at)
+            try:
+                _ = await self._crawl_page(queued)
+            except Exception as e:
+                logger.warning("unhandled error crawling %s: %s", queued.url, e)
+            finally:
+                queue.task_done()
 
     async def crawl(self) -> Pages:
-        queue: asyncio.Queue[str] = asyncio.Queue()
-        queue.put_nowait(self.base_url)
-
-        async def worker():
-            while True:
-                url = await queue.get()
-                try:
-                    await self._crawl_page(url, queue)
-                except Exception as e:
-                    logger.warning("unhandled error crawling %s: %s", url, e)
-                finally:
-                    queue.task_done()
-
-        workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrency)]
-        await queue.join()
-
-        if len(self.pages) >= self.max_pages:
-            print("Reached maximum number of pages to crawl.")
+        rules = None
+        if self.robots or self.sitemaps:
+            rules = await self._load_robots()
+        if self.robots:
+            self.frontier.robots = rules
+
+        restored = self._restore()
+        if not restored:
+            self._enqueue([self.base_url])
+
+        workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)
+        ]
+        try:
+            if self.sitemaps and not restored and rules is not None:
+                default = urljoin(robots_url(self.base_url), "/sitemap.xml")
+                await self._seed_from_sitemaps(rules.sitemaps or [default])
+            await self.frontier.queue.join()
+            # pages waiting to be retried are off the queue until their delay ends
+            while self._retries:
+                _ = await asyncio.wait(self._retries)
+                await self.frontier.queue.join()
+        finally:
+            # also stops a crawl that is cancelled part way
+            for task in [*workers, *self._retries]:
+                _ = task.cancel()
 
-        for w in workers:
-            _ = w.cancel()
+        if self.frontier.full:
+            print("Reached maximum number of pages to crawl.")
         return self.pages
 
+    async def iter_pages(
+        self, buffer: int = DEFAULT_PAGE_BUFFER
+    ) -> AsyncGenerator[tuple[str, PageData]]:
+        """Crawl, yielding each page's normalized URL and data once extracted.
+
+        At most ``buffer`` pages wait for the consumer. Once that many are
+        waiting, workers block before taking their next URL, so a slow
+        consumer throttles fetching instead of letting results pile up.
+        Construct the crawler with ``store_pages=False`` to keep result
+        memory constant. Sinks are still fed as pages complete.
 
-def _clear_queue(queue: asyncio.Queue[str]):
-    while not queue.empty():
-        _ = queue.get_nowait()
-        queue.task_done()
+        Leaving the loop early cancels the crawl. Wrap the iterator in
+        ``contextlib.aclosing`` to cancel it at once rather than when the
+        iterator is garbage collected.
+
+        Yields:
+            Tuples of normalized URL and PageData, in completion order.
+        """
+        results: asyncio.Queue[tuple[str, PageData]] = asyncio.Queue(buffer)
+        self._results = results
+        crawl = asyncio.create_task(self.crawl())
+        try:
+            while not crawl.done():
+                get = asyncio.create_task(results.get())
+                _ = await asyncio.wait(
+                    (get, crawl), return_when=asyncio.FIRST_COMPLETED
+                )
+                if get.done():
+                    yield get.result()
+                else:
+                    # an unfinished get has not taken a page from the queue
+                    _ = get.cancel()
+            while not results.empty():
+                yield results.get_nowait()
+            _ = crawl.result()
+        finally:
+            _ = crawl.cancel()
+            _ = await asyncio.gather(crawl, return_exceptions=True)
+            self._results = None
 
 
 async def crawl_site_async(
-    base_url: str, max_concurrency: int, max_pages: int
-) -> dict[str, PageData]:
+    base_url: str,
+    max_concurrency: int,
+    max_pages: int,
+    parse_executor: ParseExecutor = ParseExecutor.PROCESS,
+    host_policy: HostPolicy | None = None,
+    cache: ResponseCache | None = None,
+    checkpoint: Checkpoint | None = None,
+    sinks: Sequence[PageSink] = (),
+    store_pages: bool = True,
+    stats: CrawlStats | None = None,
+    transport: TransportConfig | None = None,
+    robots: bool = False,
+    sitemaps: bool = False,
+    order: CrawlOrder = CrawlOrder.BFS,
+    max_depth: int | None = None,
+    visited: VisitedMode = VisitedMode.FINGERPRINT,
+    canonical: CanonicalRules | None = None,
+    retry: RetryPolicy | None = None,
+    duplicates: DuplicateDetector | None = None,
+) -> PageStore:
     """Crawl a website asynchronously and return extracted page data.
 
     Args:
         base_url: URL to start crawling from. Only pages within this domain are crawled.
         max_concurrency: Maximum number of concurrent HTTP requests. Defaults to 4.
+        parse_executor: Where HTML extraction runs: on the event loop, in a
+            thread pool, or in a process pool spanning all cores.
+        host_policy: Per-host connection, pacing and backoff limits.
+        cache: Response cache used for conditional GETs on recrawls.
+        checkpoint: Journal to record progress to and resume from.
+        sinks: Consumers fed with each page as soon as it is extracted, such
+            as a ReportWriter.
+        store_pages: Whether to also keep pages in memory. Pass False with
+            sinks to crawl with constant result memory; the returned dict is
+            then empty.
+        stats: Collector for per-stage latency histograms and counters.
+        transport: Connection pooling, DNS cache, timeout and compression
+            settings.
+        robots: Whether to skip URLs disallowed by robots.txt.
+        sitemaps: Whether to seed the frontier with the URLs listed in the
+            sitemaps named by robots.txt, or /sitemap.xml if it names none.
+        order: Which queued URL to crawl next: shallowest, shortest, or
+            highest sitemap priority first.
+        max_depth: Maximum click depth from base_url to crawl; sitemap
+            pages count as depth 1. None means unlimited.
+        visited: How seen URLs are stored: exact strings, 64-bit
+            fingerprints, or a Bloom filter sized for max_pages.
+        canonical: Rules reducing URLs to the keys pages are deduplicated
+            and reported under.
+        retry: How pages that fail with transient errors are retried.
+        duplicates: Detector of pages with duplicate content. Exact
+            duplicates are skipped along with their links; all duplicates
+            are recorded in its clusters.
 
     Returns:
-        Dict mapping normalized URLs to their extracted PageData.
+        PageStore mapping normalized URLs to their extracted PageData; pages
+        that failed are only listed in its ``failed`` ids.
     """
-    async with AsyncCrawler(base_url, max_concurrency, max_pages) as a:
-        pages = await a.crawl()
-        return {k: v for k, v in pages.items() if v is not None}
+    async with AsyncCrawler(
+        base_url,
+        max_concurrency,
+        max_pages,
+        parse_executor,
+        host_policy,
+        cache,
+        checkpoint,
+        sinks,
+        store_pages,
+        stats,
+        transport,
+        robots,
+        sitemaps,
+        order,
+        max_depth,
+        visited,
+        canonical,
+        retry,
+        duplicates,
+    ) as a:
+        return await a.crawl()
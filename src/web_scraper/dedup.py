@@ -0,0 +1,155 @@
+import csv
+import hashlib
+import re
+from pathlib import Path
+
+DEFAULT_MAX_DISTANCE = 3
+SHINGLE_SIZE = 3
+SIMHASH_BITS = 64
+
+_INVISIBLE = re.compile(
+    r"<(script|style|template)\b.*?</\1\s*>|<!--.*?-->", re.IGNORECASE | re.DOTALL
+)
+_TAG = re.compile(r"<[^>]*>")
+_WORD = re.compile(r"\w+")
+
+# LANES[b] spreads the 8 bits of byte b into 8 lanes of 24 bits, so adding
+# spread bytes counts how often each bit was set, for up to 2**24 features
+_LANE_BITS = 24
+_LANES = [
+    sum(1 << (bit * _LANE_BITS) for bit in range(8) if byte >> bit & 1)
+    for byte in range(256)
+]
+_LANE_MASK = (1 << _LANE_BITS) - 1
+
+
+def content_digest(html: str) -> bytes:
+    """Return a 128-bit digest identifying a page body byte for byte."""
+    return hashlib.blake2b(html.encode(), digest_size=16).digest()
+
+
+def visible_words(html: str) -> list[str]:
+    """Return the lowercased words of a page's text, without its markup."""
+    text = _TAG.sub(" ", _INVISIBLE.sub(" ", html))
+    return _WORD.findall(text.lower())
+
+
+def simhash(words: list[str]) -> int:
+    """Return the 64-bit SimHash of a document's word shingles.
+
+    Each run of ``SHINGLE_SIZE`` words is hashed, and bit i of the result is
+    set if bit i is set in more than half of the distinct shingle hashes.
+    Documents that share most of their shingles get fingerprints a few bits
+    apart, so the Hamming distance between fingerprints estimates how much
+    two pages differ.
+
+    Bits are counted eight hash bytes at a time with ``_LANES``, so each
+    shingle costs eight integer additions rather than 64 bit tests.
+    """
+    shingles = {
+        " ".join(words[i : i + SHINGLE_SIZE])
+        for i in range(max(len(words) - SHINGLE_SIZE + 1, 1))
+    }
+    counts = [0] * 8
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode(), digest_size=8).digest()
+        for i, byte in enumerate(digest):
+            counts[i] += _LANES[byte]
+
+    half = len(shingles) / 2
+    fingerprint = 0
+    for i, lanes in enumerate(counts):
+        for bit in range(8):
+            if (lanes >> (bit * _LANE_BITS)) & _LANE_MASK > half:
+                fingerprint |= 1 << (i * 8 + bit)
+    return fingerprint
+
+
+def page_simhash(html: str) -> int:
+    """Return the SimHash of a page's visible text."""
+    return simhash(visible_words(html))
+
+
+class DuplicateDetector:
+    """Finds pages whose content duplicates a page crawled earlier.
+
+    An exact duplicate has the same body, byte for byte, as an earlier page;
+    the crawler skips its extraction and links. A near duplicate's SimHash is
+    within ``max_distance`` bits of an earlier page's; it is crawled as usual
+    but grouped with that page in the report. Pages are grouped with the
+    first page they were found to match, so each cluster is headed by the
+    first copy crawled.
+
+    Fingerprints are indexed in ``max_distance + 1`` bands: two fingerprints
+    within ``max_distance`` bits agree exactly on at least one band, so only
+    pages sharing a band are compared.
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE) -> None:
+        self.max_distance: int = max_distance
+        self.exact: dict[bytes, str] = {}
+        self.clusters: dict[str, list[str]] = {}
+        self._heads: dict[str, str] = {}
+        self._bands: int = max_distance + 1
+        self._band_bits: int = -(-SIMHASH_BITS // self._bands)
+        self._index: dict[tuple[int, int], list[tuple[int, str]]] = {}
+
+    def exact_duplicate(self, url: str, digest: bytes) -> str | None:
+        """Record a page's content digest.
+
+        Returns:
+            The first URL served with the same body, or None if the body is
+            new.
+        """
+        first = self.exact.setdefault(digest, url)
+        if first == url:
+            return None
+        self._group(first, url)
+        return self._heads[url]
+
+    def near_duplicate(self, url: str, fingerprint: int) -> str | None:
+        """Record a page's SimHash.
+
+        Returns:
+            An earlier URL whose SimHash is within ``max_distance`` bits, or
+            None if the page is not a near duplicate.
+        """
+        mask = (1 << self._band_bits) - 1
+        keys = [
+            (band, (fingerprint >> (band * self._band_bits)) & mask)
+            for band in range(self._bands)
+        ]
+        for key in keys:
+            for other, first in self._index.get(key, ()):
+                if (other ^ fingerprint).bit_count() <= self.max_distance:
+                    self._group(first, url)
+                    return self._heads[url]
+        for key in keys:
+            self._index.setdefault(key, []).append((fingerprint, url))
+        return None
+
+    def _group(self, match: str, url: str) -> None:
+        first = self._heads.get(match, match)
+        self._heads[url] = first
+        self.clusters.setdefault(first, [first]).append(url)
+
+
+def write_duplicate_report(detector: DuplicateDetector, path: str | Path) -> Path:
+    """Write duplicate clusters as CSV, one row per page in a cluster.
+
+    Args:
+        detector: Detector that saw the crawl's pages.
+        path: Output CSV path.
+
+    Returns:
+        Path of the written report.
+    """
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", newline="", encoding="utf-8-sig") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["cluster", "page_url", "duplicate_of"])
+        for cluster, (first, urls) in enumerate(detector.clusters.items()):
+            for url in urls:
+                writer.writerow([cluster, url, "" if url == first else first])
+    return out
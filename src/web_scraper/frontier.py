@@ -0,0 +1,164 @@
+import asyncio
+import itertools
+import logging
+import time
+from enum import StrEnum
+from typing import NamedTuple
+
+from .canonical import Canonicalizer
+from .robots import RobotsRules
+from .visited import VisitedMode, VisitedSet, make_visited_set
+
+logger = logging.getLogger(__name__)
+
+# the sitemap protocol's default for URLs without a <priority>
+DEFAULT_PRIORITY = 0.5
+
+
+class CrawlOrder(StrEnum):
+    BFS = "bfs"
+    SHORTEST = "shortest"
+    SITEMAP = "sitemap"
+
+
+class QueuedUrl(NamedTuple):
+    url: str
+    normalized: str
+    queued_at: float
+    depth: int = 0
+    attempt: int = 0
+
+
+class _Entry(NamedTuple):
+    key: float
+    seq: int
+    item: QueuedUrl
+
+
+class Frontier:
+    """Priority queue of URLs waiting to be crawled, deduplicated at enqueue time.
+
+    A URL is admitted only if it is within the crawl scope, its normalized
+    form has not been seen before, its click depth is within ``max_depth``,
+    and fewer than ``max_pages`` URLs have been admitted so far. If
+    ``robots`` is set, URLs it disallows are rejected too. The queue is
+    therefore bounded by ``max_pages`` and only ever holds unique in-scope
+    URLs. All checks run synchronously on the event loop, so no lock is
+    needed.
+
+    URLs are handed out in ``order``: shallowest click depth first, shortest
+    normalized URL first, or highest sitemap priority first. Ties go to the
+    URL queued first. The queue is a binary heap, so each push and pop is
+    O(log n) however large the frontier grows.
+
+    Seen URLs are tracked in a ``visited`` set: exact strings, 64-bit
+    fingerprints (the default, about 18 bytes per URL) or a Bloom filter
+    sized for ``max_pages`` (about 2 bytes per URL); see ``visited``.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_pages: int,
+        order: CrawlOrder = CrawlOrder.BFS,
+        max_depth: int | None = None,
+        visited: VisitedMode = VisitedMode.FINGERPRINT,
+        canonicalizer: Canonicalizer | None = None,
+    ) -> None:
+        self.base_url: str = base_url
+        self.max_pages: int = max_pages
+        self.order: CrawlOrder = order
+        self.max_depth: int | None = max_depth
+        self.canonicalizer: Canonicalizer = canonicalizer or Canonicalizer()
+        self.seen: VisitedSet = make_visited_set(visited, max_pages)
+        self.robots: RobotsRules | None = None
+        self.queue: asyncio.PriorityQueue[_Entry] = asyncio.PriorityQueue(
+            maxsize=max_pages
+        )
+        self._seq: itertools.count[int] = itertools.count()
+
+    @property
+    def full(self) -> bool:
+        return len(self.seen) >= self.max_pages
+
+    def add(self, url: str, depth: int = 0, priority: float | None = None) -> bool:
+        """Admit a URL to the frontier if it is in scope, unseen and within budget.
+
+        Args:
+            url: Absolute URL discovered on a page.
+            depth: Clicks from the start page to this URL.
+            priority: Sitemap priority between 0 and 1, if the URL has one.
+
+        Returns:
+            True if the URL was queued, False if it was rejected.
+        """
+        if self.full or not url.startswith(self.base_url):
+            return False
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+
+        normalized = self.canonicalizer.normalize(url)
+        if normalized in self.seen:
+            return False
+        if self.robots is not None and not self.robots.allowed(url):
+            logger.debug("disallowed by robots.txt: %s", url)
+            return False
+        if not self._admit():
+            return False
+
+        self.seen.add(normalized)
+        item = QueuedUrl(url, normalized, time.monotonic(), depth)
+        self._put(item, priority)
+        return True
+
+    def requeue(self, item: QueuedUrl) -> None:
+        """Queue an admitted URL again, such as for a retry."""
+        self._put(item._replace(queued_at=time.monotonic()))
+
+    def _put(self, item: QueuedUrl, priority: float | None = None) -> None:
+        match self.order:
+            case CrawlOrder.BFS:
+                key = float(item.depth)
+            case CrawlOrder.SHORTEST:
+                key = float(len(item.normalized))
+            case CrawlOrder.SITEMAP:
+                key = -(DEFAULT_PRIORITY if priority is None else priority)
+        self.queue.put_nowait(_Entry(key, next(self._seq), item))
+
+    def _admit(self) -> bool:
+        # hook for frontiers whose page budget is shared with others
+        return True
+
+    def add_all(self, urls: list[str], depth: int = 0) -> list[str]:
+        """Admit every eligible URL from a page's link list.
+
+        Args:
+            urls: Absolute URLs discovered on a page.
+            depth: Click depth of the URLs, one more than the page's.
+
+        Returns:
+            The URLs that were queued, in discovery order.
+        """
+        added: list[str] = []
+        for url in urls:
+            if self.full:
+                break
+            if self.add(url, depth):
+                added.append(url)
+        logger.debug("queued %d of %d links", len(added), len(urls))
+        return added
+
+    async def get(self) -> QueuedUrl:
+        """Wait for and remove the next URL to crawl."""
+        return (await self.queue.get()).item
+
+    def get_nowait(self) -> QueuedUrl:
+        return self.queue.get_nowait().item
+
+    def mark_seen(self, normalized: str) -> None:
+        """Record an already-crawled URL so it is neither queued nor refetched.
+
+        Args:
+            normalized: Normalized form of the crawled URL.
+        """
+        self.seen.add(normalized)
@@ -0,0 +1,197 @@
+import json
+import mmap
+import sys
+from array import array
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import Literal, NamedTuple
+
+from .canonical import Canonicalizer
+from .html_parse import PageData
+
+URLS_FILE = "urls.txt"
+OFFSETS_FILE = "offsets.i64"
+TARGETS_FILE = "targets.i32"
+META_FILE = "graph.json"
+
+
+class UrlIndex:
+    """Assigns dense integer ids to URLs in first-seen order."""
+
+    def __init__(self) -> None:
+        self.ids: dict[str, int] = {}
+        self.urls: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def add(self, url: str) -> int:
+        """Return the id for url, assigning the next free id if it is new."""
+        url_id = self.ids.get(url)
+        if url_id is None:
+            url_id = self.ids[url] = len(self.urls)
+            self.urls.append(url)
+        return url_id
+
+
+class LinkGraph(NamedTuple):
+    """Internal link graph in compressed-sparse-row form.
+
+    The outgoing links of node ``i`` are
+    ``targets[offsets[i]:offsets[i + 1]]``, and ``urls[i]`` is its normalized
+    URL.
+    """
+
+    urls: list[str]
+    offsets: Sequence[int]
+    targets: Sequence[int]
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.urls)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    def neighbors(self, node: int) -> Sequence[int]:
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+
+class LinkGraphBuilder:
+    """Collects outgoing links as pages complete and builds a LinkGraph.
+
+    Links are stored as integer ids in flat arrays rather than as per-page
+    lists of strings. Only links between crawled pages end up in the graph;
+    repeated links from one page to the same target count once.
+    """
+
+    def __init__(self, canonicalizer: Canonicalizer | None = None) -> None:
+        self.canonicalizer: Canonicalizer = canonicalizer or Canonicalizer()
+        self.index: UrlIndex = UrlIndex()
+        self.sources: array[int] = array("i")
+        self.offsets: array[int] = array("q", [0])
+        self.targets: array[int] = array("i")
+
+    def write(self, url: str, page: PageData) -> None:
+        """Record the outgoing links of one crawled page.
+
+        Args:
+            url: Normalized URL of the page.
+            page: Data extracted from the page.
+        """
+        self.sources.append(self.index.add(url))
+        links = self.canonicalizer.normalize_all(page["outgoing_links"])
+        targets = dict.fromkeys(self.index.add(link) for link in links)
+        self.targets.extend(targets)
+        self.offsets.append(len(self.targets))
+
+    def build(self) -> LinkGraph:
+        """Return the graph of links between crawled pages, in crawl order."""
+        remap = array("i", [-1]) * len(self.index)
+        for node, source in enumerate(self.sources):
+            remap[source] = node
+
+        offsets = array("q", [0])
+        targets = array("i")
+        for node in range(len(self.sources)):
+            start, end = self.offsets[node], self.offsets[node + 1]
+            for target in self.targets[start:end]:
+                if remap[target] >= 0:
+                    targets.append(remap[target])
+            offsets.append(len(targets))
+
+        urls = [self.index.urls[source] for source in self.sources]
+        return LinkGraph(urls, offsets, targets)
+
+
+def build_link_graph(pages: Iterable[tuple[str, PageData | None]]) -> LinkGraph:
+    """Build the internal link graph from crawled pages.
+
+    Args:
+        pages: Pairs of normalized URL and PageData, e.g. ``pages.items()``.
+            Failed pages (None) are skipped.
+
+    Returns:
+        LinkGraph over the successfully crawled pages.
+    """
+    builder = LinkGraphBuilder()
+    for url, page in pages:
+        if page is not None:
+            builder.write(url, page)
+    return builder.build()
+
+
+def write_link_graph(graph: LinkGraph, directory: str | Path) -> Path:
+    """Write a LinkGraph as a URL table plus packed little-endian CSR arrays.
+
+    ``offsets.i64`` holds ``num_nodes + 1`` int64 values and ``targets.i32``
+    holds ``num_edges`` int32 values, both raw and memory-mappable (e.g. with
+    ``numpy.memmap``). ``urls.txt`` lists one URL per line, line ``i`` being
+    node ``i``.
+
+    Args:
+        graph: Graph to write.
+        directory: Output directory, created if missing.
+
+    Returns:
+        Path of the output directory.
+    """
+    out = Path(directory)
+    out.mkdir(parents=True, exist_ok=True)
+
+    with open(out / URLS_FILE, "w", encoding="utf-8") as f:
+        for url in graph.urls:
+            _ = f.write(url + "\n")
+    _write_array(out / OFFSETS_FILE, array("q", graph.offsets))
+    _write_array(out / TARGETS_FILE, array("i", graph.targets))
+
+    meta = {
+        "nodes": graph.num_nodes,
+        "edges": graph.num_edges,
+        "offsets": {"file": OFFSETS_FILE, "dtype": "<i8"},
+        "targets": {"file": TARGETS_FILE, "dtype": "<i4"},
+        "urls": URLS_FILE,
+    }
+    with open(out / META_FILE, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return out
+
+
+def load_link_graph(directory: str | Path) -> LinkGraph:
+    """Load a LinkGraph written by ``write_link_graph``.
+
+    The offset and target arrays are memory-mapped rather than read, so
+    loading cost is dominated by the URL table.
+
+    Args:
+        directory: Directory written by ``write_link_graph``.
+
+    Returns:
+        LinkGraph whose arrays are read-only memoryviews over the files.
+    """
+    src = Path(directory)
+    with open(src / URLS_FILE, encoding="utf-8") as f:
+        urls = f.read().splitlines()
+    return LinkGraph(
+        urls, _map_array(src / OFFSETS_FILE, "q"), _map_array(src / TARGETS_FILE, "i")
+    )
+
+
+def _write_array(path: Path, values: array[int]) -> None:
+    if sys.byteorder == "big":
+        values.byteswap()
+    with open(path, "wb") as f:
+        values.tofile(f)
+
+
+def _map_array(path: Path, typecode: Literal["q", "i"]) -> Sequence[int]:
+    with open(path, "rb") as f:
+        if sys.byteorder == "big" or path.stat().st_size == 0:
+            values = array(typecode)
+            values.frombytes(f.read())
+            if sys.byteorder == "big":
+                values.byteswap()
+            return values
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped).cast(typecode)
@@ -1,22 +1,34 @@
 import logging
-from typing import TypedDict
-from urllib.parse import urljoin, urlsplit
+import sys
+from html.parser import HTMLParser
+from typing import NotRequired, TypedDict, override
 
 from bs4 import BeautifulSoup, Tag
+from bs4.dammit import EntitySubstitution
+
+from .canonical import Canonicalizer, resolve_url
 
 logger = logging.getLogger(__name__)
 
 
+_canonicalizer = Canonicalizer()
+
+
 class PageData(TypedDict):
     h1: str
     first_paragraph: str
     outgoing_links: list[str]
     image_urls: list[str]
+    # only present when the page declares a rel=canonical URL
+    canonical_url: NotRequired[str]
 
 
 def extract_page_data(html: str, page_url: str) -> PageData:
     """Extract structured data from an HTML page.
 
+    The document is tokenized once and every field is collected in the same
+    pass. Results match the per-field ``get_*_from_html`` helpers.
+
     Args:
         html: Raw HTML string to parse.
         page_url: URL of the page, included in the returned data and used to resolve relative URLs.
@@ -25,14 +37,283 @@ def extract_page_data(html: str, page_url: str) -> PageData:
         PageData dict containing url, h1, first_paragraph, outgoing_links, and image_urls.
 
     Raises:
-        ValueError: If html is empty.
+        ValueError: If html or page_url is empty.
     """
-    return {
-        "h1": get_h1_from_html(html),
-        "first_paragraph": get_first_paragraph_from_html(html),
-        "outgoing_links": get_urls_from_html(html, page_url),
-        "image_urls": get_images_from_html(html, page_url),
+    if not html or not page_url:
+        raise ValueError("html string or page_url cannot be empty")
+
+    parser = PageDataParser(page_url)
+    parser.feed(html)
+    parser.close()
+    return parser.page_data()
+
+
+# Tag sets mirroring BeautifulSoup's HTMLTreeBuilder, so that the streaming
+# parser builds the same implicit tree as the per-field helpers below.
+_VOID_TAGS = frozenset(
+    {
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "keygen",
+        "link",
+        "menuitem",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+        "basefont",
+        "bgsound",
+        "command",
+        "frame",
+        "image",
+        "isindex",
+        "nextid",
+        "spacer",
     }
+)
+_STRING_CONTAINER_TAGS = frozenset({"rt", "rp", "style", "script", "template"})
+_PRESERVE_WHITESPACE_TAGS = frozenset({"pre", "textarea"})
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+
+class _TextCapture:
+    """Collects the text of a single element while it is open on the stack."""
+
+    def __init__(self) -> None:
+        self.depth: int = -1
+        self.parts: list[str] = []
+
+    def open(self, depth: int) -> None:
+        self.depth = depth
+
+    def is_open(self, stack_size: int) -> bool:
+        return 0 <= self.depth < stack_size
+
+    def text(self) -> str:
+        return "".join(self.parts).strip()
+
+
+class PageDataParser(HTMLParser):
+    """Single-pass extractor producing the same PageData as the per-field helpers.
+
+    Tokenizes the document once with the standard library parser (the same
+    tokenizer BeautifulSoup's ``html.parser`` builder uses) and tracks just
+    enough of the open-element stack to reproduce BeautifulSoup's nesting,
+    whitespace and string-type rules, without building a tree. Markup may be
+    fed incrementally; call ``close()`` before ``page_data()``.
+    """
+
+    def __init__(self, page_url: str) -> None:
+        super().__init__(convert_charrefs=False)
+        self.page_url: str = page_url
+        self._stack: list[str] = []
+        self._open_counts: dict[str, int] = {}
+        self._already_closed_void: list[str] = []
+        self._containers: int = 0
+        self._preserve_whitespace: int = 0
+        self._data: list[str] = []
+
+        self._h1: _TextCapture = _TextCapture()
+        self._first_p: _TextCapture = _TextCapture()
+        self._main_p: _TextCapture = _TextCapture()
+        self._main_depth: int = -1
+        self._seen_h1: bool = False
+        self._seen_p: bool = False
+        self._seen_main: bool = False
+        self._seen_main_p: bool = False
+
+        self._links: list[str] = []
+        self._images: list[str] = []
+        self._canonical: str | None = None
+
+    def page_data(self) -> PageData:
+        """Return the PageData collected so far."""
+        if self._seen_main:
+            first_paragraph = self._main_p.text()
+        else:
+            first_paragraph = self._first_p.text()
+
+        # hrefs are resolved together, so repeated navigation links are
+        # joined once per page
+        resolve = _canonicalizer.resolve_all
+        data: PageData = {
+            "h1": self._h1.text(),
+            "first_paragraph": first_paragraph,
+            "outgoing_links": resolve(self.page_url, self._links),
+            "image_urls": resolve(self.page_url, self._images),
+        }
+        if self._canonical is not None:
+            data["canonical_url"] = resolve_url(self.page_url, self._canonical)
+        return data
+
+    @override
+    def close(self) -> None:
+        super().close()
+        self._end_data()
+        while self._stack:
+            self._pop()
+
+    @override
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self._start(tag, attrs, handle_void=False)
+        self.handle_endtag(tag)
+
+    @override
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        self._start(tag, attrs, handle_void=True)
+
+    @override
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._already_closed_void:
+            self._already_closed_void.remove(tag)
+            return
+        self._end_data()
+        self._pop_to(tag)
+
+    @override
+    def handle_data(self, data: str) -> None:
+        self._data.append(data)
+
+    @override
+    def handle_charref(self, name: str) -> None:
+        if name[0] in "xX":
+            codepoint = int(name.lstrip("xX"), 16)
+        else:
+            codepoint = int(name)
+
+        data = ""
+        if codepoint < 256:
+            # BeautifulSoup treats low numeric references as windows-1252
+            try:
+                data = bytes([codepoint]).decode("windows-1252")
+            except UnicodeDecodeError:
+                pass
+        if not data and codepoint <= sys.maxunicode:
+            data = chr(codepoint)
+        self._data.append(data or "\N{REPLACEMENT CHARACTER}")
+
+    @override
+    def handle_entityref(self, name: str) -> None:
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self._data.append(character if character is not None else f"&{name}")
+
+    @override
+    def handle_comment(self, data: str) -> None:
+        self._end_data()
+
+    @override
+    def handle_decl(self, decl: str) -> None:
+        self._end_data()
+
+    @override
+    def unknown_decl(self, data: str) -> None:
+        self._end_data()
+        if data.upper().startswith("CDATA["):
+            # CDATA keeps its own string type, so it counts as text even
+            # inside string containers
+            self._data.append(data[len("CDATA[") :])
+            self._end_data(cdata=True)
+
+    @override
+    def handle_pi(self, data: str) -> None:
+        self._end_data()
+
+    def _start(
+        self, tag: str, attrs: list[tuple[str, str | None]], handle_void: bool
+    ) -> None:
+        self._end_data()
+
+        if tag == "a" or tag == "img":
+            # later duplicate attributes replace earlier ones
+            values = dict(attrs)
+            key = "href" if tag == "a" else "src"
+            if key in values:
+                (self._links if tag == "a" else self._images).append(values[key] or "")
+        elif tag == "link" and self._canonical is None:
+            values = dict(attrs)
+            rel = (values.get("rel") or "").lower().split()
+            href = values.get("href")
+            if "canonical" in rel and href:
+                self._canonical = href
+
+        depth = len(self._stack)
+        if tag == "h1" and not self._seen_h1:
+            self._seen_h1 = True
+            self._h1.open(depth)
+        elif tag == "main" and not self._seen_main:
+            self._seen_main = True
+            self._main_depth = depth
+        elif tag == "p":
+            if not self._seen_p:
+                self._seen_p = True
+                self._first_p.open(depth)
+            if not self._seen_main_p and 0 <= self._main_depth < depth:
+                self._seen_main_p = True
+                self._main_p.open(depth)
+
+        self._push(tag)
+
+        if handle_void and tag in _VOID_TAGS:
+            self._pop_to(tag)
+            self._already_closed_void.append(tag)
+
+    def _push(self, tag: str) -> None:
+        self._stack.append(tag)
+        self._open_counts[tag] = self._open_counts.get(tag, 0) + 1
+        if tag in _STRING_CONTAINER_TAGS:
+            self._containers += 1
+        if tag in _PRESERVE_WHITESPACE_TAGS:
+            self._preserve_whitespace += 1
+
+    def _pop(self) -> None:
+        tag = self._stack.pop()
+        self._open_counts[tag] -= 1
+        if tag in _STRING_CONTAINER_TAGS:
+            self._containers -= 1
+        if tag in _PRESERVE_WHITESPACE_TAGS:
+            self._preserve_whitespace -= 1
+
+        depth = len(self._stack)
+        if depth == self._main_depth:
+            self._main_depth = -1
+        for capture in (self._h1, self._first_p, self._main_p):
+            if capture.depth == depth:
+                capture.depth = -1
+
+    def _pop_to(self, tag: str) -> None:
+        # unmatched end tags are ignored, matched ones close everything above
+        if not self._open_counts.get(tag):
+            return
+        while self._stack:
+            name = self._stack[-1]
+            self._pop()
+            if name == tag:
+                return
+
+    def _end_data(self, cdata: bool = False) -> None:
+        if not self._data:
+            return
+
+        data = "".join(self._data)
+        self._data = []
+
+        if not self._preserve_whitespace and not data.strip(_ASCII_SPACES):
+            data = "\n" if "\n" in data else " "
+
+        if self._containers and not cdata:
+            return
+
+        stack_size = len(self._stack)
+        for capture in (self._h1, self._first_p, self._main_p):
+            if capture.is_open(stack_size):
+                capture.parts.append(data)
 
 
 def normalize_url(url: str) -> str:
@@ -47,21 +328,7 @@ def normalize_url(url: str) -> str:
     Raises:
         ValueError: If url is empty.
     """
-    if not url:
-        raise ValueError("url cannot be empty")
-
-    logger.debug("input url: ", url)
-
-    parts = urlsplit(url)
-    logger.debug("url split into parts: %s", parts)
-
-    sanitized = parts.hostname or ""
-    sanitized += parts.path.rstrip("/")
-
-    while sanitized.startswith("www."):
-        sanitized = sanitized[4:]
-
-    return sanitized
+    return _canonicalizer.normalize(url)
 
 
 def get_h1_from_html(html: str) -> str:
@@ -137,15 +404,7 @@ def get_urls_from_html(html: str, base_url: str) -> list[str]:
         link = a.get("href")
         if link is None:
             continue
-        link = str(link)
-
-        # handle common malformed url edge case
-        if link.startswith("www."):
-            link = "https://" + link
-
-        # urljoin will not join absolute urls
-        link = urljoin(base_url, link)
-        links.append(link)
+        links.append(resolve_url(base_url, str(link)))
 
     return links
 
@@ -178,12 +437,6 @@ def get_images_from_html(html: str, base_url: str) -> list[str]:
         src = img.get("src")
         if src is None:
             continue
-        src = str(src)
-
-        if src.startswith("www."):
-            src = "https://" + src
-
-        src = urljoin(base_url, src)
-        images.append(src)
+        images.append(resolve_url(base_url, str(src)))
 
     return images
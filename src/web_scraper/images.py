@@ -0,0 +1,269 @@
+import asyncio
+import csv
+import logging
+from collections.abc import Mapping
+from pathlib import Path
+from types import TracebackType
+from typing import NamedTuple, Self
+from urllib.parse import urldefrag
+
+import aiohttp
+
+from .crawl import USER_AGENT
+from .graph import UrlIndex
+from .html_parse import PageData
+from .linkcheck import CHECKED_SCHEMES, HEAD_UNSUPPORTED
+from .retry import RetryPolicy, failure_reason, retrying
+from .scheduler import HostPolicy, HostScheduler
+from .transport import TransportConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 20
+HEAVIEST_IMAGES = 20
+PAGE_WEIGHT_FILENAME = "page_weight.csv"
+IMAGES_FILENAME = "images.csv"
+
+
+class ImageInfo(NamedTuple):
+    url: str
+    status: int | None
+    content_type: str = ""
+    size: int | None = None
+    cache_control: str = ""
+    error: str | None = None
+
+
+class PageWeight(NamedTuple):
+    url: str
+    images: int
+    image_bytes: int
+    unknown_sizes: int
+
+
+class ImageAuditor:
+    """Probes every image a crawl finds, once each, while the crawl runs.
+
+    As a PageSink it records each page's image URLs; URLs it has not seen
+    before are queued, and ``max_concurrency`` workers probe them with HEAD
+    for their content type, size and cache headers. If HEAD is rejected or
+    gives no size, a one-byte ranged GET reads the size from
+    ``Content-Range`` instead, so image bodies are never downloaded.
+
+    Probes go through a HostScheduler, so each image host gets the same
+    connection, pacing and circuit-breaker limits as a crawled host, and
+    transient errors are retried with ``retry``. Given the crawl's
+    ``scheduler`` and ``session``, probes share them with the crawl, so
+    per-host limits hold for crawl and probes together and probe failures
+    count toward the host's circuit breaker; otherwise the auditor makes its
+    own from ``host_policy`` and ``transport``.
+    Use it as an async context manager, and call ``join`` after the crawl
+    to wait for the last probes.
+
+    ``write`` may be called from another thread, as ``crawl_sharded`` does;
+    pages are handed to the event loop the auditor was entered on.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        host_policy: HostPolicy | None = None,
+        transport: TransportConfig | None = None,
+        retry: RetryPolicy | None = None,
+        scheduler: HostScheduler | None = None,
+        session: aiohttp.ClientSession | None = None,
+    ) -> None:
+        self.max_concurrency: int = max_concurrency
+        self.scheduler: HostScheduler = scheduler or HostScheduler(host_policy)
+        self.transport: TransportConfig = transport or TransportConfig()
+        self.retry: RetryPolicy = retry or RetryPolicy()
+        self.images: UrlIndex = UrlIndex()
+        self.pages: dict[str, list[int]] = {}
+        self.results: dict[int, ImageInfo] = {}
+        self.queue: asyncio.Queue[int] = asyncio.Queue()
+        self.session: aiohttp.ClientSession | None = session
+        self._owns_session: bool = session is None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._workers: list[asyncio.Task[None]] = []
+
+    async def __aenter__(self) -> Self:
+        self._loop = asyncio.get_running_loop()
+        if self.session is None:
+            self.session = self.transport.session()
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)
+        ]
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        for worker in self._workers:
+            _ = worker.cancel()
+        assert self.session is not None
+        if self._owns_session:
+            await self.session.close()
+
+    def write(self, url: str, page: PageData) -> None:
+        """Record the images of one crawled page and queue new ones for probing.
+
+        Args:
+            url: Normalized URL of the page.
+            page: Data extracted from the page.
+        """
+        assert self._loop is not None, "ImageAuditor used outside async with"
+        _ = self._loop.call_soon_threadsafe(self._record, url, page["image_urls"])
+
+    def _record(self, url: str, image_urls: list[str]) -> None:
+        ids: dict[int, None] = {}
+        for image_url in image_urls:
+            if not image_url.startswith(CHECKED_SCHEMES):
+                continue
+            known = len(self.images)
+            image_id = self.images.add(urldefrag(image_url).url)
+            if image_id == known:
+                self.queue.put_nowait(image_id)
+            ids[image_id] = None
+        self.pages[url] = list(ids)
+
+    async def join(self) -> None:
+        """Wait until every image recorded so far has been probed."""
+        # let pages written from other threads reach the queue first
+        await asyncio.sleep(0)
+        await self.queue.join()
+
+    async def _worker(self) -> None:
+        while True:
+            image_id = await self.queue.get()
+            url = self.images.urls[image_id]
+            try:
+                self.results[image_id] = await retrying(
+                    self.retry, lambda: self._probe(url)
+                )
+            except Exception as e:
+                logger.debug("image probe of %s failed: %s", url, e)
+                self.results[image_id] = ImageInfo(url, None, error=failure_reason(e))
+            finally:
+                self.queue.task_done()
+
+    async def _probe(self, url: str) -> ImageInfo:
+        assert self.session is not None
+        headers = {"User-Agent": USER_AGENT}
+        async with self.scheduler.slot(url) as slot:
+            async with self.session.head(
+                url, headers=headers, allow_redirects=True
+            ) as r:
+                slot.observe(r.status, r.headers.get("Retry-After"))
+                info = _image_info(url, r.status, r.headers)
+        if r.status not in HEAD_UNSUPPORTED and (
+            info.size is not None or r.status >= 400
+        ):
+            return info
+
+        headers["Range"] = "bytes=0-0"
+        async with self.scheduler.slot(url) as slot:
+            # only the headers are needed, so the body is never read
+            async with self.session.get(url, headers=headers) as r:
+                slot.observe(r.status, r.headers.get("Retry-After"))
+                return _image_info(url, r.status, r.headers)
+
+    def page_weights(self) -> list[PageWeight]:
+        """Return the total size of each page's images, heaviest page first.
+
+        Images whose size is unknown are counted in ``unknown_sizes``.
+        """
+        weights: list[PageWeight] = []
+        for url, ids in self.pages.items():
+            sizes = [self.results[i].size if i in self.results else None for i in ids]
+            known = [size for size in sizes if size is not None]
+            weights.append(
+                PageWeight(url, len(ids), sum(known), len(sizes) - len(known))
+            )
+        weights.sort(key=lambda weight: weight.image_bytes, reverse=True)
+        return weights
+
+    def heaviest(self, n: int | None = None) -> list[ImageInfo]:
+        """Return probed images by size, largest first, unknown sizes last."""
+        ranked = sorted(
+            self.results.values(),
+            key=lambda info: -1 if info.size is None else info.size,
+            reverse=True,
+        )
+        return ranked if n is None else ranked[:n]
+
+    def usage(self) -> dict[str, int]:
+        """Return how many crawled pages use each image."""
+        counts = [0] * len(self.images)
+        for ids in self.pages.values():
+            for image_id in ids:
+                counts[image_id] += 1
+        return dict(zip(self.images.urls, counts))
+
+
+def _image_info(url: str, status: int, headers: Mapping[str, str]) -> ImageInfo:
+    size = None
+    total = headers.get("Content-Range", "").rpartition("/")[2]
+    length = headers.get("Content-Length", "")
+    if status == 206 and total.isdigit():
+        size = int(total)
+    elif status < 300 and length.isdigit():
+        # an error page's length says nothing about the image
+        size = int(length)
+    return ImageInfo(
+        url,
+        status,
+        headers.get("Content-Type", ""),
+        size,
+        headers.get("Cache-Control", ""),
+    )
+
+
+def write_image_report(auditor: ImageAuditor, out_dir: str | Path) -> list[Path]:
+    """Write per-page image weight and every image by size as CSV.
+
+    Args:
+        auditor: Auditor that probed the crawl's images.
+        out_dir: Directory to write the reports to.
+
+    Returns:
+        Paths of the page weight and image reports.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    weight_path = out / PAGE_WEIGHT_FILENAME
+    with open(weight_path, "w", newline="", encoding="utf-8-sig") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["page_url", "images", "image_bytes", "unknown_sizes"])
+        writer.writerows(auditor.page_weights())
+
+    images_path = out / IMAGES_FILENAME
+    usage = auditor.usage()
+    with open(images_path, "w", newline="", encoding="utf-8-sig") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(
+            [
+                "image_url",
+                "status",
+                "content_type",
+                "bytes",
+                "cache_control",
+                "pages",
+                "error",
+            ]
+        )
+        for info in auditor.heaviest():
+            writer.writerow(
+                [
+                    info.url,
+                    "" if info.status is None else info.status,
+                    info.content_type,
+                    "" if info.size is None else info.size,
+                    info.cache_control,
+                    usage[info.url],
+                    info.error or "",
+                ]
+            )
+    return [weight_path, images_path]
@@ -0,0 +1,250 @@
+import asyncio
+import csv
+import logging
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import urldefrag
+
+import aiohttp
+
+from .canonical import Canonicalizer
+from .crawl import USER_AGENT
+from .graph import UrlIndex
+from .html_parse import PageData
+from .retry import RetryPolicy, failure_reason, retrying
+from .scheduler import HostPolicy, HostScheduler
+from .transport import TransportConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 20
+DEFAULT_MAX_REDIRECTS = 10
+CHECKED_SCHEMES = ("http://", "https://")
+# servers that do not implement HEAD, or refuse it, are asked again with GET
+HEAD_UNSUPPORTED = frozenset({403, 405, 501})
+
+
+class LinkStatus(NamedTuple):
+    url: str
+    status: int | None
+    redirects: tuple[str, ...] = ()
+    error: str | None = None
+
+    @property
+    def broken(self) -> bool:
+        return self.status is None or self.status >= 400
+
+
+class LinkChecker:
+    """Collects the targets of every link while a crawl runs, then checks them.
+
+    As a PageSink it records, for each link target, the pages that link to
+    it. Internal targets, those under ``base_url``, are checked by the crawl
+    itself: as a FailureSink it records the ones that are broken, failing
+    with an HTTP error, a transport error or an open circuit breaker. A
+    target the crawl fetched but could not use, such as a PDF, is reachable.
+    External targets are checked by ``check`` once the crawl is done, each
+    exactly once however many pages link to it; results are kept in
+    ``results``, so a checker shared between crawls never checks a URL twice.
+
+    Each target is requested with HEAD, then with GET if the server rejects
+    HEAD, following redirects. Requests go through a HostScheduler, so each
+    host gets the same connection, pacing and circuit-breaker limits as a
+    crawl; transient errors are retried with ``retry``, and a check refused
+    by an open circuit breaker waits for it to close.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        canonicalizer: Canonicalizer | None = None,
+        max_redirects: int = DEFAULT_MAX_REDIRECTS,
+    ) -> None:
+        self.base_url: str = base_url
+        self.canonicalizer: Canonicalizer = canonicalizer or Canonicalizer()
+        self.max_redirects: int = max_redirects
+        self.pages: UrlIndex = UrlIndex()
+        self.external: dict[str, list[int]] = {}
+        self.internal: dict[str, list[int]] = {}
+        self.failed: dict[str, str] = {}
+        self.results: dict[str, LinkStatus] = {}
+
+    def write(self, url: str, page: PageData) -> None:
+        """Record the link targets of one crawled page.
+
+        Args:
+            url: Normalized URL of the page.
+            page: Data extracted from the page.
+        """
+        page_id = self.pages.add(url)
+        for link in dict.fromkeys(page["outgoing_links"]):
+            if not link.startswith(CHECKED_SCHEMES):
+                continue
+            if link.startswith(self.base_url):
+                target = self.canonicalizer.normalize(link)
+                self.internal.setdefault(target, []).append(page_id)
+            else:
+                target = urldefrag(link).url
+                self.external.setdefault(target, []).append(page_id)
+
+    def write_failure(self, url: str, reason: str, broken: bool = True) -> None:
+        """Record an internal page the crawl could not fetch, if it is broken."""
+        if broken:
+            self.failed[url] = reason
+
+    def referrers(self, target: str) -> list[str]:
+        """Return the pages linking to a target, internal ones by normalized URL."""
+        ids = self.external.get(target) or self.internal.get(target, [])
+        return [self.pages.urls[page_id] for page_id in dict.fromkeys(ids)]
+
+    def broken(self) -> list[LinkStatus]:
+        """Return every broken link target: failed internal pages that some
+        crawled page links to, then external targets that failed their check.
+        """
+        internal = [
+            LinkStatus(url, _status(reason), error=reason)
+            for url, reason in self.failed.items()
+            if url in self.internal
+        ]
+        external = [
+            status
+            for url in self.external
+            if (status := self.results.get(url)) is not None and status.broken
+        ]
+        return internal + external
+
+    async def check(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        host_policy: HostPolicy | None = None,
+        transport: TransportConfig | None = None,
+        retry: RetryPolicy | None = None,
+        deadline: float | None = None,
+    ) -> dict[str, LinkStatus]:
+        """Check every external target not checked yet.
+
+        Args:
+            max_concurrency: Maximum concurrent requests across all hosts.
+            host_policy: Per-host connection, pacing and backoff limits.
+            transport: Connection settings for the checks.
+            retry: How checks that fail with transient errors are retried.
+            deadline: Event loop time after which checks stop waiting for a
+                host's circuit breaker to close; by default they wait as long
+                as the breaker asks.
+
+        Returns:
+            Dict mapping every external target to its status.
+        """
+        pending = [url for url in self.external if url not in self.results]
+        scheduler = HostScheduler(host_policy)
+        retry = retry or RetryPolicy()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        async with (transport or TransportConfig()).session() as session:
+
+            async def check_one(url: str) -> None:
+                async with semaphore:
+                    self.results[url] = await self._check(
+                        session, scheduler, retry, url, deadline
+                    )
+
+            async with asyncio.TaskGroup() as tg:
+                for url in pending:
+                    _ = tg.create_task(check_one(url))
+        logger.info("checked %d external links", len(pending))
+        return {url: self.results[url] for url in self.external}
+
+    async def _check(
+        self,
+        session: aiohttp.ClientSession,
+        scheduler: HostScheduler,
+        retry: RetryPolicy,
+        url: str,
+        deadline: float | None,
+    ) -> LinkStatus:
+        try:
+            return await retrying(
+                retry, lambda: self._request(session, scheduler, url), deadline
+            )
+        except aiohttp.TooManyRedirects as e:
+            redirects = tuple(str(h.url) for h in e.history)
+            return LinkStatus(url, None, redirects, "too many redirects")
+        except Exception as e:
+            logger.debug("link check of %s failed: %s", url, e)
+            return LinkStatus(url, None, error=failure_reason(e))
+
+    async def _request(
+        self, session: aiohttp.ClientSession, scheduler: HostScheduler, url: str
+    ) -> LinkStatus:
+        headers = {"User-Agent": USER_AGENT}
+        async with scheduler.slot(url) as slot:
+            async with session.head(
+                url,
+                headers=headers,
+                allow_redirects=True,
+                max_redirects=self.max_redirects,
+            ) as r:
+                slot.observe(r.status, r.headers.get("Retry-After"))
+                if r.status not in HEAD_UNSUPPORTED:
+                    return _link_status(url, r)
+        async with scheduler.slot(url) as slot:
+            # only the status is needed, so the body is never read
+            async with session.get(
+                url, headers=headers, max_redirects=self.max_redirects
+            ) as r:
+                slot.observe(r.status, r.headers.get("Retry-After"))
+                return _link_status(url, r)
+
+
+def _link_status(url: str, r: aiohttp.ClientResponse) -> LinkStatus:
+    redirects = tuple(str(h.url) for h in r.history)
+    if redirects:
+        redirects += (str(r.url),)
+    return LinkStatus(url, r.status, redirects)
+
+
+def _status(reason: str) -> int | None:
+    # crawl failures are reported as "HTTP <status>" when there was a response
+    code = reason.removeprefix("HTTP ")
+    return int(code) if code != reason and code.isdigit() else None
+
+
+def write_link_check_report(checker: LinkChecker, path: str | Path) -> Path:
+    """Write every external link and every broken internal link as CSV.
+
+    Args:
+        checker: Checker that saw the crawl and checked its links.
+        path: Output CSV path.
+
+    Returns:
+        Path of the written report.
+    """
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    rows = [status for status in checker.broken() if status.url in checker.internal]
+    rows += [checker.results[url] for url in checker.external if url in checker.results]
+    with open(out, "w", newline="", encoding="utf-8-sig") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(
+            [
+                "link_url",
+                "internal",
+                "status",
+                "error",
+                "broken",
+                "redirect_chain",
+                "referring_pages",
+            ]
+        )
+        for status in rows:
+            writer.writerow(
+                [
+                    status.url,
+                    status.url in checker.internal,
+                    "" if status.status is None else status.status,
+                    status.error or "",
+                    status.broken,
+                    " -> ".join(status.redirects),
+                    ";".join(checker.referrers(status.url)),
+                ]
+            )
+    return out
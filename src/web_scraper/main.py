@@ -1,34 +1,517 @@
 import asyncio
+import json
 import logging
+import re
+import sys
+import time
+from contextlib import AsyncExitStack, ExitStack
+from pathlib import Path
+from typing import Annotated
 
 import typer
 
-from .crawl import crawl_site_async
-from .report import write_csv_report
+from .analysis import analyze_links, write_link_report
+from .batch import DEFAULT_SITE_CONCURRENCY, crawl_batch
+from .cache import ResponseCache
+from .canonical import CanonicalRules, Canonicalizer
+from .checkpoint import Checkpoint
+from .crawl import AsyncCrawler, PageSink, ParseExecutor
+from .dedup import DEFAULT_MAX_DISTANCE, DuplicateDetector, write_duplicate_report
+from .frontier import CrawlOrder
+from .graph import LinkGraphBuilder, write_link_graph
+from .images import HEAVIEST_IMAGES, ImageAuditor, write_image_report
+from .linkcheck import LinkChecker, write_link_check_report
+from .report import DEFAULT_OUT, ReportFormat, ReportWriter, report_filename
+from .retry import RetryPolicy
+from .scheduler import HostPolicy
+from .shard import crawl_sharded
+from .stats import CrawlStats, report_progress
+from .transport import TransportConfig
+from .visited import VisitedMode
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.WARNING)
 
 DEFAULT_MAX_CONCURRENCY = 10
 DEFAULT_MAX_PAGES = 10
+DEFAULT_PARSE_EXECUTOR = ParseExecutor.PROCESS
+DEFAULT_PER_HOST_CONNECTIONS = 8
+DEFAULT_REQUESTS_PER_SECOND = 0.0
+DEFAULT_REPORT_FORMAT = ReportFormat.CSV
+LINK_REPORT_FILENAME = "link_report.csv"
+DUPLICATE_REPORT_FILENAME = "duplicates.csv"
+LINK_CHECK_REPORT_FILENAME = "link_check.csv"
+_UNSAFE_PATH_CHARS = re.compile(r"[^A-Za-z0-9.-]+")
 app = typer.Typer()
 
 
 @app.command()
 def crawl(
-    base_url: str,
+    base_url: Annotated[str | None, typer.Argument()] = None,
     max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
     max_pages: int = DEFAULT_MAX_PAGES,
+    parse_executor: ParseExecutor | None = None,
+    per_host_connections: int = DEFAULT_PER_HOST_CONNECTIONS,
+    requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+    cache: Path | None = None,
+    checkpoint: Path | None = None,
+    resume: bool = False,
+    report_format: ReportFormat = DEFAULT_REPORT_FORMAT,
+    gzip: bool = False,
+    graph_dir: Path | None = None,
+    analyze: bool = False,
+    stats: Path | None = None,
+    progress_interval: float = 0.0,
+    connection_limit: int = TransportConfig.limit,
+    keepalive_timeout: float = TransportConfig.keepalive_timeout,
+    dns_ttl: int = TransportConfig.dns_ttl,
+    connect_timeout: float = TransportConfig.connect_timeout,
+    read_timeout: float = TransportConfig.read_timeout,
+    total_timeout: float = TransportConfig.total_timeout,
+    compression: bool = TransportConfig.compression,
+    max_page_bytes: int = TransportConfig.max_body_bytes,
+    workers: int = 1,
+    robots: bool = False,
+    sitemaps: bool = False,
+    order: CrawlOrder = CrawlOrder.BFS,
+    max_depth: int | None = None,
+    visited: VisitedMode = VisitedMode.FINGERPRINT,
+    keep_query: bool = False,
+    keep_param: list[str] | None = None,
+    strip_param: list[str] | None = None,
+    keep_port: bool = False,
+    respect_canonical: bool = False,
+    max_retries: int = RetryPolicy.max_retries,
+    retry_base_delay: float = RetryPolicy.base_delay,
+    breaker_threshold: int = HostPolicy.breaker_threshold,
+    breaker_cooldown: float = HostPolicy.breaker_cooldown,
+    dedup: bool = False,
+    dedup_distance: int = DEFAULT_MAX_DISTANCE,
+    check_links: bool = False,
+    audit_images: bool = False,
+    seeds: Path | None = None,
+    site_concurrency: int = DEFAULT_SITE_CONCURRENCY,
+    combined_report: bool = False,
+):
+    if (base_url is None) == (seeds is None):
+        raise typer.BadParameter("give either a base URL or --seeds")
+    if seeds is not None and (
+        cache is not None
+        or checkpoint is not None
+        or workers > 1
+        or graph_dir is not None
+        or analyze
+        or dedup
+        or check_links
+        or audit_images
+    ):
+        raise typer.BadParameter(
+            "--seeds cannot be combined with --cache, --checkpoint, --workers, "
+            + "--graph-dir, --analyze, --dedup, --check-links or --audit-images"
+        )
+    if resume and checkpoint is None:
+        raise typer.BadParameter("--resume requires --checkpoint")
+    if workers < 1:
+        raise typer.BadParameter("--workers must be at least 1")
+    if workers > 1 and (
+        cache is not None
+        or checkpoint is not None
+        or progress_interval > 0
+        or robots
+        or sitemaps
+        or dedup
+        or parse_executor is not None
+    ):
+        # shards always parse inline, since each has a core to itself
+        raise typer.BadParameter(
+            "--workers cannot be combined with --cache, --checkpoint, "
+            + "--progress-interval, --robots, --sitemaps, --dedup "
+            + "or --parse-executor"
+        )
+    parse_executor = parse_executor or DEFAULT_PARSE_EXECUTOR
+
+    host_policy = HostPolicy(
+        max_connections=per_host_connections,
+        requests_per_second=requests_per_second,
+        breaker_threshold=breaker_threshold,
+        breaker_cooldown=breaker_cooldown,
+    )
+    retry = RetryPolicy(max_retries=max_retries, base_delay=retry_base_delay)
+    duplicates = DuplicateDetector(dedup_distance) if dedup else None
+    transport = TransportConfig(
+        limit=connection_limit,
+        keepalive_timeout=keepalive_timeout,
+        dns_ttl=dns_ttl,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        total_timeout=total_timeout,
+        compression=compression,
+        max_body_bytes=max_page_bytes,
+    )
+    canonical = CanonicalRules(
+        keep_port=keep_port,
+        keep_query=keep_query,
+        keep_params=tuple(keep_param) if keep_param else None,
+        strip_params=(
+            tuple(strip_param) if strip_param else CanonicalRules.strip_params
+        ),
+        respect_canonical=respect_canonical,
+    )
+    if seeds is not None:
+        base_urls = _read_seeds(seeds)
+        with ExitStack() as stack:
+            if combined_report:
+                report = stack.enter_context(
+                    ReportWriter(
+                        Path(DEFAULT_OUT, report_filename(report_format, gzip)),
+                        report_format,
+                        gzip,
+                    )
+                )
+                reports = dict.fromkeys(base_urls, report)
+            else:
+                reports = {
+                    base_url: stack.enter_context(
+                        ReportWriter(
+                            Path(
+                                DEFAULT_OUT,
+                                _site_dir(base_url),
+                                report_filename(report_format, gzip),
+                            ),
+                            report_format,
+                            gzip,
+                        )
+                    )
+                    for base_url in base_urls
+                }
+            asyncio.run(
+                _crawl_batch(
+                    reports,
+                    max_concurrency,
+                    max_pages,
+                    site_concurrency,
+                    parse_executor,
+                    host_policy,
+                    stats,
+                    progress_interval,
+                    transport,
+                    robots,
+                    sitemaps,
+                    order,
+                    max_depth,
+                    visited,
+                    canonical,
+                    retry,
+                )
+            )
+        return
+
+    assert base_url is not None
+    with ExitStack() as stack:
+        response_cache = None
+        if cache is not None:
+            response_cache = stack.enter_context(ResponseCache(cache))
+        journal = None
+        if checkpoint is not None:
+            journal = stack.enter_context(Checkpoint(checkpoint, resume))
+        report = stack.enter_context(
+            ReportWriter(
+                Path(DEFAULT_OUT, report_filename(report_format, gzip)),
+                report_format,
+                gzip,
+            )
+        )
+
+        asyncio.run(
+            _crawl(
+                base_url,
+                max_concurrency,
+                max_pages,
+                parse_executor,
+                host_policy,
+                response_cache,
+                journal,
+                report,
+                graph_dir,
+                analyze,
+                stats,
+                progress_interval,
+                transport,
+                workers,
+                robots,
+                sitemaps,
+                order,
+                max_depth,
+                visited,
+                canonical,
+                retry,
+                duplicates,
+                check_links,
+                audit_images,
+            )
+        )
+
+
+async def _crawl(
+    base_url: str,
+    max_concurrency: int,
+    max_pages: int,
+    parse_executor: ParseExecutor,
+    host_policy: HostPolicy,
+    cache: ResponseCache | None,
+    checkpoint: Checkpoint | None,
+    report: ReportWriter,
+    graph_dir: Path | None,
+    analyze: bool,
+    stats_path: Path | None,
+    progress_interval: float,
+    transport: TransportConfig,
+    workers: int,
+    robots: bool,
+    sitemaps: bool,
+    order: CrawlOrder,
+    max_depth: int | None,
+    visited: VisitedMode,
+    canonical: CanonicalRules,
+    retry: RetryPolicy,
+    duplicates: DuplicateDetector | None,
+    check_links: bool,
+    audit_images: bool,
 ):
-    asyncio.run(_crawl(base_url, max_concurrency, max_pages))
+    sinks: list[PageSink] = [report]
+    canonicalizer = Canonicalizer(canonical)
+    graph_builder = None
+    if graph_dir is not None or analyze:
+        graph_builder = LinkGraphBuilder(canonicalizer)
+        sinks.append(graph_builder)
+    link_checker = None
+    if check_links:
+        link_checker = LinkChecker(base_url, canonicalizer)
+        sinks.append(link_checker)
+
+    stats = None
+    progress = None
+    if stats_path is not None or progress_interval > 0:
+        stats = CrawlStats()
+    if stats is not None and progress_interval > 0:
+        progress = asyncio.create_task(
+            report_progress(stats, progress_interval, _print_progress)
+        )
+
+    image_auditor = None
+    async with AsyncExitStack() as stack:
+        crawler = None
+        if workers == 1:
+            crawler = await stack.enter_async_context(
+                AsyncCrawler(
+                    base_url,
+                    max_concurrency,
+                    max_pages,
+                    parse_executor,
+                    host_policy,
+                    cache,
+                    checkpoint,
+                    sinks,
+                    store_pages=False,
+                    stats=stats,
+                    transport=transport,
+                    robots=robots,
+                    sitemaps=sitemaps,
+                    order=order,
+                    max_depth=max_depth,
+                    visited=visited,
+                    canonical=canonical,
+                    retry=retry,
+                    duplicates=duplicates,
+                )
+            )
+        if audit_images:
+            # probes share the crawler's per-host limits and connections; shards
+            # crawl in other processes, so a sharded audit keeps its own
+            image_auditor = await stack.enter_async_context(
+                ImageAuditor(
+                    max_concurrency,
+                    host_policy,
+                    transport,
+                    retry,
+                    None if crawler is None else crawler.scheduler,
+                    None if crawler is None else crawler.session,
+                )
+            )
+            # the crawler holds this list, so it feeds the auditor too
+            sinks.append(image_auditor)
+
+        print(f"starting crawl of: {base_url}")
+        try:
+            if crawler is not None:
+                _ = await crawler.crawl()
+            else:
+                # shard results are collected by a blocking loop in this process
+                _ = await asyncio.to_thread(
+                    crawl_sharded,
+                    base_url,
+                    workers,
+                    max_concurrency,
+                    max_pages,
+                    host_policy,
+                    sinks,
+                    store_pages=False,
+                    stats=stats,
+                    transport=transport,
+                    order=order,
+                    max_depth=max_depth,
+                    visited=visited,
+                    canonical=canonical,
+                    retry=retry,
+                )
+        finally:
+            if progress is not None:
+                _ = progress.cancel()
+        if image_auditor is not None:
+            # probes run alongside the crawl; wait for the last ones
+            await image_auditor.join()
+    print(f"crawl complete: {report.rows} pages written to {report.path}")
+    if stats is not None and stats_path is not None:
+        stats_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(stats_path, "w", encoding="utf-8") as f:
+            json.dump(stats.summary(), f, indent=2)
+        print(f"crawl stats written to {stats_path}")
+    if cache is not None:
+        print(f"cache hit rate: {cache.hit_rate:.1%} ({cache.hits} not modified)")
+    if checkpoint is not None:
+        print(
+            f"checkpoint: {checkpoint.records} records, "
+            + f"{checkpoint.bytes_written} bytes, {checkpoint.write_seconds:.3f}s"
+        )
+    if image_auditor is not None:
+        paths = write_image_report(image_auditor, DEFAULT_OUT)
+        print(
+            f"image audit: {len(image_auditor.images)} images, "
+            + f"written to {', '.join(map(str, paths))}"
+        )
+        for info in image_auditor.heaviest(HEAVIEST_IMAGES):
+            if info.size is not None:
+                print(f"  {info.size:>12,} {info.url}")
+    if link_checker is not None:
+        print(f"checking {len(link_checker.external)} external links")
+        _ = await link_checker.check(max_concurrency, host_policy, transport, retry)
+        path = write_link_check_report(
+            link_checker, Path(DEFAULT_OUT, LINK_CHECK_REPORT_FILENAME)
+        )
+        print(
+            f"link check: {len(link_checker.broken())} broken links, written to {path}"
+        )
+    if duplicates is not None:
+        path = write_duplicate_report(
+            duplicates, Path(DEFAULT_OUT, DUPLICATE_REPORT_FILENAME)
+        )
+        print(f"duplicates: {len(duplicates.clusters)} clusters, written to {path}")
+    if graph_builder is None:
+        return
+
+    graph = graph_builder.build()
+    if graph_dir is not None:
+        _ = write_link_graph(graph, graph_dir)
+        print(
+            f"link graph: {graph.num_nodes} pages, {graph.num_edges} links "
+            + f"written to {graph_dir}"
+        )
+    if analyze:
+        metrics = analyze_links(graph, canonicalizer.normalize(base_url))
+        path = write_link_report(
+            graph, metrics, Path(DEFAULT_OUT, LINK_REPORT_FILENAME)
+        )
+        print(f"link analysis: {len(metrics.orphans)} orphan pages, written to {path}")
+
+
+async def _crawl_batch(
+    reports: dict[str, ReportWriter],
+    max_concurrency: int,
+    max_pages: int,
+    site_concurrency: int,
+    parse_executor: ParseExecutor,
+    host_policy: HostPolicy,
+    stats_path: Path | None,
+    progress_interval: float,
+    transport: TransportConfig,
+    robots: bool,
+    sitemaps: bool,
+    order: CrawlOrder,
+    max_depth: int | None,
+    visited: VisitedMode,
+    canonical: CanonicalRules,
+    retry: RetryPolicy,
+):
+    stats = None
+    progress = None
+    if stats_path is not None or progress_interval > 0:
+        stats = CrawlStats()
+    if stats is not None and progress_interval > 0:
+        progress = asyncio.create_task(
+            report_progress(stats, progress_interval, _print_progress)
+        )
+
+    print(f"starting batch crawl of {len(reports)} sites")
+    started = time.monotonic()
+    try:
+        results = await crawl_batch(
+            reports,
+            max_concurrency,
+            max_pages,
+            site_concurrency,
+            parse_executor,
+            host_policy,
+            lambda base_url: [reports[base_url]],
+            store_pages=False,
+            stats=stats,
+            transport=transport,
+            robots=robots,
+            sitemaps=sitemaps,
+            order=order,
+            max_depth=max_depth,
+            visited=visited,
+            canonical=canonical,
+            retry=retry,
+        )
+    finally:
+        if progress is not None:
+            _ = progress.cancel()
+    print(f"batch crawl complete in {time.monotonic() - started:.1f}s")
+    combined = len(set(reports.values())) == 1
+    for result in results:
+        report = reports[result.base_url]
+        if result.error is not None:
+            print(f"  {result.base_url}: failed: {result.error}")
+        elif not combined:
+            print(f"  {result.base_url}: {report.rows} pages written to {report.path}")
+    if combined:
+        report = next(iter(reports.values()))
+        print(f"{report.rows} pages written to {report.path}")
+    if stats is not None and stats_path is not None:
+        stats_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(stats_path, "w", encoding="utf-8") as f:
+            json.dump(stats.summary(), f, indent=2)
+        print(f"crawl stats written to {stats_path}")
+
+
+def _read_seeds(path: Path) -> list[str]:
+    # one URL per line; blank lines and # comments are skipped
+    with open(path, encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        seeds = list(dict.fromkeys(line for line in lines if line and line[0] != "#"))
+    if not seeds:
+        raise typer.BadParameter(f"no seed URLs in {path}")
+    return seeds
+
 
+def _site_dir(base_url: str) -> str:
+    # out/<host and path>/ keeps each site's report apart
+    site = base_url.split("://", 1)[-1].rstrip("/")
+    return _UNSAFE_PATH_CHARS.sub("_", site)
 
-async def _crawl(base_url: str, max_concurrency: int, max_pages: int):
-    print(f"starting crawl of: {base_url}")
-    pages = await crawl_site_async(base_url, max_concurrency, max_pages)
-    print("crawl complete")
 
-    write_csv_report(pages)
+def _print_progress(snapshot: dict[str, object]) -> None:
+    print(json.dumps(snapshot), file=sys.stderr)
 
 
 def main():
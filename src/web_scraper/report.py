@@ -1,27 +1,89 @@
 import csv
-from .html_parse import PageData
+import gzip
+import json
+import time
+from enum import StrEnum
 from pathlib import Path
+from types import TracebackType
+from typing import Self, TextIO
+
+from .html_parse import PageData
 
 DEFAULT_OUT = "./out/"
+DEFAULT_FLUSH_INTERVAL = 1.0
 
+CSV_FIELDNAMES = [
+    "page_url",
+    "h1",
+    "first_paragraph",
+    "outgoing_link_urls",
+    "image_urls",
+    "error",
+]
 
-def write_csv_report(pages: dict[str, PageData], filename: str = "report.csv"):
-    filepath = Path(DEFAULT_OUT, filename)
-    filepath.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(filepath, "w", newline="", encoding="utf-8-sig") as csvfile:
-        fieldnames = [
-            "page_url",
-            "h1",
-            "first_paragraph",
-            "outgoing_link_urls",
-            "image_urls",
-        ]
-        writer = csv.DictWriter(csvfile, fieldnames)
-
-        writer.writeheader()
-        for url, page in pages.items():
-            writer.writerow(
+
+class ReportFormat(StrEnum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class ReportWriter:
+    """Writes report rows one page at a time as the crawl progresses.
+
+    Output is flushed at most every ``flush_interval`` seconds, so an
+    interrupted crawl still leaves every flushed row on disk. With ``compress``
+    the file is gzipped; each flush ends a deflate block, so the readable
+    prefix survives a crash as well.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        report_format: ReportFormat = ReportFormat.CSV,
+        compress: bool = False,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        self.path: Path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.format: ReportFormat = report_format
+        self.flush_interval: float = flush_interval
+        self.rows: int = 0
+        self._last_flush: float = time.monotonic()
+
+        # utf-8-sig keeps the CSV readable by spreadsheet software
+        encoding = "utf-8-sig" if report_format == ReportFormat.CSV else "utf-8"
+        newline = "" if report_format == ReportFormat.CSV else None
+        self.file: TextIO
+        if compress:
+            self.file = gzip.open(self.path, "wt", encoding=encoding, newline=newline)
+        else:
+            self.file = open(self.path, "w", encoding=encoding, newline=newline)
+
+        self._csv: csv.DictWriter[str] | None = None
+        if report_format == ReportFormat.CSV:
+            self._csv = csv.DictWriter(self.file, CSV_FIELDNAMES)
+            self._csv.writeheader()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def write(self, url: str, page: PageData) -> None:
+        """Append one page to the report.
+
+        Args:
+            url: Normalized URL of the page.
+            page: Data extracted from the page.
+        """
+        if self._csv is not None:
+            self._csv.writerow(
                 {
                     "page_url": url,
                     "h1": page["h1"],
@@ -30,3 +92,46 @@ def write_csv_report(pages: dict[str, PageData], filename: str = "report.csv"):
                     "image_urls": ";".join(page["image_urls"]),
                 }
             )
+        else:
+            _ = self.file.write(json.dumps({"page_url": url, **page}) + "\n")
+        self._wrote_row()
+
+    def write_failure(self, url: str, reason: str, broken: bool = True) -> None:
+        """Append a page that could not be crawled, with the reason why.
+
+        Args:
+            url: Normalized URL of the page.
+            reason: Why the page failed, such as ``HTTP 503`` or ``timeout``.
+            broken: Whether the URL itself is broken.
+        """
+        # every failure gets a row; its reason tells the kinds apart
+        del broken
+        if self._csv is not None:
+            self._csv.writerow({"page_url": url, "error": reason})
+        else:
+            row = {"page_url": url, "error": reason}
+            _ = self.file.write(json.dumps(row) + "\n")
+        self._wrote_row()
+
+    def _wrote_row(self) -> None:
+        self.rows += 1
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        self.file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def report_filename(report_format: ReportFormat, compress: bool = False) -> str:
+    """Return the default report filename for a format."""
+    return f"report.{report_format}" + (".gz" if compress else "")
+
+
+def write_csv_report(pages: dict[str, PageData], filename: str = "report.csv"):
+    with ReportWriter(Path(DEFAULT_OUT, filename)) as report:
+        for url, page in pages.items():
+            report.write(url, page)
@@ -0,0 +1,105 @@
+import asyncio
+import random
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import aiohttp
+
+from .scheduler import HostUnavailable
+
+RETRY_STATUSES = frozenset({408, 429})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How pages that failed with a transient error are retried.
+
+    A page is retried up to ``max_retries`` times. The n-th retry waits
+    between half and all of ``base_delay * 2**n`` seconds, capped at
+    ``max_delay``; the random part spreads out retries of pages that failed
+    together. Waiting pages do not hold a worker. A page deferred because
+    its host's circuit breaker is open waits for the breaker to close, and
+    that counts as a retry too, so a host that stays down cannot stall the
+    crawl.
+    """
+
+    max_retries: int = 2
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    def backoff(self, attempt: int) -> float:
+        """Return the delay before retry number attempt, counting from 0."""
+        delay = min(self.max_delay, self.base_delay * 2.0**attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+async def retrying[T](
+    policy: RetryPolicy,
+    request: Callable[[], Awaitable[T]],
+    deadline: float | None = None,
+) -> T:
+    """Await request(), calling it again after transient errors.
+
+    A request refused by an open circuit breaker is repeated once the breaker
+    closes, which does not count as a retry; it is given up only if the
+    breaker stays open past ``deadline``, a time on the event loop's clock.
+
+    Raises:
+        Exception: The last error, once it is not transient or retries run out.
+    """
+    loop = asyncio.get_running_loop()
+    attempt = 0
+    while True:
+        try:
+            return await request()
+        except HostUnavailable as e:
+            if deadline is not None and e.retry_at > deadline:
+                raise
+            await asyncio.sleep(max(e.retry_at - loop.time(), 0.0))
+        except Exception as e:
+            if attempt >= policy.max_retries or not is_transient(e):
+                raise
+            await asyncio.sleep(policy.backoff(attempt))
+            attempt += 1
+
+
+def is_transient(error: BaseException) -> bool:
+    """Return whether a fetch error may succeed if the request is repeated.
+
+    Server errors, 408 and 429 responses, timeouts, connection and payload
+    errors are transient; other client errors and content errors are not.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500 or error.status in RETRY_STATUSES
+    return isinstance(
+        error,
+        TimeoutError
+        | aiohttp.ClientConnectionError
+        | aiohttp.ClientPayloadError
+        | HostUnavailable,
+    )
+
+
+def is_broken(error: BaseException) -> bool:
+    """Return whether a failure means the URL itself is broken.
+
+    HTTP errors, transport errors and an open circuit breaker are; content
+    errors, such as a body that is not HTML or cannot be parsed, are not,
+    since the server did serve the URL.
+    """
+    if isinstance(error, aiohttp.ClientError | TimeoutError | HostUnavailable):
+        return True
+    return not isinstance(error, ValueError)
+
+
+def failure_reason(error: BaseException) -> str:
+    """Describe why a page could not be crawled, for the report."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return f"HTTP {error.status}"
+    if isinstance(error, TimeoutError):
+        return "timeout"
+    if isinstance(error, HostUnavailable | ValueError):
+        return str(error)
+    message = str(error)
+    name = type(error).__name__
+    return f"{name}: {message}" if message else name
@@ -0,0 +1,110 @@
+import logging
+import re
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# parsing may stop here; RFC 9309 requires crawlers to read at least 500 KiB
+MAX_ROBOTS_BYTES = 500 * 2**10
+
+
+class RobotsRules:
+    """Allow and disallow rules from robots.txt for one user agent.
+
+    Rules follow RFC 9309: a path is matched from its start, ``*`` matches
+    any run of characters and a trailing ``$`` anchors the end. The longest
+    matching rule decides, and allow wins a tie. All rules are compiled into
+    one regular expression whose alternatives are ordered longest first, so
+    checking a URL is a single match however many rules there are.
+    """
+
+    def __init__(
+        self, rules: list[tuple[bool, str]], sitemaps: list[str] | None = None
+    ) -> None:
+        self.sitemaps: list[str] = sitemaps or []
+        ordered = sorted(
+            ((allow, path) for allow, path in rules if path),
+            key=lambda rule: (-len(rule[1]), not rule[0]),
+        )
+        self._allows: list[bool] = [allow for allow, _ in ordered]
+        self._pattern: re.Pattern[str] | None = None
+        if ordered:
+            self._pattern = re.compile(
+                "|".join(f"({_translate(path)})" for _, path in ordered)
+            )
+
+    @classmethod
+    def disallow_all(cls) -> "RobotsRules":
+        return cls([(False, "/")])
+
+    def allowed(self, url: str) -> bool:
+        """Return whether the rules let the crawler fetch a URL."""
+        if self._pattern is None:
+            return True
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        match = self._pattern.match(path)
+        if match is None or match.lastindex is None:
+            return True
+        return self._allows[match.lastindex - 1]
+
+
+def _translate(path: str) -> str:
+    anchored = path.endswith("$")
+    if anchored:
+        path = path[:-1]
+    pattern = ".*".join(re.escape(part) for part in path.split("*"))
+    return pattern + "$" if anchored else pattern
+
+
+def parse_robots(text: str, user_agent: str) -> RobotsRules:
+    """Parse robots.txt, keeping the rules of the group that applies to us.
+
+    The group whose user-agent line is the longest substring of our product
+    token applies, falling back to ``*``; groups naming the same agent are
+    merged. ``Sitemap`` lines are collected whichever group they appear in.
+
+    Args:
+        text: Contents of robots.txt.
+        user_agent: Our User-Agent header; only its product token is matched.
+
+    Returns:
+        The rules for user_agent.
+    """
+    token = user_agent.split("/")[0].lower()
+    groups: dict[str, list[tuple[bool, str]]] = {}
+    sitemaps: list[str] = []
+    agents: list[str] = []
+    in_rules = False
+    for line in text.splitlines():
+        key, sep, value = line.split("#", 1)[0].partition(":")
+        if not sep:
+            continue
+        key = key.strip().lower()
+        value = value.strip()
+        if key == "user-agent":
+            if in_rules:
+                agents = []
+                in_rules = False
+            agents.append(value.lower())
+        elif key in ("allow", "disallow"):
+            in_rules = True
+            for agent in agents:
+                groups.setdefault(agent, []).append((key == "allow", value))
+        elif key == "sitemap" and value:
+            sitemaps.append(value)
+
+    matching = [agent for agent in groups if agent != "*" and agent in token]
+    if matching:
+        agent = max(matching, key=len)
+    else:
+        agent = "*"
+    return RobotsRules(groups.get(agent, []), sitemaps)
+
+
+def robots_url(base_url: str) -> str:
+    """Return the robots.txt URL for the origin of base_url."""
+    parts = urlsplit(base_url)
+    return f"{parts.scheme}://{parts.netloc}/robots.txt"
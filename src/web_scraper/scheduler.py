@@ -0,0 +1,231 @@
+import asyncio
+import logging
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+@dataclass(frozen=True)
+class HostPolicy:
+    """Politeness limits applied to every host independently.
+
+    Concurrency starts at ``initial_connections`` and follows AIMD: it grows by
+    one connection per window of fast, successful responses and is multiplied
+    by ``backoff`` on throttling, server errors, transport errors or responses
+    slower than ``target_latency``. ``requests_per_second`` of 0 disables
+    request pacing.
+
+    After ``breaker_threshold`` consecutive transport errors or server
+    errors, a host's circuit breaker opens: requests to it fail at once with
+    HostUnavailable for ``breaker_cooldown`` seconds instead of tying up
+    workers on a host that is down. Once the cooldown ends, requests go
+    through again, but one more failure reopens the breaker; a success
+    closes it. A ``breaker_threshold`` of 0 disables the breaker.
+    """
+
+    max_connections: int = 8
+    min_connections: int = 1
+    initial_connections: int = 2
+    requests_per_second: float = 0.0
+    target_latency: float = 2.0
+    backoff: float = 0.5
+    max_retry_after: float = 300.0
+    breaker_threshold: int = 5
+    breaker_cooldown: float = 30.0
+
+
+class HostUnavailable(Exception):
+    """Raised instead of requesting a host whose circuit breaker is open."""
+
+    def __init__(self, host: str, retry_at: float) -> None:
+        super().__init__(f"{host} unavailable: circuit breaker open")
+        self.host: str = host
+        self.retry_at: float = retry_at
+
+
+class _HostState:
+    def __init__(self, policy: HostPolicy) -> None:
+        self.limit: float = float(
+            min(policy.initial_connections, policy.max_connections)
+        )
+        self.active: int = 0
+        self.next_request: float = 0.0
+        self.blocked_until: float = 0.0
+        self.last_backoff: float = float("-inf")
+        self.failures: int = 0
+        self.open_until: float = 0.0
+        self.condition: asyncio.Condition = asyncio.Condition()
+
+
+class RequestSlot:
+    """A granted request to one host, reporting its outcome back to the scheduler."""
+
+    def __init__(self, scheduler: "HostScheduler", host: str, started: float) -> None:
+        self.scheduler: HostScheduler = scheduler
+        self.host: str = host
+        self.started: float = started
+        self.observed: bool = False
+
+    def observe(self, status: int, retry_after: str | None = None) -> None:
+        """Record the response status once headers have arrived.
+
+        Args:
+            status: HTTP status code of the response.
+            retry_after: Raw ``Retry-After`` header value, if any.
+        """
+        self.observed = True
+        self.scheduler.record(self.host, status, self.started, retry_after)
+
+
+class HostScheduler:
+    """Per-host connection limits, request pacing and adaptive concurrency."""
+
+    def __init__(self, policy: HostPolicy | None = None) -> None:
+        self.policy: HostPolicy = policy or HostPolicy()
+        self.hosts: dict[str, _HostState] = {}
+
+    def _state(self, host: str) -> _HostState:
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = _HostState(self.policy)
+        return state
+
+    def limit(self, host: str) -> int:
+        """Return the current concurrency limit for a host."""
+        return int(self._state(host).limit)
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncGenerator[RequestSlot]:
+        """Wait for permission to request url, and release it afterwards.
+
+        Requests that raise before ``RequestSlot.observe`` is called count as
+        transport errors and reduce the host's concurrency.
+
+        Args:
+            url: URL about to be requested; its host selects the limits.
+
+        Yields:
+            RequestSlot used to report the response status.
+
+        Raises:
+            HostUnavailable: If the host's circuit breaker is open.
+        """
+        host = urlsplit(url).hostname or ""
+        state = self._state(host)
+        loop = asyncio.get_running_loop()
+        self._check_breaker(host, state, loop.time())
+
+        async with state.condition:
+            _ = await state.condition.wait_for(lambda: state.active < int(state.limit))
+            state.active += 1
+
+        try:
+            now = loop.time()
+            # the breaker may have opened while this request was waiting
+            self._check_breaker(host, state, now)
+            start_at = max(now, state.next_request, state.blocked_until)
+            if self.policy.requests_per_second > 0:
+                state.next_request = start_at + 1 / self.policy.requests_per_second
+            if start_at > now:
+                await asyncio.sleep(start_at - now)
+
+            slot = RequestSlot(self, host, loop.time())
+            try:
+                yield slot
+            except Exception:
+                if not slot.observed:
+                    self.record(host, None, slot.started, None)
+                raise
+        finally:
+            async with state.condition:
+                state.active -= 1
+                state.condition.notify_all()
+
+    def _check_breaker(self, host: str, state: _HostState, now: float) -> None:
+        if state.open_until > now:
+            raise HostUnavailable(host, state.open_until)
+
+    def record(
+        self,
+        host: str,
+        status: int | None,
+        started: float,
+        retry_after: str | None,
+    ) -> None:
+        """Adjust a host's concurrency from one observed response.
+
+        Only one backoff is applied per round of requests: responses to
+        requests sent before the last backoff do not shrink the limit again.
+
+        Args:
+            host: Host the request went to.
+            status: HTTP status, or None if the request failed without one.
+            started: Loop time at which the request was sent.
+            retry_after: Raw ``Retry-After`` header value, if any.
+        """
+        policy = self.policy
+        state = self._state(host)
+        previous = int(state.limit)
+        now = asyncio.get_running_loop().time()
+
+        if status in THROTTLE_STATUSES and retry_after:
+            delay = _parse_retry_after(retry_after)
+            if delay is not None:
+                delay = min(delay, policy.max_retry_after)
+                resume = now + delay
+                state.blocked_until = max(state.blocked_until, resume)
+                logger.info("%s asked us to wait %.1fs", host, delay)
+
+        healthy = status is not None and status < 500 and status != 429
+        self._update_breaker(host, state, status is None or status >= 500, now)
+        if healthy and now - started <= policy.target_latency:
+            state.limit = min(
+                float(policy.max_connections), state.limit + 1 / state.limit
+            )
+        elif started >= state.last_backoff:
+            state.last_backoff = now
+            state.limit = max(
+                float(policy.min_connections), state.limit * policy.backoff
+            )
+
+        if int(state.limit) != previous:
+            logger.debug("%s concurrency %d -> %d", host, previous, int(state.limit))
+
+    def _update_breaker(
+        self, host: str, state: _HostState, failed: bool, now: float
+    ) -> None:
+        threshold = self.policy.breaker_threshold
+        if not failed:
+            state.failures = 0
+            return
+
+        state.failures += 1
+        if threshold and state.failures >= threshold and state.open_until <= now:
+            state.open_until = now + self.policy.breaker_cooldown
+            logger.warning(
+                "%s failed %d times in a row, pausing it for %.0fs",
+                host,
+                state.failures,
+                self.policy.breaker_cooldown,
+            )
+
+
+def _parse_retry_after(value: str) -> float | None:
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        when = parsedate_to_datetime(value)
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max(0.0, (when - datetime.now(UTC)).total_seconds())
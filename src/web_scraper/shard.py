@@ -0,0 +1,424 @@
+import asyncio
+import hashlib
+import logging
+import math
+import multiprocessing
+import queue
+from collections.abc import Sequence
+from dataclasses import replace
+from multiprocessing.context import SpawnContext, SpawnProcess
+from multiprocessing.queues import Queue
+from multiprocessing.sharedctypes import Synchronized
+from typing import NamedTuple, TypeAlias, override
+
+from .canonical import CanonicalRules, Canonicalizer
+from .crawl import AsyncCrawler, FailureSink, PageSink, Pages, ParseExecutor
+from .frontier import CrawlOrder, Frontier, QueuedUrl
+from .html_parse import PageData
+from .pagestore import PageStore
+from .retry import RetryPolicy
+from .scheduler import HostPolicy
+from .stats import CrawlStats
+from .transport import TransportConfig
+from .visited import VisitedMode, VisitedSet, make_visited_set
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.05
+
+# links routed to a shard, with their click depth; None ends the crawl
+_Batch: TypeAlias = tuple[int, list[str]] | None
+
+
+def shard_of(normalized: str, shards: int) -> int:
+    """Return the shard that owns a normalized URL.
+
+    Uses a stable hash so every process agrees on the owner; the builtin
+    ``hash()`` is randomized per process.
+    """
+    digest = hashlib.blake2b(normalized.encode(), digest_size=8).digest()
+    return int.from_bytes(digest) % shards
+
+
+class CrawlBudget:
+    """Crawl-wide counters shared by all shard processes.
+
+    ``admitted`` counts URLs admitted to any shard's frontier and enforces
+    ``max_pages`` globally. ``outstanding`` counts work not yet finished:
+    admitted pages not yet crawled plus link batches routed to a shard but
+    not yet processed. Work is always counted before the work that produced
+    it is released, so the crawl is finished exactly when it reaches zero.
+    """
+
+    def __init__(self, ctx: SpawnContext, max_pages: int) -> None:
+        self.max_pages: int = max_pages
+        self.admitted: Synchronized[int] = ctx.Value("q", 0)
+        self.outstanding: Synchronized[int] = ctx.Value("q", 0)
+
+    @property
+    def full(self) -> bool:
+        return self.admitted.value >= self.max_pages
+
+    def admit(self) -> bool:
+        """Reserve one page of the budget, returning False once it is spent."""
+        with self.admitted.get_lock():
+            if self.admitted.value >= self.max_pages:
+                return False
+            self.admitted.value += 1
+        self.add_outstanding(1)
+        return True
+
+    def add_outstanding(self, n: int) -> None:
+        with self.outstanding.get_lock():
+            self.outstanding.value += n
+
+
+class ShardFrontier(Frontier):
+    """Frontier of one shard, drawing admissions from the shared CrawlBudget."""
+
+    def __init__(
+        self,
+        base_url: str,
+        budget: CrawlBudget,
+        order: CrawlOrder = CrawlOrder.BFS,
+        max_depth: int | None = None,
+        visited: VisitedMode = VisitedMode.FINGERPRINT,
+        canonicalizer: Canonicalizer | None = None,
+    ) -> None:
+        super().__init__(
+            base_url,
+            budget.max_pages,
+            order,
+            max_depth,
+            visited,
+            canonicalizer,
+        )
+        self.budget: CrawlBudget = budget
+
+    @property
+    @override
+    def full(self) -> bool:
+        return self.budget.full
+
+    @override
+    def _admit(self) -> bool:
+        return self.budget.admit()
+
+
+class _PageResult(NamedTuple):
+    url: str
+    page: PageData
+
+
+class _PageFailure(NamedTuple):
+    url: str
+    reason: str
+    broken: bool
+
+
+class _ShardDone(NamedTuple):
+    shard: int
+    stats: CrawlStats | None
+    error: str | None
+
+
+_Message: TypeAlias = _PageResult | _PageFailure | _ShardDone
+
+
+class _ResultSink:
+    def __init__(self, results: Queue[_Message]) -> None:
+        self.results: Queue[_Message] = results
+
+    def write(self, url: str, page: PageData) -> None:
+        self.results.put(_PageResult(url, page))
+
+    def write_failure(self, url: str, reason: str, broken: bool = True) -> None:
+        self.results.put(_PageFailure(url, reason, broken))
+
+
+class ShardCrawler(AsyncCrawler):
+    """Crawler for the URLs of one shard.
+
+    Discovered links owned by other shards are sent to their inboxes in one
+    batch per page and owner; each URL is sent at most once per shard, as
+    tracked by a visited set of the crawl's ``visited`` mode. The crawl ends
+    when the coordinator puts None in the inbox.
+    """
+
+    def __init__(
+        self,
+        shard: int,
+        base_url: str,
+        max_concurrency: int,
+        budget: CrawlBudget,
+        inboxes: Sequence[Queue[_Batch]],
+        results: Queue[_Message],
+        host_policy: HostPolicy | None = None,
+        stats: CrawlStats | None = None,
+        transport: TransportConfig | None = None,
+        order: CrawlOrder = CrawlOrder.BFS,
+        max_depth: int | None = None,
+        visited: VisitedMode = VisitedMode.FINGERPRINT,
+        canonical: CanonicalRules | None = None,
+        retry: RetryPolicy | None = None,
+    ) -> None:
+        super().__init__(
+            base_url,
+            max_concurrency,
+            budget.max_pages,
+            ParseExecutor.INLINE,
+            host_policy,
+            sinks=[_ResultSink(results)],
+            store_pages=False,
+            stats=stats,
+            transport=transport,
+            visited=visited,
+            canonical=canonical,
+            retry=retry,
+        )
+        self.shard: int = shard
+        self.budget: CrawlBudget = budget
+        self.frontier: Frontier = ShardFrontier(
+            base_url, budget, order, max_depth, visited, self.canonicalizer
+        )
+        self.inboxes: Sequence[Queue[_Batch]] = inboxes
+        self.routed: VisitedSet = make_visited_set(visited, budget.max_pages)
+
+    @override
+    def _enqueue(self, urls: list[str], depth: int = 0) -> None:
+        max_depth = self.frontier.max_depth
+        if max_depth is not None and depth > max_depth:
+            return
+        local: list[str] = []
+        remote: dict[int, list[str]] = {}
+        for url in urls:
+            if self.budget.full:
+                break
+            if not url.startswith(self.base_url):
+                continue
+            normalized = self.canonicalizer.normalize(url)
+            owner = shard_of(normalized, len(self.inboxes))
+            if owner == self.shard:
+                local.append(url)
+            elif normalized not in self.routed:
+                self.routed.add(normalized)
+                remote.setdefault(owner, []).append(url)
+
+        super()._enqueue(local, depth)
+        for owner, batch in remote.items():
+            self.budget.add_outstanding(1)
+            self.inboxes[owner].put((depth, batch))
+
+    @override
+    async def _crawl_page(self, queued: QueuedUrl) -> bool:
+        # a page waiting for a retry is still outstanding
+        finished = True
+        try:
+            finished = await super()._crawl_page(queued)
+        finally:
+            if finished:
+                self.budget.add_outstanding(-1)
+        return finished
+
+    @override
+    async def crawl(self) -> Pages:
+        loop = asyncio.get_running_loop()
+        inbox = self.inboxes[self.shard]
+        workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)
+        ]
+        while (batch := await loop.run_in_executor(None, inbox.get)) is not None:
+            super()._enqueue(batch[1], batch[0])
+            self.budget.add_outstanding(-1)
+
+        for w in workers:
+            _ = w.cancel()
+        return self.pages
+
+
+def _run_shard(
+    shard: int,
+    base_url: str,
+    max_concurrency: int,
+    budget: CrawlBudget,
+    inboxes: Sequence[Queue[_Batch]],
+    results: Queue[_Message],
+    host_policy: HostPolicy,
+    collect_stats: bool,
+    transport: TransportConfig | None,
+    order: CrawlOrder,
+    max_depth: int | None,
+    visited: VisitedMode,
+    canonical: CanonicalRules | None,
+    retry: RetryPolicy | None,
+) -> None:
+    stats = CrawlStats() if collect_stats else None
+
+    async def run() -> None:
+        async with ShardCrawler(
+            shard,
+            base_url,
+            max_concurrency,
+            budget,
+            inboxes,
+            results,
+            host_policy,
+            stats,
+            transport,
+            order,
+            max_depth,
+            visited,
+            canonical,
+            retry,
+        ) as crawler:
+            _ = await crawler.crawl()
+
+    try:
+        asyncio.run(run())
+    except Exception as e:
+        results.put(_ShardDone(shard, None, repr(e)))
+        raise
+    results.put(_ShardDone(shard, stats, None))
+
+
+def crawl_sharded(
+    base_url: str,
+    workers: int,
+    max_concurrency: int,
+    max_pages: int,
+    host_policy: HostPolicy | None = None,
+    sinks: Sequence[PageSink] = (),
+    store_pages: bool = True,
+    stats: CrawlStats | None = None,
+    transport: TransportConfig | None = None,
+    order: CrawlOrder = CrawlOrder.BFS,
+    max_depth: int | None = None,
+    visited: VisitedMode = VisitedMode.FINGERPRINT,
+    canonical: CanonicalRules | None = None,
+    retry: RetryPolicy | None = None,
+) -> PageStore:
+    """Crawl a website with one process and event loop per shard.
+
+    Each normalized URL is owned by one shard, chosen by hash, which alone
+    queues and fetches it, so deduplication stays global. ``max_pages`` is
+    enforced across all shards through a shared counter. Shards parse
+    inline, since each already has a core to itself. Concurrency, per-host
+    connections and request rate are split evenly between shards, so
+    politeness limits still hold for the crawl as a whole.
+
+    Pages are streamed back to this process, which alone writes the sinks,
+    so results merge into one report.
+
+    Args:
+        base_url: URL to start crawling from.
+        workers: Number of shard processes.
+        max_concurrency: Maximum concurrent requests across all shards.
+        max_pages: Maximum pages to crawl across all shards.
+        host_policy: Per-host limits for the crawl as a whole.
+        sinks: Consumers fed with each page as it arrives from a shard.
+        store_pages: Whether to also return pages in memory.
+        stats: Collector into which every shard's stats are merged.
+        transport: Connection settings used by every shard.
+        order: Crawl order within each shard.
+        max_depth: Maximum click depth from base_url to crawl.
+        visited: How each shard's seen and routed URLs are stored.
+        canonical: Rules reducing URLs to the keys pages are deduplicated
+            and reported under.
+        retry: How pages that fail with transient errors are retried.
+
+    Returns:
+        PageStore mapping normalized URLs to their extracted PageData.
+
+    Raises:
+        RuntimeError: If a shard process fails.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    budget = CrawlBudget(ctx, max_pages)
+    inboxes: list[Queue[_Batch]] = [ctx.Queue() for _ in range(workers)]
+    results: Queue[_Message] = ctx.Queue()
+
+    policy = host_policy or HostPolicy()
+    shard_policy = replace(
+        policy,
+        max_connections=math.ceil(policy.max_connections / workers),
+        requests_per_second=policy.requests_per_second / workers,
+    )
+    processes: list[SpawnProcess] = [
+        ctx.Process(
+            target=_run_shard,
+            args=(
+                shard,
+                base_url,
+                math.ceil(max_concurrency / workers),
+                budget,
+                inboxes,
+                results,
+                shard_policy,
+                stats is not None,
+                transport,
+                order,
+                max_depth,
+                visited,
+                canonical,
+                retry,
+            ),
+            daemon=True,
+        )
+        for shard in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    budget.add_outstanding(1)
+    owner = shard_of(Canonicalizer(canonical).normalize(base_url), workers)
+    inboxes[owner].put((0, [base_url]))
+
+    pages = PageStore()
+    finished = 0
+    stopping = False
+    try:
+        while finished < workers:
+            try:
+                message = results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if not stopping and budget.outstanding.value == 0:
+                    stopping = True
+                    for inbox in inboxes:
+                        inbox.put(None)
+                for process in processes:
+                    if process.exitcode not in (None, 0):
+                        raise RuntimeError(f"shard exited with {process.exitcode}")
+                continue
+
+            if isinstance(message, _ShardDone):
+                if message.error is not None:
+                    raise RuntimeError(f"shard {message.shard} failed: {message.error}")
+                if stats is not None and message.stats is not None:
+                    stats.merge(message.stats)
+                finished += 1
+                continue
+
+            if isinstance(message, _PageFailure):
+                if store_pages:
+                    pages.add(message.url, None)
+                for sink in sinks:
+                    if isinstance(sink, FailureSink):
+                        sink.write_failure(message.url, message.reason, message.broken)
+                continue
+
+            if store_pages:
+                pages.add(message.url, message.page)
+            for sink in sinks:
+                sink.write(message.url, message.page)
+    finally:
+        for process in processes:
+            if finished < workers:
+                process.kill()
+            process.join()
+
+    if budget.full:
+        print("Reached maximum number of pages to crawl.")
+    logger.info(
+        "sharded crawl: %d pages over %d shards", budget.admitted.value, workers
+    )
+    return pages
@@ -0,0 +1,123 @@
+import logging
+import zlib
+from collections.abc import Callable
+from typing import NamedTuple, cast
+from xml.etree.ElementTree import Element, XMLPullParser
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# the sitemap protocol caps a sitemap at 50 MiB uncompressed
+MAX_SITEMAP_BYTES = 50 * 2**20
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class SitemapUrl(NamedTuple):
+    url: str
+    priority: float | None = None
+
+
+class SitemapParser:
+    """Incremental parser for sitemaps and sitemap indexes.
+
+    Bytes are fed as they arrive; a gzipped body is detected by its magic
+    number and decompressed on the fly, whatever the Content-Type says.
+    Elements are cleared as soon as they are read, so memory stays
+    proportional to the URLs found rather than the document. Pages from a
+    ``urlset`` are collected in ``urls`` and child sitemaps from a
+    ``sitemapindex`` in ``sitemaps``.
+    """
+
+    def __init__(self, max_bytes: int = MAX_SITEMAP_BYTES) -> None:
+        self.urls: list[SitemapUrl] = []
+        self.sitemaps: list[str] = []
+        self.max_bytes: int = max_bytes
+        self.size: int = 0
+        self._xml: XMLPullParser[Element] = XMLPullParser(events=("end",))
+        self._gunzip: Callable[[bytes, int], bytes] | None = None
+        self._started: bool = False
+
+    @property
+    def full(self) -> bool:
+        return self.size >= self.max_bytes
+
+    def feed(self, data: bytes) -> None:
+        """Parse the next chunk of the body.
+
+        Raises:
+            xml.etree.ElementTree.ParseError: If the document is malformed.
+            zlib.error: If a gzipped body is corrupt.
+        """
+        if not self._started:
+            self._started = True
+            if data.startswith(GZIP_MAGIC):
+                self._gunzip = zlib.decompressobj(wbits=31).decompress
+        if self._gunzip is not None:
+            # bounded output, so a small gzip bomb cannot exhaust memory
+            data = self._gunzip(data, self.max_bytes - self.size + 1)
+        if self.size + len(data) > self.max_bytes:
+            data = data[: self.max_bytes - self.size]
+        self.size += len(data)
+        self._xml.feed(data)
+        self._collect()
+
+    def close(self) -> None:
+        if not self.full:
+            self._xml.close()
+            self._collect()
+
+    def _collect(self) -> None:
+        for event in self._xml.read_events():
+            # only "end" events are requested, and they carry elements
+            element = cast(Element, event[-1])
+            tag = _local_name(element.tag)
+            if tag not in ("url", "sitemap"):
+                continue
+            loc = ""
+            priority = None
+            for child in element:
+                match _local_name(child.tag):
+                    case "loc":
+                        loc = (child.text or "").strip()
+                    case "priority":
+                        priority = _parse_priority(child.text)
+                    case _:
+                        pass
+            element.clear()
+            if not loc:
+                continue
+            if tag == "url":
+                self.urls.append(SitemapUrl(loc, priority))
+            else:
+                self.sitemaps.append(loc)
+
+
+def _local_name(tag: str) -> str:
+    return tag.rpartition("}")[2]
+
+
+def _parse_priority(text: str | None) -> float | None:
+    try:
+        return min(max(float(text or ""), 0.0), 1.0)
+    except ValueError:
+        return None
+
+
+async def read_sitemap(
+    r: aiohttp.ClientResponse,
+    chunk_size: int,
+    max_bytes: int = MAX_SITEMAP_BYTES,
+) -> SitemapParser:
+    """Stream a sitemap response through a SitemapParser.
+
+    Reading stops at ``max_bytes`` of XML, keeping the entries parsed so far.
+    """
+    parser = SitemapParser(max_bytes)
+    async for chunk in r.content.iter_chunked(chunk_size):
+        parser.feed(chunk)
+        if parser.full:
+            logger.warning("truncated sitemap %s at %d bytes", r.url, max_bytes)
+            break
+    parser.close()
+    return parser
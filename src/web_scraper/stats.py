@@ -0,0 +1,322 @@
+import asyncio
+import math
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable, MutableSequence
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import cast
+
+import aiohttp
+
+from .html_parse import PageData, extract_page_data
+
+BUCKETS_PER_OCTAVE = 16
+MIN_BUCKET = -30 * BUCKETS_PER_OCTAVE  # about one nanosecond
+
+# in the order a page passes through them; "page" spans dequeue to stored
+STAGES = (
+    "queue_wait",
+    "host_wait",
+    "pool_wait",
+    "dns",
+    "connect",
+    "ttfb",
+    "download",
+    "fetch",
+    "parse",
+    "page",
+)
+
+
+class Histogram:
+    """Latency histogram with logarithmic buckets.
+
+    Every power of two is split into ``BUCKETS_PER_OCTAVE`` buckets, so
+    quantiles are within about 2% of the true value while memory stays
+    bounded regardless of how many samples are recorded.
+    """
+
+    def __init__(self) -> None:
+        self.buckets: Counter[int] = Counter()
+        self.count: int = 0
+        self.total: float = 0.0
+        self.min: float = math.inf
+        self.max: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        seconds = max(seconds, 0.0)
+        bucket = MIN_BUCKET
+        if seconds > 0:
+            bucket = max(math.floor(math.log2(seconds) * BUCKETS_PER_OCTAVE), bucket)
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "Histogram") -> None:
+        """Add the samples of another histogram to this one."""
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, quantile: float) -> float:
+        """Return the nearest-rank quantile, with quantile between 0 and 1."""
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(quantile * self.count), 1)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                value = 2 ** ((bucket + 0.5) / BUCKETS_PER_OCTAVE)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> dict[str, float]:
+        """Count, total and mean, min, p50, p90, p99 and max in seconds."""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count,
+            "min": self.min,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+        }
+
+
+@dataclass
+class CrawlStats:
+    """Timings and counters collected while a crawl runs.
+
+    ``stages`` holds one latency histogram per entry in ``STAGES``. The
+    network stages come from aiohttp tracing (see ``trace_config``) and are
+    only recorded for requests that actually perform them; for example
+    ``dns`` and ``connect`` are skipped when a pooled connection is reused.
+    ``parse_cpu_seconds`` is the CPU time spent extracting page data,
+    wherever the parse executor ran it, and ``bytes_received`` counts HTML
+    body bytes after decompression.
+    """
+
+    pages: int = 0
+    failures: int = 0
+    parse_cpu_seconds: float = 0.0
+    bytes_received: int = 0
+    status_codes: Counter[int] = field(default_factory=Counter[int])
+    counters: Counter[str] = field(default_factory=Counter[str])
+    stages: dict[str, Histogram] = field(
+        default_factory=lambda: {stage: Histogram() for stage in STAGES}
+    )
+    started: float = field(default_factory=time.monotonic)
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.stages[stage].record(seconds)
+
+    def merge(self, other: "CrawlStats") -> None:
+        """Fold in the stats of another crawl, such as one shard of a crawl."""
+        self.pages += other.pages
+        self.failures += other.failures
+        self.parse_cpu_seconds += other.parse_cpu_seconds
+        self.bytes_received += other.bytes_received
+        self.status_codes.update(other.status_codes)
+        self.counters.update(other.counters)
+        for stage, hist in other.stages.items():
+            self.stages[stage].merge(hist)
+
+    def latency(self, quantile: float, stage: str = "page") -> float:
+        """Return the given quantile of a stage's latency in seconds."""
+        return self.stages[stage].quantile(quantile)
+
+    def snapshot(self) -> dict[str, object]:
+        """Small progress summary, cheap enough to take every few seconds."""
+        elapsed = time.monotonic() - self.started
+        return {
+            "elapsed": round(elapsed, 3),
+            "pages": self.pages,
+            "failures": self.failures,
+            "queued": self.counters["queued"],
+            "pages_per_second": round(self.pages / elapsed, 2) if elapsed else 0.0,
+            "bytes_received": self.bytes_received,
+            "p50_page": round(self.latency(0.5), 4),
+            "p99_page": round(self.latency(0.99), 4),
+        }
+
+    def summary(self) -> dict[str, object]:
+        """Full JSON-serializable summary of the crawl so far."""
+        return {
+            **self.snapshot(),
+            "parse_cpu_seconds": self.parse_cpu_seconds,
+            "status_codes": {
+                str(code): n for code, n in sorted(self.status_codes.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "stages": {name: hist.summary() for name, hist in self.stages.items()},
+        }
+
+
+def timed_extract(html: str, page_url: str) -> tuple[PageData, float]:
+    """Run extract_page_data and also return the CPU time it took.
+
+    Defined at module level so process pool workers can unpickle it; the
+    thread CPU clock is used so concurrent parses in a thread pool are not
+    counted against each other.
+    """
+    start = time.thread_time()
+    data = extract_page_data(html, page_url)
+    return data, time.thread_time() - start
+
+
+class _RequestTimes(SimpleNamespace):
+    def __init__(self, trace_request_ctx: object = None) -> None:
+        super().__init__()
+        self.pool_wait: float = 0.0
+        self.dns: float = 0.0
+        self.connect: float = 0.0
+        self.headers_sent: float = 0.0
+
+
+def _connect(signal: object, callback: Callable[..., Awaitable[None]]) -> None:
+    # aiohttp annotates its trace signals against an older aiosignal API, so
+    # the declared element type does not match real callbacks
+    cast(MutableSequence[Callable[..., Awaitable[None]]], signal).append(callback)
+
+
+def trace_config(stats: CrawlStats) -> aiohttp.TraceConfig:
+    """Build an aiohttp TraceConfig that records network stages into stats.
+
+    ``connect`` includes DNS resolution when the connection needed it, and
+    ``ttfb`` runs from the request headers being sent to the response
+    headers arriving.
+    """
+    config = aiohttp.TraceConfig(trace_config_ctx_factory=_RequestTimes)
+
+    def times(ctx: SimpleNamespace) -> _RequestTimes:
+        return cast(_RequestTimes, ctx)
+
+    async def on_request_start(
+        _session: aiohttp.ClientSession,
+        _ctx: SimpleNamespace,
+        _params: aiohttp.TraceRequestStartParams,
+    ) -> None:
+        stats.counters["requests"] += 1
+
+    async def on_connection_queued_start(
+        _session: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        _params: aiohttp.TraceConnectionQueuedStartParams,
+    ) -> None:
+        times(ctx).pool_wait = time.monotonic()
+
+    async def on_connection_queued_end(
+        _session: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        _params: aiohttp.TraceConnectionQueuedEndParams,
+    ) -> None:
+        stats.record("pool_wait", time.monotonic() - times(ctx).pool_wait)
+
+    async def on_connection_create_start(
+        _session: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        _params: aiohttp.TraceConnectionCreateStartParams,
+    ) -> None:
+        times(ctx).connect = time.monotonic()
+
+    async def on_connection_create_end(
+        _session: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        _params: aiohttp.TraceConnectionCreateEndParams,
+    ) -> None:
+        stats.counters["connections_created"] += 1
+        stats.record("connect", time.monotonic() - times(ctx).connect)
+
+    async def on_connection_reuseconn(
+        _session: aiohttp.ClientSession,
+        _ctx: SimpleNamespace,
+        _params: aiohttp.TraceConnectionReuseconnParams,
+    ) -> None:
+        stats.counters["connections_reused"] += 1
+
+    async def on_dns_resolvehost_start(
+        _session: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        _params: aiohttp.TraceDnsResolveHostStartParams,
+    ) -> None:
+        times(ctx).dns = time.monotonic()
+
+    async def on_dns_resolvehost_end(
+        _session: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        _params: aiohttp.TraceDnsResolveHostEndParams,
+    ) -> None:
+        stats.record("dns", time.monotonic() - times(ctx).dns)
+
+    async def on_dns_cache_hit(
+        _session: aiohttp.ClientSession,
+        _ctx: SimpleNamespace,
+        _params: aiohttp.TraceDnsCacheHitParams,
+    ) -> None:
+        stats.counters["dns_cache_hits"] += 1
+
+    async def on_request_headers_sent(
+        _session: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        _params: aiohttp.TraceRequestHeadersSentParams,
+    ) -> None:
+        times(ctx).headers_sent = time.monotonic()
+
+    async def on_request_end(
+        _session: aiohttp.ClientSession,
+        ctx: SimpleNamespace,
+        params: aiohttp.TraceRequestEndParams,
+    ) -> None:
+        stats.status_codes[params.response.status] += 1
+        if times(ctx).headers_sent:
+            stats.record("ttfb", time.monotonic() - times(ctx).headers_sent)
+
+    async def on_request_redirect(
+        _session: aiohttp.ClientSession,
+        _ctx: SimpleNamespace,
+        _params: aiohttp.TraceRequestRedirectParams,
+    ) -> None:
+        stats.counters["redirects"] += 1
+
+    async def on_request_exception(
+        _session: aiohttp.ClientSession,
+        _ctx: SimpleNamespace,
+        params: aiohttp.TraceRequestExceptionParams,
+    ) -> None:
+        stats.counters["exceptions." + type(params.exception).__name__] += 1
+
+    _connect(config.on_request_start, on_request_start)
+    _connect(config.on_connection_queued_start, on_connection_queued_start)
+    _connect(config.on_connection_queued_end, on_connection_queued_end)
+    _connect(config.on_connection_create_start, on_connection_create_start)
+    _connect(config.on_connection_create_end, on_connection_create_end)
+    _connect(config.on_connection_reuseconn, on_connection_reuseconn)
+    _connect(config.on_dns_resolvehost_start, on_dns_resolvehost_start)
+    _connect(config.on_dns_resolvehost_end, on_dns_resolvehost_end)
+    _connect(config.on_dns_cache_hit, on_dns_cache_hit)
+    _connect(config.on_request_headers_sent, on_request_headers_sent)
+    _connect(config.on_request_end, on_request_end)
+    _connect(config.on_request_redirect, on_request_redirect)
+    _connect(config.on_request_exception, on_request_exception)
+    config.freeze()
+    return config
+
+
+async def report_progress(
+    stats: CrawlStats,
+    interval: float,
+    emit: Callable[[dict[str, object]], None],
+) -> None:
+    """Call emit with a stats snapshot every interval seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        emit(stats.snapshot())
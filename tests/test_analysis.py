@@ -0,0 +1,74 @@
+import csv
+import random
+import tempfile
+import unittest
+from array import array
+from pathlib import Path
+
+from web_scraper.analysis import analyze_links, edge_list, pagerank, write_link_report
+from web_scraper.graph import LinkGraph
+
+
+def make_graph(adjacency: list[list[int]]) -> LinkGraph:
+    offsets = array("q", [0])
+    targets = array("i")
+    for links in adjacency:
+        targets.extend(links)
+        offsets.append(len(targets))
+    return LinkGraph([f"site/{i}" for i in range(len(adjacency))], offsets, targets)
+
+
+def reference_pagerank(adjacency: list[list[int]], damping: float = 0.85):
+    n = len(adjacency)
+    links = [
+        [t for t in targets if t != node] for node, targets in enumerate(adjacency)
+    ]
+    rank = [1 / n] * n
+    for _ in range(200):
+        dangling = sum(rank[node] for node in range(n) if not links[node])
+        new = [(1 - damping + damping * dangling) / n] * n
+        for node, targets in enumerate(links):
+            for target in targets:
+                new[target] += damping * rank[node] / len(targets)
+        rank = new
+    return rank
+
+
+class TestLinkAnalysis(unittest.TestCase):
+    def test_metrics(self):
+        # 0 -> 1, 2; 1 -> 0, 1 (self-link); 2 -> 3; 3 dead end; 4 unreachable
+        graph = make_graph([[1, 2], [0, 1], [3], [], [3]])
+        metrics = analyze_links(graph, "site/0")
+
+        self.assertEqual(list(metrics.inlinks), [1, 1, 1, 2, 0])
+        self.assertEqual(list(metrics.depth), [0, 1, 1, 2, -1])
+        self.assertEqual(metrics.orphans, [4])
+        self.assertAlmostEqual(sum(metrics.pagerank), 1.0)
+
+    def test_root_is_not_an_orphan(self):
+        metrics = analyze_links(make_graph([[1], []]), "site/0")
+        self.assertEqual(metrics.orphans, [])
+
+    def test_pagerank_matches_reference(self):
+        rng = random.Random(7)
+        adjacency = [rng.sample(range(60), rng.randint(0, 8)) for _ in range(60)]
+        ranks = pagerank(edge_list(make_graph(adjacency)))
+        for got, want in zip(ranks, reference_pagerank(adjacency)):
+            self.assertAlmostEqual(got, want, places=9)
+
+    def test_empty_graph(self):
+        metrics = analyze_links(make_graph([]), "site/0")
+        self.assertEqual(len(metrics.pagerank), 0)
+        self.assertEqual(metrics.orphans, [])
+
+    def test_write_link_report(self):
+        graph = make_graph([[1], [], []])
+        metrics = analyze_links(graph, "site/0")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_link_report(graph, metrics, Path(tmp, "links.csv"))
+            with open(path, encoding="utf-8-sig", newline="") as f:
+                rows = list(csv.DictReader(f))
+
+        self.assertEqual([row["page_url"] for row in rows], graph.urls)
+        self.assertEqual([row["click_depth"] for row in rows], ["0", "1", ""])
+        self.assertEqual([row["orphan"] for row in rows], ["False", "False", "True"])
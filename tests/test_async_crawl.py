@@ -0,0 +1,652 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import tempfile
+import unittest
+from collections.abc import Mapping
+from contextlib import aclosing
+from pathlib import Path
+from typing import cast
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from tests.helpers import serve
+from web_scraper.cache import ResponseCache
+from web_scraper.canonical import CanonicalRules
+from web_scraper.checkpoint import Checkpoint
+from web_scraper.crawl import AsyncCrawler, ParseExecutor, crawl_site_async
+from web_scraper.dedup import DuplicateDetector, write_duplicate_report
+from web_scraper.html_parse import PageData
+from web_scraper.report import ReportFormat, ReportWriter
+from web_scraper.retry import RetryPolicy
+from web_scraper.stats import STAGES, CrawlStats
+from web_scraper.transport import TransportConfig
+
+SITE = {
+    "/": "<h1>Home</h1><a href='/a'>a</a><a href='/b'>b</a><a href='https://other.com'>x</a>",
+    "/a": "<h1>A</h1><p>Page a.</p><a href='/'>home</a><a href='/b'>b</a>",
+    "/b": "<h1>B</h1><img src='/b.png'><a href='/c'>c</a>",
+    "/c": "<h1>C</h1><a href='/missing'>missing</a>",
+}
+
+HOME: PageData = {
+    "h1": "Home",
+    "first_paragraph": "",
+    "outgoing_links": [],
+    "image_urls": [],
+}
+
+
+def make_app(site: dict[str, str], hits: list[str] | None = None) -> web.Application:
+    async def handler(request: web.Request) -> web.Response:
+        if hits is not None:
+            hits.append(request.path)
+        html = site.get(request.path)
+        if html is None:
+            raise web.HTTPNotFound()
+
+        etag = '"' + hashlib.sha1(html.encode()).hexdigest() + '"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=html, content_type="text/html", headers={"ETag": etag})
+
+    app = web.Application()
+    _ = app.router.add_get("/{tail:.*}", handler)
+    return app
+
+
+class TestCrawlSiteAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_crawls_internal_pages(self):
+        async with serve(make_app(SITE)) as base_url:
+            pages = await crawl_site_async(base_url, 2, 10, ParseExecutor.INLINE)
+
+        self.assertEqual(
+            sorted(pages),
+            ["127.0.0.1", "127.0.0.1/a", "127.0.0.1/b", "127.0.0.1/c"],
+        )
+        self.assertEqual(pages["127.0.0.1/b"]["h1"], "B")
+
+    async def test_parse_executors_agree(self):
+        async with serve(make_app(SITE)) as base_url:
+            expected = await crawl_site_async(base_url, 2, 10, ParseExecutor.INLINE)
+            for executor in (ParseExecutor.THREAD, ParseExecutor.PROCESS):
+                with self.subTest(executor=executor):
+                    actual = await crawl_site_async(base_url, 2, 10, executor)
+                    self.assertEqual(actual, expected)
+
+    async def test_max_pages(self):
+        async with serve(make_app(SITE)) as base_url:
+            pages = await crawl_site_async(base_url, 1, 2, ParseExecutor.INLINE)
+        self.assertLessEqual(len(pages), 2)
+
+    async def test_max_depth(self):
+        async with serve(make_app(SITE)) as base_url:
+            pages = await crawl_site_async(
+                base_url, 2, 10, ParseExecutor.INLINE, max_depth=1
+            )
+        self.assertEqual(sorted(pages), ["127.0.0.1", "127.0.0.1/a", "127.0.0.1/b"])
+
+    async def test_respect_canonical(self):
+        site = {
+            "/": "<h1>Home</h1><a href='/copy'>copy</a>",
+            "/copy": "<link rel='canonical' href='/real'><h1>Copy</h1>",
+            "/real": "<link rel='canonical' href='/real/'><h1>Real</h1>",
+        }
+        async with serve(make_app(site)) as base_url:
+            pages = await crawl_site_async(base_url, 2, 10, ParseExecutor.INLINE)
+            respected = await crawl_site_async(
+                base_url,
+                2,
+                10,
+                ParseExecutor.INLINE,
+                canonical=CanonicalRules(respect_canonical=True),
+            )
+
+        self.assertEqual(sorted(pages), ["127.0.0.1", "127.0.0.1/copy"])
+        self.assertEqual(sorted(respected), ["127.0.0.1", "127.0.0.1/real"])
+
+    async def test_skips_duplicate_content(self):
+        copy = "<h1>Copy</h1><p>" + " ".join(f"w{i}" for i in range(500)) + "</p>"
+        site = {
+            "/": "<a href='/a'>a</a><a href='/b'>b</a>",
+            "/a": copy + "<a href='/c'>c</a><a href='/d'>d</a>",
+            "/b": copy + "<a href='/c'>c</a><a href='/d'>d</a>",
+            "/c": copy + "<a href='/'>home</a>",
+            "/d": copy + "<a href='/e'>e</a>",
+            "/e": "<h1>E</h1>",
+        }
+        duplicates = DuplicateDetector()
+        async with serve(make_app(site)) as base_url:
+            pages = await crawl_site_async(
+                base_url, 1, 10, ParseExecutor.THREAD, duplicates=duplicates
+            )
+
+        self.assertNotIn("127.0.0.1/b", pages)
+        self.assertIn("127.0.0.1/e", pages)
+        self.assertEqual(
+            duplicates.clusters,
+            {
+                "127.0.0.1/a": [
+                    "127.0.0.1/a",
+                    "127.0.0.1/b",
+                    "127.0.0.1/c",
+                    "127.0.0.1/d",
+                ]
+            },
+        )
+
+    async def test_unparsable_page_is_a_failure(self):
+        site = {"/": "<a href='/empty'>empty</a>", "/empty": ""}
+        stats = CrawlStats()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "report.ndjson")
+            async with serve(make_app(site)) as base_url:
+                with ReportWriter(path, ReportFormat.NDJSON) as report:
+                    pages = await crawl_site_async(
+                        base_url,
+                        2,
+                        10,
+                        ParseExecutor.INLINE,
+                        sinks=[report],
+                        stats=stats,
+                    )
+            with open(path, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f]
+
+        self.assertNotIn("127.0.0.1/empty", pages)
+        self.assertEqual(len(pages.failed), 1)
+        self.assertEqual(stats.failures, 1)
+        self.assertEqual(
+            rows[-1],
+            {
+                "page_url": "127.0.0.1/empty",
+                "error": "html string or page_url cannot be empty",
+            },
+        )
+
+    async def test_streams_report_without_storing_pages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "report.ndjson")
+            async with serve(make_app(SITE)) as base_url:
+                with ReportWriter(path, ReportFormat.NDJSON) as report:
+                    pages = await crawl_site_async(
+                        base_url,
+                        2,
+                        10,
+                        ParseExecutor.INLINE,
+                        sinks=[report],
+                        store_pages=False,
+                    )
+            with open(path, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f]
+
+        self.assertEqual(pages, {})
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(
+            rows[-1], {"page_url": "127.0.0.1/missing", "error": "HTTP 404"}
+        )
+
+
+class TestIterPages(unittest.IsolatedAsyncioTestCase):
+    SITE: dict[str, str] = {
+        "/": "".join(f"<a href='/p{i}'>p</a>" for i in range(40)),
+        **{f"/p{i}": f"<h1>P{i}</h1>" for i in range(40)},
+    }
+
+    async def test_yields_every_page(self):
+        async with serve(make_app(self.SITE)) as base_url:
+            expected = await crawl_site_async(base_url, 2, 10, ParseExecutor.INLINE)
+            async with AsyncCrawler(
+                base_url, 2, 10, ParseExecutor.INLINE, store_pages=False
+            ) as crawler:
+                pages = {url: page async for url, page in crawler.iter_pages()}
+
+        self.assertEqual(pages, expected)
+        self.assertEqual(crawler.pages, {})
+
+    async def test_slow_consumer_throttles_fetching(self):
+        hits: list[str] = []
+        async with serve(make_app(self.SITE, hits)) as base_url:
+            async with AsyncCrawler(
+                base_url, 4, 100, ParseExecutor.INLINE, store_pages=False
+            ) as crawler:
+                async with aclosing(crawler.iter_pages(buffer=2)) as pages:
+                    async for _ in pages:
+                        await asyncio.sleep(0.05)
+                        # the consumer's page, the buffer and one per worker
+                        self.assertLessEqual(len(hits), 1 + 2 + 4 + 1)
+                        break
+                await asyncio.sleep(0.05)
+
+        self.assertLessEqual(len(hits), 8)
+
+
+class TestTransport(unittest.IsolatedAsyncioTestCase):
+    async def test_hung_page_times_out(self):
+        async def hang(request: web.Request) -> web.Response:
+            if request.path == "/slow":
+                await asyncio.sleep(30)
+            return web.Response(
+                text="<a href='/slow'>slow</a><a href='/a'>a</a>",
+                content_type="text/html",
+            )
+
+        app = web.Application()
+        _ = app.router.add_get("/{tail:.*}", hang)
+        server = TestServer(app, host="127.0.0.1")
+        await server.start_server()
+        try:
+            transport = TransportConfig(read_timeout=0.2)
+            pages = await asyncio.wait_for(
+                crawl_site_async(
+                    str(server.make_url("/")),
+                    2,
+                    10,
+                    ParseExecutor.INLINE,
+                    transport=transport,
+                ),
+                timeout=5,
+            )
+        finally:
+            await server.close()
+
+        self.assertEqual(sorted(pages), ["127.0.0.1", "127.0.0.1/a"])
+
+    async def test_compression_setting_sent(self):
+        encodings: list[str] = []
+
+        async def echo(request: web.Request) -> web.Response:
+            encodings.append(request.headers.get("Accept-Encoding", ""))
+            return web.Response(text="<h1>x</h1>", content_type="text/html")
+
+        app = web.Application()
+        _ = app.router.add_get("/{tail:.*}", echo)
+        server = TestServer(app, host="127.0.0.1")
+        await server.start_server()
+        try:
+            for compression in (True, False):
+                _ = await crawl_site_async(
+                    str(server.make_url("/")),
+                    1,
+                    1,
+                    ParseExecutor.INLINE,
+                    transport=TransportConfig(compression=compression),
+                )
+        finally:
+            await server.close()
+
+        self.assertIn("gzip", encodings[0])
+        self.assertEqual(encodings[1], "identity")
+
+
+class TestRetries(unittest.IsolatedAsyncioTestCase):
+    async def crawl(
+        self, failures: int, retry: RetryPolicy
+    ) -> tuple[list[str], list[dict[str, str]]]:
+        hits: list[str] = []
+
+        async def flaky(request: web.Request) -> web.Response:
+            hits.append(request.path)
+            if request.path == "/a" and hits.count("/a") <= failures:
+                raise web.HTTPServiceUnavailable()
+            if request.path == "/gone":
+                raise web.HTTPNotFound()
+            return web.Response(
+                text="<a href='/a'>a</a><a href='/gone'>gone</a>",
+                content_type="text/html",
+            )
+
+        app = web.Application()
+        _ = app.router.add_get("/{tail:.*}", flaky)
+        server = TestServer(app, host="127.0.0.1")
+        await server.start_server()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "report.ndjson")
+            try:
+                with ReportWriter(path, ReportFormat.NDJSON) as report:
+                    _ = await crawl_site_async(
+                        str(server.make_url("/")),
+                        2,
+                        10,
+                        ParseExecutor.INLINE,
+                        sinks=[report],
+                        retry=retry,
+                    )
+            finally:
+                await server.close()
+            with open(path, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f]
+        return hits, rows
+
+    async def test_transient_failure_is_retried(self):
+        hits, rows = await self.crawl(2, RetryPolicy(base_delay=0.01))
+
+        self.assertEqual(hits.count("/a"), 3)
+        self.assertEqual(hits.count("/gone"), 1)
+        errors = {row["page_url"]: row.get("error") for row in rows}
+        self.assertIsNone(errors["127.0.0.1/a"])
+        self.assertEqual(errors["127.0.0.1/gone"], "HTTP 404")
+
+    async def test_failure_reason_reported_once_retries_run_out(self):
+        hits, rows = await self.crawl(5, RetryPolicy(max_retries=1, base_delay=0.01))
+
+        self.assertEqual(hits.count("/a"), 2)
+        errors = {row["page_url"]: row.get("error") for row in rows}
+        self.assertEqual(errors["127.0.0.1/a"], "HTTP 503")
+
+
+class TestStreamingBody(unittest.IsolatedAsyncioTestCase):
+    async def crawl(
+        self, routes: Mapping[str, str | bytes], transport: TransportConfig
+    ) -> Mapping[str, PageData]:
+        async def handler(request: web.Request) -> web.Response:
+            body = routes.get(request.path)
+            if body is None:
+                raise web.HTTPNotFound()
+            if isinstance(body, str):
+                return web.Response(text=body, content_type="text/html")
+            content_type = (
+                "application/pdf" if body.startswith(b"%PDF") else "text/html"
+            )
+            return web.Response(body=body, headers={"Content-Type": content_type})
+
+        app = web.Application()
+        _ = app.router.add_get("/{tail:.*}", handler)
+        server = TestServer(app, host="127.0.0.1")
+        await server.start_server()
+        try:
+            results = [
+                await crawl_site_async(
+                    str(server.make_url("/")), 2, 10, executor, transport=transport
+                )
+                for executor in (ParseExecutor.INLINE, ParseExecutor.THREAD)
+            ]
+        finally:
+            await server.close()
+        self.assertEqual(results[0], results[1])
+        return results[0]
+
+    async def test_truncates_at_size_cap(self):
+        filler = "<p>" + "x" * 5000 + "</p>"
+        home = "<h1>Home</h1><a href='/a'>a</a>" + filler + "<a href='/b'>b</a>"
+        site = {"/": home, "/a": "<h1>A</h1>", "/b": "<h1>B</h1>"}
+        pages = await self.crawl(
+            site, TransportConfig(max_body_bytes=1000, chunk_size=256)
+        )
+
+        self.assertEqual(sorted(pages), ["127.0.0.1", "127.0.0.1/a"])
+        self.assertEqual(pages["127.0.0.1"]["h1"], "Home")
+
+    async def test_rejects_non_html(self):
+        site: dict[str, str | bytes] = {
+            "/": "<a href='/pdf'>pdf</a><a href='/bin'>bin</a><a href='/ok'>ok</a>",
+            "/pdf": b"%PDF-1.7",
+            "/bin": b"\x89PNG\r\n\x1a\n\x00\x00",
+            "/ok": "<h1>Ok</h1>",
+        }
+        pages = await self.crawl(site, TransportConfig())
+
+        self.assertEqual(sorted(pages), ["127.0.0.1", "127.0.0.1/ok"])
+
+    async def test_multibyte_split_across_chunks(self):
+        site: dict[str, str | bytes] = {"/": "<h1>" + "é" * 300 + "</h1>"}
+        pages = await self.crawl(site, TransportConfig(chunk_size=7))
+        self.assertEqual(pages["127.0.0.1"]["h1"], "é" * 300)
+
+
+class TestSitemapSeeding(unittest.IsolatedAsyncioTestCase):
+    async def crawl(self, robots_txt: str | None, robots: bool = False) -> list[str]:
+        files = {
+            "/sitemap_index.xml": (
+                "<sitemapindex xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>"
+                + "<sitemap><loc>{base}sitemap1.xml.gz</loc></sitemap>"
+                + "</sitemapindex>"
+            ),
+            "/sitemap1.xml.gz": (
+                "<urlset xmlns='http://www.sitemaps.org/schemas/sitemap/0.9'>"
+                + "<url><loc>{base}deep</loc></url>"
+                + "<url><loc>{base}private/page</loc></url>"
+                + "</urlset>"
+            ),
+        }
+        site = {
+            "/": "<h1>Home</h1><a href='/private/linked'>p</a>",
+            "/deep": "<h1>Deep</h1>",
+            "/private/page": "<h1>Private</h1>",
+            "/private/linked": "<h1>Linked</h1>",
+        }
+
+        async def handler(request: web.Request) -> web.Response:
+            base = str(request.url.origin()) + "/"
+            if request.path == "/robots.txt":
+                if robots_txt is None:
+                    raise web.HTTPNotFound()
+                return web.Response(text=robots_txt.format(base=base))
+            if request.path in files:
+                body = files[request.path].format(base=base).encode()
+                if request.path.endswith(".gz"):
+                    body = gzip.compress(body)
+                return web.Response(body=body, content_type="application/xml")
+            html = site.get(request.path)
+            if html is None:
+                raise web.HTTPNotFound()
+            return web.Response(text=html, content_type="text/html")
+
+        app = web.Application()
+        _ = app.router.add_get("/{tail:.*}", handler)
+        server = TestServer(app, host="127.0.0.1")
+        await server.start_server()
+        try:
+            base_url = str(server.make_url("/"))
+            pages = await crawl_site_async(
+                base_url, 2, 10, ParseExecutor.INLINE, robots=robots, sitemaps=True
+            )
+        finally:
+            await server.close()
+        return sorted(pages)
+
+    async def test_seeds_from_sitemap_index(self):
+        robots = (
+            "User-agent: *\nDisallow: /private/\nSitemap: {base}sitemap_index.xml\n"
+        )
+        pages = await self.crawl(robots)
+        self.assertEqual(
+            pages,
+            [
+                "127.0.0.1",
+                "127.0.0.1/deep",
+                "127.0.0.1/private/linked",
+                "127.0.0.1/private/page",
+            ],
+        )
+
+        pages = await self.crawl(robots, robots=True)
+        self.assertEqual(pages, ["127.0.0.1", "127.0.0.1/deep"])
+
+    async def test_missing_robots_allows_all(self):
+        pages = await self.crawl(None, robots=True)
+        self.assertEqual(pages, ["127.0.0.1", "127.0.0.1/private/linked"])
+
+
+class TestConditionalRecrawl(unittest.IsolatedAsyncioTestCase):
+    async def test_recrawl_uses_not_modified(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "cache.sqlite")
+            async with serve(make_app(SITE)) as base_url:
+                with ResponseCache(path) as cache:
+                    first = await crawl_site_async(
+                        base_url, 2, 10, ParseExecutor.INLINE, cache=cache
+                    )
+                    self.assertEqual(cache.hits, 0)
+
+                with ResponseCache(path) as cache:
+                    second = await crawl_site_async(
+                        base_url, 2, 10, ParseExecutor.INLINE, cache=cache
+                    )
+                    self.assertEqual(cache.hits, len(first))
+                    self.assertEqual(cache.misses, 0)
+                    self.assertEqual(cache.hit_rate, 1.0)
+
+            self.assertEqual(second, first)
+
+    async def test_recrawl_finds_the_same_duplicates(self):
+        copy = "<h1>Copy</h1><p>" + " ".join(f"w{i}" for i in range(500)) + "</p>"
+        site = {
+            "/": "<a href='/a'>a</a><a href='/b'>b</a><a href='/n'>n</a>",
+            "/a": copy + "<a href='/c'>c</a>",
+            "/b": copy + "<a href='/c'>c</a>",
+            "/c": "<h1>C</h1>",
+            "/n": copy + "<p>w500</p>",
+        }
+        reports: list[str] = []
+        hits: list[int] = []
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "cache.sqlite")
+            async with serve(make_app(site)) as base_url:
+                for _ in range(2):
+                    duplicates = DuplicateDetector()
+                    with ResponseCache(path) as cache:
+                        _ = await crawl_site_async(
+                            base_url,
+                            1,
+                            10,
+                            ParseExecutor.INLINE,
+                            cache=cache,
+                            duplicates=duplicates,
+                        )
+                        hits.append(cache.hits)
+                    report = write_duplicate_report(duplicates, Path(tmp, "dup.csv"))
+                    reports.append(report.read_text(encoding="utf-8-sig"))
+
+        self.assertEqual(hits, [0, 4])
+        self.assertIn("127.0.0.1/n", reports[0])
+        self.assertEqual(reports[1], reports[0])
+
+
+class TestCheckpointResume(unittest.IsolatedAsyncioTestCase):
+    async def test_resume_skips_completed_pages(self):
+        hits: list[str] = []
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "crawl.ndjson")
+            async with serve(make_app(SITE, hits)) as base_url:
+                with Checkpoint(path) as checkpoint:
+                    checkpoint.record_queued([base_url, base_url + "a", base_url + "b"])
+                    checkpoint.record_page("127.0.0.1", HOME)
+
+                with Checkpoint(path, resume=True) as checkpoint:
+                    pages = await crawl_site_async(
+                        base_url, 2, 10, ParseExecutor.INLINE, checkpoint=checkpoint
+                    )
+
+                with Checkpoint(path, resume=True) as checkpoint:
+                    restored = checkpoint.restored
+
+        self.assertNotIn("/", hits)
+        self.assertEqual(sorted(hits), ["/a", "/b", "/c", "/missing"])
+        self.assertEqual(pages["127.0.0.1"], HOME)
+        self.assertEqual(len(pages), 4)
+        self.assertEqual(restored.pending, [])
+        self.assertEqual(len(restored.pages), 4)
+        self.assertEqual(restored.failed, {"127.0.0.1/missing": ("HTTP 404", True)})
+
+    async def test_resume_replays_report(self):
+        # /d serves the same body as /c, so it is skipped as a duplicate
+        copy = SITE["/c"] + "<a href='/d'>d</a>"
+        site = {**SITE, "/c": copy, "/d": copy}
+        hits: list[str] = []
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "crawl.ndjson")
+            async with serve(make_app(site, hits)) as base_url:
+                with Checkpoint(path) as checkpoint:
+                    first = await crawl_site_async(
+                        base_url,
+                        2,
+                        10,
+                        ParseExecutor.INLINE,
+                        checkpoint=checkpoint,
+                        duplicates=DuplicateDetector(),
+                    )
+                crawled = len(hits)
+
+                report_path = Path(tmp, "report.ndjson")
+                with (
+                    Checkpoint(path, resume=True) as checkpoint,
+                    ReportWriter(report_path, ReportFormat.NDJSON) as report,
+                ):
+                    resumed = await crawl_site_async(
+                        base_url,
+                        2,
+                        10,
+                        ParseExecutor.INLINE,
+                        checkpoint=checkpoint,
+                        sinks=[report],
+                        duplicates=DuplicateDetector(),
+                    )
+            with open(report_path, encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f]
+
+        self.assertIn("/d", hits)
+        self.assertEqual(len(hits), crawled)
+        self.assertEqual(resumed, first)
+        # the duplicate /d is neither a page nor a failure
+        self.assertNotIn("127.0.0.1/d", resumed)
+        self.assertEqual(len(resumed.failed), 1)
+        self.assertEqual(len(rows), 5)
+        self.assertIn({"page_url": "127.0.0.1/missing", "error": "HTTP 404"}, rows)
+
+    async def test_resume_keeps_depth(self):
+        hits: list[str] = []
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "crawl.ndjson")
+            async with serve(make_app(SITE, hits)) as base_url:
+                with Checkpoint(path) as checkpoint:
+                    checkpoint.record_queued([base_url])
+                    checkpoint.record_queued([base_url + "a", base_url + "b"], 1)
+                    checkpoint.record_page("127.0.0.1", HOME)
+
+                with Checkpoint(path, resume=True) as checkpoint:
+                    _ = await crawl_site_async(
+                        base_url,
+                        2,
+                        10,
+                        ParseExecutor.INLINE,
+                        checkpoint=checkpoint,
+                        max_depth=1,
+                    )
+
+        # /c is linked from /b at depth 2
+        self.assertEqual(sorted(hits), ["/a", "/b"])
+
+
+class TestCrawlStats(unittest.IsolatedAsyncioTestCase):
+    async def test_records_stages_and_counters(self):
+        stats = CrawlStats()
+        async with serve(make_app(SITE)) as base_url:
+            _ = await crawl_site_async(
+                base_url, 2, 10, ParseExecutor.THREAD, stats=stats
+            )
+
+        self.assertEqual(stats.pages, 4)
+        self.assertEqual(stats.failures, 1)
+        self.assertEqual(stats.counters["queued"], 5)
+        self.assertEqual(stats.counters["requests"], 5)
+        self.assertEqual(stats.status_codes, {200: 4, 404: 1})
+        self.assertGreater(stats.bytes_received, 0)
+        self.assertGreater(stats.parse_cpu_seconds, 0)
+        # the 404 is dequeued and answered but never fetched successfully
+        for stage in ("queue_wait", "host_wait", "ttfb"):
+            self.assertEqual(stats.stages[stage].count, 5, stage)
+        for stage in ("download", "fetch", "parse", "page"):
+            self.assertEqual(stats.stages[stage].count, 4, stage)
+        self.assertGreaterEqual(stats.stages["connect"].count, 1)
+
+        summary = stats.summary()
+        self.assertEqual(json.loads(json.dumps(summary)), summary)
+        self.assertEqual(list(cast(dict[str, object], summary["stages"])), list(STAGES))
+        self.assertEqual(summary["status_codes"], {"200": 4, "404": 1})
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
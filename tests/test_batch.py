@@ -0,0 +1,163 @@
+import asyncio
+import time
+import unittest
+
+from aiohttp import web
+
+from tests.helpers import serve
+from web_scraper.batch import FairLimiter, crawl_batch
+from web_scraper.crawl import ParseExecutor
+from web_scraper.retry import RetryPolicy
+from web_scraper.scheduler import HostPolicy
+
+
+class InFlight:
+    def __init__(self) -> None:
+        self.current: int = 0
+        self.peak: int = 0
+
+
+def site_app(pages: int, delay: float, in_flight: InFlight) -> web.Application:
+    links = "".join(f"<a href='/p{i}'>p</a>" for i in range(pages))
+
+    async def handler(request: web.Request) -> web.Response:
+        in_flight.current += 1
+        in_flight.peak = max(in_flight.peak, in_flight.current)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            in_flight.current -= 1
+        return web.Response(
+            text=f"<h1>{request.path}</h1>{links}", content_type="text/html"
+        )
+
+    app = web.Application()
+    _ = app.router.add_get("/{tail:.*}", handler)
+    return app
+
+
+class TestFairLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_serves_sites_in_turn(self):
+        limiter = FairLimiter(1)
+        order: list[str] = []
+        release = asyncio.Event()
+
+        async def request(site: str) -> None:
+            async with limiter.slot(site):
+                order.append(site)
+                _ = await release.wait()
+
+        first = asyncio.create_task(request("a"))
+        await asyncio.sleep(0)
+        waiting = [asyncio.create_task(request(site)) for site in "aaabb"]
+        await asyncio.sleep(0)
+        release.set()
+        _ = await asyncio.gather(first, *waiting)
+        self.assertEqual(order, ["a", "a", "b", "a", "b", "a"])
+        self.assertEqual(limiter.active, 0)
+
+    async def test_cancelled_waiter_gives_up_its_place(self):
+        limiter = FairLimiter(1)
+        release = asyncio.Event()
+
+        async def request(site: str) -> None:
+            async with limiter.slot(site):
+                _ = await release.wait()
+
+        first = asyncio.create_task(request("a"))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(request("b"))
+        await asyncio.sleep(0)
+        _ = cancelled.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        await first
+        self.assertEqual(limiter.active, 0)
+        self.assertFalse(limiter._waiting)  # pyright: ignore[reportPrivateUsage]
+
+
+class TestCrawlBatch(unittest.IsolatedAsyncioTestCase):
+    async def crawl(
+        self, apps: list[web.Application], max_concurrency: int, max_pages: int
+    ) -> tuple[float, list[int]]:
+        async with (
+            serve(apps[0]) as first,
+            serve(apps[1]) as second,
+        ):
+            started = time.monotonic()
+            results = await crawl_batch(
+                [first, second],
+                max_concurrency,
+                max_pages,
+                site_concurrency=4,
+                parse_executor=ParseExecutor.INLINE,
+                host_policy=HostPolicy(max_connections=100),
+                retry=RetryPolicy(max_retries=0),
+            )
+            elapsed = time.monotonic() - started
+        self.assertEqual([r.base_url for r in results], [first, second])
+        self.assertTrue(all(r.error is None for r in results))
+        return elapsed, [len(r.pages) for r in results]
+
+    async def test_crawls_each_site_to_its_own_limit(self):
+        flights = InFlight(), InFlight()
+        _, sizes = await self.crawl(
+            [site_app(20, 0, flights[0]), site_app(3, 0, flights[1])], 8, 10
+        )
+        self.assertEqual(sizes, [10, 4])
+
+    async def test_global_budget_is_shared(self):
+        in_flight = InFlight()
+        _ = await self.crawl(
+            [site_app(20, 0.02, in_flight), site_app(20, 0.02, in_flight)], 3, 12
+        )
+        self.assertEqual(in_flight.peak, 3)
+
+    async def test_fast_site_does_not_wait_for_slow_one(self):
+        flights = InFlight(), InFlight()
+        # the slow site alone takes about 4 rounds of 0.2s
+        elapsed, sizes = await self.crawl(
+            [site_app(12, 0.2, flights[0]), site_app(12, 0.01, flights[1])], 8, 13
+        )
+        self.assertEqual(sizes, [13, 13])
+        self.assertLess(elapsed, 1.5)
+
+    async def test_throttled_site_does_not_hold_a_slot_while_it_waits(self):
+        requests: list[tuple[str, float]] = []
+
+        def app(name: str, pages: int, throttle: bool) -> web.Application:
+            links = "".join(f"<a href='/p{i}'>p</a>" for i in range(pages))
+
+            async def handler(_: web.Request) -> web.Response:
+                first = name not in dict(requests)
+                requests.append((name, time.monotonic()))
+                if throttle and first:
+                    raise web.HTTPTooManyRequests(headers={"Retry-After": "1"})
+                await asyncio.sleep(0.01)
+                html = f"<h1>{name}</h1>{links}"
+                return web.Response(text=html, content_type="text/html")
+
+            application = web.Application()
+            _ = application.router.add_get("/{tail:.*}", handler)
+            return application
+
+        async with (
+            serve(app("throttled", 0, True)) as throttled,
+            serve(app("healthy", 30, False)) as healthy,
+        ):
+            # a host of its own, so its Retry-After does not block the other
+            throttled = throttled.replace("127.0.0.1", "localhost")
+            results = await crawl_batch(
+                [throttled, healthy],
+                1,
+                50,
+                site_concurrency=1,
+                parse_executor=ParseExecutor.INLINE,
+                host_policy=HostPolicy(max_connections=100),
+                retry=RetryPolicy(max_retries=1, base_delay=0.01),
+            )
+
+        self.assertEqual([len(r.pages) for r in results], [1, 31])
+        retried = [at for name, at in requests if name == "throttled"][-1]
+        last_healthy = max(at for name, at in requests if name == "healthy")
+        self.assertLess(last_healthy, retried)
@@ -0,0 +1,93 @@
+import json
+import tempfile
+import unittest
+from dataclasses import asdict, replace
+from pathlib import Path
+
+from web_scraper.bench import (
+    BenchResult,
+    CrawlConfig,
+    SiteConfig,
+    is_error_page,
+    render_page,
+    run_benchmark,
+    save_result,
+)
+from web_scraper.crawl import ParseExecutor
+from web_scraper.html_parse import extract_page_data
+
+
+class TestSyntheticSite(unittest.TestCase):
+    def test_render_page(self):
+        config = SiteConfig(pages=50, links_per_page=5, page_size=4000)
+        html = render_page(config, 3)
+        self.assertGreaterEqual(len(html), 4000)
+        self.assertEqual(html, render_page(config, 3))
+
+        data = extract_page_data(html, "http://127.0.0.1")
+        self.assertEqual(data["h1"], "Page 3")
+        self.assertEqual(len(data["outgoing_links"]), 5)
+        self.assertEqual(data["outgoing_links"][0], "http://127.0.0.1/p/4")
+
+    def test_error_rate(self):
+        config = SiteConfig(pages=2000, error_rate=0.1)
+        errors = sum(is_error_page(config, page) for page in range(config.pages))
+        self.assertTrue(100 < errors < 300)
+        self.assertFalse(is_error_page(SiteConfig(error_rate=1.0), 0))
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_run_and_save(self):
+        site = SiteConfig(pages=30, links_per_page=3, latency=0.001, error_rate=0.1)
+        crawl = CrawlConfig(max_concurrency=4, parse_executor=ParseExecutor.INLINE)
+        result = run_benchmark(site, crawl)
+
+        errors = sum(is_error_page(site, page) for page in range(site.pages))
+        self.assertEqual(result.failures, errors)
+        self.assertEqual(result.pages, site.pages - errors)
+        self.assertGreater(result.pages_per_second, 0)
+        self.assertLessEqual(result.p50_latency, result.p99_latency)
+        self.assertGreater(result.parse_cpu_seconds, 0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "results.jsonl")
+            self.assertIsNone(save_result(path, site, crawl, result))
+            previous = save_result(path, site, crawl, result)
+            self.assertIsNotNone(previous)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(len([json.loads(line) for line in f]), 2)
+
+    def test_matches_records_from_before_a_field_existed(self):
+        site = SiteConfig(pages=30)
+        crawl = CrawlConfig(max_concurrency=4)
+        result = BenchResult(30, 0, 1.0, 30.0, 0.1, 0.2, 0.5, 0.5, 40.0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "results.jsonl")
+            # as written before gzip and workers were added, by an
+            # uncompressed site and a single process crawl
+            old_site = asdict(replace(site, gzip=False))
+            del old_site["gzip"]
+            old_crawl = asdict(crawl)
+            del old_crawl["workers"]
+            old = {"site": old_site, "crawl": old_crawl, "result": asdict(result)}
+            with open(path, "w", encoding="utf-8") as f:
+                _ = f.write(json.dumps(old) + "\n")
+
+            self.assertIsNone(save_result(path, site, crawl, result))
+            previous = save_result(path, replace(site, gzip=False), crawl, result)
+            self.assertEqual(previous, old)
+
+    def test_record_missing_a_field_matches_nothing(self):
+        site = SiteConfig(pages=30)
+        crawl = CrawlConfig(max_concurrency=4)
+        result = BenchResult(30, 0, 1.0, 30.0, 0.1, 0.2, 0.5, 0.5, 40.0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "results.jsonl")
+            # as written before the body size cap was added
+            old_crawl = asdict(crawl)
+            del old_crawl["transport"]["max_body_bytes"]
+            old = {"site": asdict(site), "crawl": old_crawl, "result": asdict(result)}
+            with open(path, "w", encoding="utf-8") as f:
+                _ = f.write(json.dumps(old) + "\n")
+
+            self.assertIsNone(save_result(path, site, crawl, result))
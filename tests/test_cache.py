@@ -0,0 +1,37 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from web_scraper.cache import ResponseCache
+from web_scraper.html_parse import PageData
+
+PAGE: PageData = {
+    "h1": "Title",
+    "first_paragraph": "Paragraph.",
+    "outgoing_links": ["https://blog.boot.dev/a"],
+    "image_urls": [],
+}
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "cache.sqlite")
+            with ResponseCache(path) as cache:
+                cache.put("blog.boot.dev", "<h1>Title</h1>", PAGE, '"abc"', None)
+
+            with ResponseCache(path) as cache:
+                cached = cache.get("blog.boot.dev")
+                self.assertIsNotNone(cached)
+                assert cached is not None
+                self.assertEqual(cached.page_data, PAGE)
+                self.assertEqual(
+                    cached.conditional_headers(), {"If-None-Match": '"abc"'}
+                )
+                self.assertIsNone(cache.get("blog.boot.dev/missing"))
+                self.assertEqual(cache.body("blog.boot.dev"), "<h1>Title</h1>")
+                self.assertIsNone(cache.body("blog.boot.dev/missing"))
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+from urllib.parse import urlsplit
+
+from web_scraper.canonical import CanonicalRules, Canonicalizer
+from web_scraper.html_parse import extract_page_data
+
+TRICKY_URLS = [
+    "https://blog.boot.dev/path/",
+    "http://www.blog.boot.dev",
+    "https://blog.boot.dev/a/b?x=1#top",
+    "https://blog.boot.dev/a#frag?x=1",
+    "https://Blog.Boot.dev/Path",
+    "https://blog.boot.dev:8443/p",
+    "https://user:pw@blog.boot.dev/p",
+    "https://blog.boot.dev/p ",
+    "https://blog.boot.dev/p\t/q",
+    "https://blog.boot.dev/p%20q//",
+    "https://blog.boot.dev/café",
+    "https://blog.boot.dev?q=1",
+    "https://[::1]:8080/p",
+    "mailto:someone@boot.dev",
+    "www.blog.boot.dev/path",
+]
+
+
+def reference_normalize(url: str) -> str:
+    parts = urlsplit(url)
+    sanitized = (parts.hostname or "") + parts.path.rstrip("/")
+    while sanitized.startswith("www."):
+        sanitized = sanitized[4:]
+    return sanitized
+
+
+class TestCanonicalizer(unittest.TestCase):
+    def test_default_rules_match_urlsplit(self):
+        canonicalizer = Canonicalizer()
+        for url in TRICKY_URLS:
+            self.assertEqual(
+                canonicalizer.normalize(url), reference_normalize(url), url
+            )
+        self.assertEqual(
+            canonicalizer.normalize_all(TRICKY_URLS),
+            [reference_normalize(url) for url in TRICKY_URLS],
+        )
+
+    def test_query_rules(self):
+        canonicalizer = Canonicalizer(CanonicalRules(keep_query=True))
+        self.assertEqual(
+            canonicalizer.normalize("https://shop.dev/list/?page=2&utm_source=x&a=1#f"),
+            "shop.dev/list?a=1&page=2",
+        )
+        self.assertEqual(
+            canonicalizer.normalize("https://shop.dev/list?utm_medium=y"),
+            "shop.dev/list",
+        )
+
+        canonicalizer = Canonicalizer(
+            CanonicalRules(keep_query=True, keep_params=("page",))
+        )
+        self.assertEqual(
+            canonicalizer.normalize("https://shop.dev/list?sort=asc&page=2"),
+            "shop.dev/list?page=2",
+        )
+
+    def test_ports_scheme_and_host_case(self):
+        canonicalizer = Canonicalizer(
+            CanonicalRules(keep_scheme=True, keep_port=True, lowercase_host=False)
+        )
+        self.assertEqual(
+            canonicalizer.normalize("https://Blog.dev:443/a/"), "https://Blog.dev/a"
+        )
+        self.assertEqual(
+            canonicalizer.normalize("http://blog.dev:8080/a"), "http://blog.dev:8080/a"
+        )
+
+    def test_fragment_and_trailing_slash(self):
+        canonicalizer = Canonicalizer(
+            CanonicalRules(keep_fragment=True, strip_trailing_slash=False)
+        )
+        self.assertEqual(
+            canonicalizer.normalize("https://blog.dev/a/#top"), "blog.dev/a/#top"
+        )
+
+    def test_resolve_all(self):
+        canonicalizer = Canonicalizer()
+        self.assertEqual(
+            canonicalizer.resolve_all(
+                "https://blog.dev/posts/", ["a", "/b", "a", "www.other.dev", ""]
+            ),
+            [
+                "https://blog.dev/posts/a",
+                "https://blog.dev/b",
+                "https://blog.dev/posts/a",
+                "https://www.other.dev",
+                "https://blog.dev/posts/",
+            ],
+        )
+
+    def test_empty_url(self):
+        self.assertRaises(ValueError, Canonicalizer().normalize, "")
+
+
+class TestCanonicalLink(unittest.TestCase):
+    def test_extracts_first_canonical(self):
+        html = (
+            "<head><link rel='Canonical' href='/real'>"
+            + "<link rel='canonical' href='/other'></head><h1>x</h1>"
+        )
+        data = extract_page_data(html, "https://blog.dev/copy?x=1")
+        self.assertEqual(data.get("canonical_url"), "https://blog.dev/real")
+
+    def test_absent_without_link(self):
+        data = extract_page_data("<h1>x</h1>", "https://blog.dev/")
+        self.assertNotIn("canonical_url", data)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,134 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from web_scraper.checkpoint import Checkpoint, load_checkpoint
+from web_scraper.html_parse import PageData
+
+PAGE: PageData = {
+    "h1": "Title",
+    "first_paragraph": "",
+    "outgoing_links": ["https://blog.boot.dev/a"],
+    "image_urls": [],
+}
+
+
+class TestCheckpoint(unittest.TestCase):
+    def test_pending_excludes_completed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "crawl.ndjson")
+            with Checkpoint(path) as checkpoint:
+                checkpoint.record_queued(
+                    ["https://blog.boot.dev", "https://blog.boot.dev/a"]
+                )
+                checkpoint.record_page("blog.boot.dev", PAGE)
+                checkpoint.record_queued(["https://blog.boot.dev/b/"], 1)
+                checkpoint.record_failure("blog.boot.dev/b", "HTTP 404")
+
+            state = load_checkpoint(path)
+        self.assertEqual(state.pages, {"blog.boot.dev": PAGE})
+        self.assertEqual(state.failed, {"blog.boot.dev/b": ("HTTP 404", True)})
+        self.assertEqual(state.pending, [("https://blog.boot.dev/a", 0)])
+
+    def test_skipped_and_failed_pages(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "crawl.ndjson")
+            with Checkpoint(path) as checkpoint:
+                checkpoint.record_queued(
+                    ["https://blog.boot.dev/a", "https://blog.boot.dev/b"]
+                )
+                checkpoint.record_skipped("blog.boot.dev/a")
+                checkpoint.record_failure("blog.boot.dev/b", "timeout")
+                checkpoint.record_failure("blog.boot.dev/d", "not an HTML page", False)
+            with open(path, "a", encoding="utf-8") as f:
+                # a failure as written before reasons were journaled
+                _ = f.write('{"p": "blog.boot.dev/c", "d": null}\n')
+
+            state = load_checkpoint(path)
+        self.assertEqual(state.pages, {})
+        self.assertEqual(state.skipped, {"blog.boot.dev/a"})
+        self.assertEqual(
+            state.failed,
+            {
+                "blog.boot.dev/b": ("timeout", True),
+                "blog.boot.dev/d": ("not an HTML page", False),
+                "blog.boot.dev/c": ("unknown", True),
+            },
+        )
+        self.assertEqual(state.pending, [])
+
+    def test_pending_keeps_depth(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "crawl.ndjson")
+            with Checkpoint(path) as checkpoint:
+                checkpoint.record_queued(["https://blog.boot.dev"])
+                checkpoint.record_queued(["https://blog.boot.dev/a"], 2)
+            with open(path, "a", encoding="utf-8") as f:
+                # written before depths were journaled
+                _ = f.write('{"q": "https://blog.boot.dev/b"}\n')
+
+            state = load_checkpoint(path)
+        self.assertEqual(
+            state.pending,
+            [
+                ("https://blog.boot.dev", 0),
+                ("https://blog.boot.dev/a", 2),
+                ("https://blog.boot.dev/b", 0),
+            ],
+        )
+
+    def test_torn_last_line_is_ignored(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "crawl.ndjson")
+            with Checkpoint(path) as checkpoint:
+                checkpoint.record_queued(["https://blog.boot.dev/a"])
+            with open(path, "a", encoding="utf-8") as f:
+                _ = f.write('{"p": "blog.boot.dev/a", "d": {"h1"')
+
+            state = load_checkpoint(path)
+        self.assertEqual(state.pending, [("https://blog.boot.dev/a", 0)])
+
+    def test_resume_after_torn_line_keeps_new_records(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "crawl.ndjson")
+            with Checkpoint(path) as checkpoint:
+                checkpoint.record_queued(["https://blog.boot.dev/a"])
+            with open(path, "a", encoding="utf-8") as f:
+                _ = f.write('{"q": "https://blog.boot.dev/b"')
+
+            with Checkpoint(path, resume=True) as checkpoint:
+                checkpoint.record_queued(["https://blog.boot.dev/c"], 1)
+            with Checkpoint(path, resume=True) as checkpoint:
+                checkpoint.record_queued(["https://blog.boot.dev/d"], 2)
+
+            state = load_checkpoint(path)
+        self.assertEqual(
+            state.pending,
+            [
+                ("https://blog.boot.dev/a", 0),
+                ("https://blog.boot.dev/c", 1),
+                ("https://blog.boot.dev/d", 2),
+            ],
+        )
+
+    def test_without_resume_starts_fresh(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "crawl.ndjson")
+            with Checkpoint(path) as checkpoint:
+                checkpoint.record_queued(["https://blog.boot.dev/a"])
+            with Checkpoint(path) as checkpoint:
+                self.assertEqual(checkpoint.restored.pending, [])
+            with Checkpoint(path, resume=True) as checkpoint:
+                self.assertEqual(checkpoint.restored.pending, [])
+
+    def test_tracks_write_cost(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with Checkpoint(Path(tmp, "crawl.ndjson")) as checkpoint:
+                checkpoint.record_page("blog.boot.dev", PAGE)
+                self.assertEqual(checkpoint.records, 1)
+                self.assertGreater(checkpoint.bytes_written, 0)
+                self.assertGreaterEqual(checkpoint.write_seconds, 0)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -8,6 +8,7 @@ from web_scraper.html_parse import (
     get_images_from_html,
     extract_page_data,
     PageData,
+    PageDataParser,
 )
 
 logging.basicConfig(level=logging.INFO)
@@ -411,5 +412,49 @@ class TestExtractPageData(unittest.TestCase):
         self.assertRaises(ValueError, extract_page_data, "", "https://blog.boot.dev")
 
 
+class TestPageDataParser(unittest.TestCase):
+    base_url: str = "https://blog.boot.dev"
+    documents: list[str] = [
+        "<h1>A <b>bold</b>   <i>title</i></h1>",
+        "<h1>Title<script>var x = 1;</script></h1><p>text</p>",
+        "<main><p>Main &amp; more &#147;quoted&#148;</p></main><p>after</p>",
+        "<p>outer<main><p>inner</p></main></p>",
+        "<p>first</p><main><div>no paragraph</div></main>",
+        "<main></main><main><p>second main</p></main>",
+        "<h1>unclosed <p>paragraph</h1> tail</p>",
+        "<pre><h1>  keep\n  spaces  </h1></pre>",
+        "<h1><!-- comment -->Visible<![CDATA[cdata]]></h1>",
+        "<img src='a.png'><img/><img src='b.png'/></img><a href>empty</a>",
+        "<template><h1>hidden</h1></template><h1>shown</h1>",
+        "<a href='/x' href='/y'>dup</a><a href='www.example.com'>w</a>",
+    ]
+
+    def test_agrees_with_per_field_helpers(self):
+        for html in self.documents:
+            with self.subTest(html=html):
+                expected = {
+                    "h1": get_h1_from_html(html),
+                    "first_paragraph": get_first_paragraph_from_html(html),
+                    "outgoing_links": get_urls_from_html(html, self.base_url),
+                    "image_urls": get_images_from_html(html, self.base_url),
+                }
+                actual = extract_page_data(html, self.base_url)
+                self.assertEqual(actual, expected)
+
+    def test_incremental_feed(self):
+        for html in self.documents:
+            with self.subTest(html=html):
+                parser = PageDataParser(self.base_url)
+                for i in range(0, len(html), 7):
+                    parser.feed(html[i : i + 7])
+                parser.close()
+                actual = parser.page_data()
+                expected = extract_page_data(html, self.base_url)
+                self.assertEqual(actual, expected)
+
+    def test_empty_page_url(self):
+        self.assertRaises(ValueError, extract_page_data, "<h1>x</h1>", "")
+
+
 if __name__ == "__main__":
     _ = unittest.main()
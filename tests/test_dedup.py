@@ -0,0 +1,92 @@
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+
+from web_scraper.dedup import (
+    DuplicateDetector,
+    content_digest,
+    page_simhash,
+    simhash,
+    visible_words,
+    write_duplicate_report,
+)
+
+WORDS = [f"word{i}" for i in range(400)]
+
+
+class TestSimhash(unittest.TestCase):
+    def test_visible_words_skip_markup(self):
+        html = (
+            "<html><head><style>p { color: red }</style>"
+            + "<script>var hidden = 1;</script></head>"
+            + "<body><!-- note --><h1>Hello</h1><p class='x'>Big World</p></body>"
+        )
+        self.assertEqual(visible_words(html), ["hello", "big", "world"])
+
+    def test_markup_changes_do_not_matter(self):
+        self.assertEqual(
+            page_simhash("<p>Same words here</p>"),
+            page_simhash("<div class='other'>same <b>words</b> here</div>"),
+        )
+
+    def test_small_edit_is_close(self):
+        edited = WORDS[:200] + ["changed"] + WORDS[201:]
+        distance = (simhash(WORDS) ^ simhash(edited)).bit_count()
+        self.assertLessEqual(distance, 3)
+
+    def test_different_text_is_far(self):
+        other = [f"other{i}" for i in range(400)]
+        distance = (simhash(WORDS) ^ simhash(other)).bit_count()
+        self.assertGreater(distance, 10)
+
+
+class TestDuplicateDetector(unittest.TestCase):
+    def test_exact_duplicates(self):
+        detector = DuplicateDetector()
+        digest = content_digest("<p>x</p>")
+        self.assertIsNone(detector.exact_duplicate("a", digest))
+        self.assertIsNone(detector.exact_duplicate("a", digest))
+        self.assertEqual(detector.exact_duplicate("b", digest), "a")
+        self.assertIsNone(detector.exact_duplicate("c", content_digest("<p>y</p>")))
+        self.assertEqual(detector.clusters, {"a": ["a", "b"]})
+
+    def test_near_duplicates_within_distance(self):
+        detector = DuplicateDetector(max_distance=3)
+        fingerprint = 0x0123456789ABCDEF
+        self.assertIsNone(detector.near_duplicate("a", fingerprint))
+        # differences in every band still match
+        close = fingerprint ^ (1 | 1 << 20 | 1 << 40)
+        self.assertEqual(detector.near_duplicate("b", close), "a")
+        far = fingerprint ^ 0b1111
+        self.assertIsNone(detector.near_duplicate("c", far))
+        self.assertEqual(detector.clusters, {"a": ["a", "b"]})
+
+    def test_clusters_keep_first_copy(self):
+        detector = DuplicateDetector()
+        self.assertIsNone(detector.near_duplicate("a", 0))
+        self.assertEqual(detector.exact_duplicate("b", b"x"), None)
+        self.assertEqual(detector.near_duplicate("b", 1), "a")
+        self.assertEqual(detector.exact_duplicate("c", b"x"), "a")
+        self.assertEqual(detector.clusters, {"a": ["a", "b", "c"]})
+
+    def test_write_duplicate_report(self):
+        detector = DuplicateDetector()
+        _ = detector.exact_duplicate("a", b"x")
+        _ = detector.exact_duplicate("b", b"x")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_duplicate_report(detector, Path(tmp, "duplicates.csv"))
+            with open(path, encoding="utf-8-sig", newline="") as f:
+                rows = list(csv.DictReader(f))
+
+        self.assertEqual(
+            rows,
+            [
+                {"cluster": "0", "page_url": "a", "duplicate_of": ""},
+                {"cluster": "0", "page_url": "b", "duplicate_of": "a"},
+            ],
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
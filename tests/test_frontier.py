@@ -0,0 +1,86 @@
+import unittest
+
+from web_scraper.frontier import CrawlOrder, Frontier
+
+
+class TestFrontier(unittest.TestCase):
+    def test_dedups_normalized_urls(self):
+        frontier = Frontier("https://blog.boot.dev", 10)
+        self.assertTrue(frontier.add("https://blog.boot.dev/path"))
+        self.assertFalse(frontier.add("https://blog.boot.dev/path/"))
+        self.assertFalse(frontier.add("https://blog.boot.dev/path?foo=bar"))
+        self.assertFalse(frontier.add("https://blog.boot.dev/path#section"))
+        self.assertEqual(frontier.queue.qsize(), 1)
+
+    def test_rejects_out_of_scope(self):
+        frontier = Frontier("https://blog.boot.dev", 10)
+        self.assertFalse(frontier.add("https://wikipedia.org/page"))
+        self.assertFalse(frontier.add("mailto:someone@boot.dev"))
+        self.assertEqual(frontier.queue.qsize(), 0)
+
+    def test_bounded_by_max_pages(self):
+        frontier = Frontier("https://blog.boot.dev", 3)
+        links = [f"https://blog.boot.dev/{i}" for i in range(100)]
+        self.assertEqual(frontier.add_all(links), links[:3])
+        self.assertTrue(frontier.full)
+        self.assertEqual(frontier.queue.qsize(), 3)
+        self.assertEqual(frontier.queue.maxsize, 3)
+
+    def test_queue_holds_url_and_normalized(self):
+        frontier = Frontier("https://blog.boot.dev", 10)
+        _ = frontier.add("https://blog.boot.dev/path/")
+        self.assertEqual(frontier.get_nowait()[1], "blog.boot.dev/path")
+
+    def test_mark_seen(self):
+        frontier = Frontier("https://blog.boot.dev", 10)
+        frontier.mark_seen("blog.boot.dev/done")
+        self.assertFalse(frontier.add("https://blog.boot.dev/done"))
+        self.assertEqual(len(frontier.seen), 1)
+
+    def test_max_depth(self):
+        frontier = Frontier("https://blog.boot.dev", 10, max_depth=1)
+        self.assertTrue(frontier.add("https://blog.boot.dev/a", 1))
+        self.assertFalse(frontier.add("https://blog.boot.dev/b", 2))
+        self.assertTrue(frontier.add("https://blog.boot.dev/b", 0))
+
+
+class TestCrawlOrder(unittest.TestCase):
+    def drain(self, frontier: Frontier) -> list[str]:
+        return [frontier.get_nowait().url for _ in range(frontier.queue.qsize())]
+
+    def test_bfs_by_depth_then_fifo(self):
+        frontier = Frontier("https://blog.boot.dev", 10)
+        _ = frontier.add_all(["https://blog.boot.dev/c", "https://blog.boot.dev/d"], 2)
+        _ = frontier.add_all(["https://blog.boot.dev/a", "https://blog.boot.dev/b"], 1)
+        self.assertEqual(
+            self.drain(frontier),
+            [f"https://blog.boot.dev/{c}" for c in "abcd"],
+        )
+
+    def test_shortest_first(self):
+        frontier = Frontier("https://blog.boot.dev", 10, CrawlOrder.SHORTEST)
+        urls = [
+            "https://blog.boot.dev/a/b/c",
+            "https://blog.boot.dev/a",
+            "https://blog.boot.dev/a/b",
+        ]
+        _ = frontier.add_all(urls, 3)
+        self.assertEqual(self.drain(frontier), sorted(urls, key=len))
+
+    def test_sitemap_priority_first(self):
+        frontier = Frontier("https://blog.boot.dev", 10, CrawlOrder.SITEMAP)
+        _ = frontier.add("https://blog.boot.dev/low", 1, 0.1)
+        _ = frontier.add("https://blog.boot.dev/linked", 2)
+        _ = frontier.add("https://blog.boot.dev/high", 1, 1.0)
+        self.assertEqual(
+            self.drain(frontier),
+            [
+                "https://blog.boot.dev/high",
+                "https://blog.boot.dev/linked",
+                "https://blog.boot.dev/low",
+            ],
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,64 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from web_scraper.graph import build_link_graph, load_link_graph, write_link_graph
+from web_scraper.html_parse import PageData
+
+
+def page(*links: str) -> PageData:
+    return {
+        "h1": "",
+        "first_paragraph": "",
+        "outgoing_links": list(links),
+        "image_urls": [],
+    }
+
+
+PAGES: dict[str, PageData | None] = {
+    "blog.boot.dev": page(
+        "https://blog.boot.dev/a",
+        "https://blog.boot.dev/b/",
+        "https://blog.boot.dev/a#top",
+        "https://wikipedia.org/",
+    ),
+    "blog.boot.dev/a": page("https://blog.boot.dev", "https://blog.boot.dev/uncrawled"),
+    "blog.boot.dev/b": page(),
+    "blog.boot.dev/broken": None,
+}
+
+
+class TestLinkGraph(unittest.TestCase):
+    def test_build(self):
+        graph = build_link_graph(PAGES.items())
+        self.assertEqual(
+            graph.urls, ["blog.boot.dev", "blog.boot.dev/a", "blog.boot.dev/b"]
+        )
+        self.assertEqual(list(graph.offsets), [0, 2, 3, 3])
+        self.assertEqual(list(graph.neighbors(0)), [1, 2])
+        self.assertEqual(list(graph.neighbors(1)), [0])
+        self.assertEqual(graph.num_edges, 3)
+
+    def test_write_and_load(self):
+        graph = build_link_graph(PAGES.items())
+        with tempfile.TemporaryDirectory() as tmp:
+            out = write_link_graph(graph, Path(tmp, "graph"))
+            self.assertEqual((out / "offsets.i64").stat().st_size, 4 * 8)
+            self.assertEqual((out / "targets.i32").stat().st_size, 3 * 4)
+
+            loaded = load_link_graph(out)
+            self.assertEqual(loaded.urls, graph.urls)
+            self.assertEqual(list(loaded.offsets), list(graph.offsets))
+            self.assertEqual(list(loaded.targets), list(graph.targets))
+
+    def test_empty_graph(self):
+        graph = build_link_graph([])
+        with tempfile.TemporaryDirectory() as tmp:
+            loaded = load_link_graph(write_link_graph(graph, tmp))
+        self.assertEqual(loaded.num_nodes, 0)
+        self.assertEqual(list(loaded.offsets), [0])
+        self.assertEqual(loaded.num_edges, 0)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,172 @@
+import asyncio
+import csv
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from aiohttp.typedefs import Handler
+
+from web_scraper.crawl import AsyncCrawler, ParseExecutor, crawl_site_async
+from web_scraper.html_parse import PageData
+from web_scraper.images import ImageAuditor, write_image_report
+from web_scraper.scheduler import HostPolicy
+
+SIZES = {"/big.png": 5000, "/small.png": 100, "/no-head.png": 300}
+
+
+def make_app(hits: Counter[tuple[str, str]]) -> web.Application:
+    async def page(request: web.Request) -> web.Response:
+        images = {
+            "/": ["/big.png", "/small.png", "/small.png#x"],
+            "/a": ["/big.png", "/no-head.png", "/missing.png"],
+        }[request.path]
+        html = "<a href='/a'>a</a>" + "".join(f"<img src='{i}'>" for i in images)
+        return web.Response(text=html, content_type="text/html")
+
+    async def image(request: web.Request) -> web.Response:
+        hits[request.method, request.path] += 1
+        size = SIZES.get(request.path)
+        if size is None:
+            raise web.HTTPNotFound()
+        if request.method == "HEAD" and request.path == "/no-head.png":
+            raise web.HTTPMethodNotAllowed("HEAD", ["GET"])
+        headers = {"Cache-Control": "max-age=3600"}
+        if request.headers.get("Range") == "bytes=0-0":
+            headers["Content-Range"] = f"bytes 0-0/{size}"
+            return web.Response(
+                body=b"x", status=206, content_type="image/png", headers=headers
+            )
+        return web.Response(body=b"x" * size, content_type="image/png", headers=headers)
+
+    app = web.Application()
+    _ = app.router.add_get("/{name}.png", image)
+    _ = app.router.add_get("/{tail:.*}", page)
+    return app
+
+
+class TestImageAuditor(unittest.IsolatedAsyncioTestCase):
+    async def test_probes_each_image_once(self):
+        hits: Counter[tuple[str, str]] = Counter()
+        server = TestServer(make_app(hits), host="127.0.0.1")
+        await server.start_server()
+        try:
+            async with ImageAuditor(4) as auditor:
+                _ = await crawl_site_async(
+                    str(server.make_url("/")),
+                    2,
+                    10,
+                    ParseExecutor.INLINE,
+                    sinks=[auditor],
+                )
+                await auditor.join()
+        finally:
+            await server.close()
+
+        self.assertEqual(hits["HEAD", "/big.png"], 1)
+        self.assertEqual(hits["HEAD", "/small.png"], 1)
+        self.assertEqual(hits["GET", "/big.png"], 0)
+        self.assertEqual(hits["GET", "/no-head.png"], 1)
+
+        infos = {info.url.rpartition("/")[2]: info for info in auditor.heaviest()}
+        self.assertEqual(infos["big.png"].size, 5000)
+        self.assertEqual(infos["big.png"].content_type, "image/png")
+        self.assertEqual(infos["big.png"].cache_control, "max-age=3600")
+        self.assertEqual(infos["no-head.png"].size, 300)
+        self.assertEqual(infos["missing.png"].status, 404)
+        self.assertEqual([info.size for info in auditor.heaviest(3)], [5000, 300, 100])
+
+        weights = {weight.url: weight for weight in auditor.page_weights()}
+        self.assertEqual(weights["127.0.0.1"].images, 2)
+        self.assertEqual(weights["127.0.0.1"].image_bytes, 5100)
+        self.assertEqual(weights["127.0.0.1/a"].image_bytes, 5300)
+        self.assertEqual(weights["127.0.0.1/a"].unknown_sizes, 1)
+
+    async def test_shares_crawler_host_limits(self):
+        hits: Counter[tuple[str, str]] = Counter()
+        app = make_app(hits)
+        in_flight: Counter[str] = Counter()
+
+        @web.middleware
+        async def track(request: web.Request, handler: Handler) -> web.StreamResponse:
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            try:
+                await asyncio.sleep(0.01)
+                return await handler(request)
+            finally:
+                in_flight["now"] -= 1
+
+        app.middlewares.append(track)
+        server = TestServer(app, host="127.0.0.1")
+        await server.start_server()
+        try:
+            async with AsyncCrawler(
+                str(server.make_url("/")),
+                4,
+                10,
+                ParseExecutor.INLINE,
+                HostPolicy(max_connections=1),
+            ) as crawler:
+                async with ImageAuditor(
+                    4, scheduler=crawler.scheduler, session=crawler.session
+                ) as auditor:
+                    crawler.sinks = [auditor]
+                    _ = await crawler.crawl()
+                    await auditor.join()
+                assert crawler.session is not None
+                self.assertFalse(crawler.session.closed)
+        finally:
+            await server.close()
+
+        self.assertEqual(len(auditor.results), 4)
+        self.assertEqual(in_flight["peak"], 1)
+
+    async def test_write_from_other_thread(self):
+        page: PageData = {
+            "h1": "",
+            "first_paragraph": "",
+            "outgoing_links": [],
+            "image_urls": ["ftp://example.com/x.png", "data:image/png;base64,AA"],
+        }
+        async with ImageAuditor() as auditor:
+            await asyncio.to_thread(auditor.write, "example.com", page)
+            await auditor.join()
+        self.assertEqual(auditor.pages, {"example.com": []})
+
+    async def test_report(self):
+        hits: Counter[tuple[str, str]] = Counter()
+        server = TestServer(make_app(hits), host="127.0.0.1")
+        await server.start_server()
+        try:
+            async with ImageAuditor() as auditor:
+                _ = await crawl_site_async(
+                    str(server.make_url("/")),
+                    2,
+                    10,
+                    ParseExecutor.INLINE,
+                    sinks=[auditor],
+                )
+                await auditor.join()
+        finally:
+            await server.close()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            weight_path, images_path = write_image_report(auditor, tmp)
+            with open(weight_path, encoding="utf-8-sig", newline="") as f:
+                weights = list(csv.DictReader(f))
+            with open(images_path, encoding="utf-8-sig", newline="") as f:
+                images = list(csv.DictReader(f))
+
+        self.assertEqual(weights[0]["page_url"], "127.0.0.1/a")
+        self.assertEqual(weights[0]["image_bytes"], "5300")
+        self.assertEqual(Path(images[0]["image_url"]).name, "big.png")
+        self.assertEqual(images[0]["pages"], "2")
+        self.assertEqual(images[-1]["error"], "")
+        self.assertEqual(images[-1]["status"], "404")
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
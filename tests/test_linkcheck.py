@@ -0,0 +1,180 @@
+import asyncio
+import csv
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+from aiohttp import web
+
+from tests.helpers import serve
+from web_scraper.crawl import ParseExecutor, crawl_site_async
+from web_scraper.html_parse import PageData
+from web_scraper.linkcheck import LinkChecker, LinkStatus, write_link_check_report
+from web_scraper.retry import RetryPolicy
+from web_scraper.scheduler import HostPolicy
+
+
+def external_app(hits: Counter[tuple[str, str]]) -> web.Application:
+    async def handler(request: web.Request) -> web.Response:
+        hits[request.method, request.path] += 1
+        match request.path:
+            case "/ok":
+                return web.Response(text="ok")
+            case "/moved":
+                raise web.HTTPMovedPermanently("/ok")
+            case "/loop":
+                raise web.HTTPFound("/loop")
+            case "/no-head" if request.method == "HEAD":
+                raise web.HTTPMethodNotAllowed("HEAD", ["GET"])
+            case "/no-head":
+                return web.Response(text="ok")
+            case _:
+                raise web.HTTPNotFound()
+
+    app = web.Application()
+    _ = app.router.add_route("*", "/{tail:.*}", handler)
+    return app
+
+
+def site_app(external: str) -> web.Application:
+    links = "".join(
+        f"<a href='{external}{path}'>x</a>"
+        for path in ("ok", "ok#top", "moved", "gone", "loop", "no-head")
+    )
+    site = {
+        "/": links + "<a href='/a'>a</a><a href='/missing'>missing</a>",
+        "/a": links + "<a href='/missing'>missing</a><a href='mailto:x@y.z'>m</a>",
+    }
+
+    async def handler(request: web.Request) -> web.Response:
+        html = site.get(request.path)
+        if html is None:
+            raise web.HTTPNotFound()
+        return web.Response(text=html, content_type="text/html")
+
+    app = web.Application()
+    _ = app.router.add_get("/{tail:.*}", handler)
+    return app
+
+
+class TestLinkChecker(unittest.IsolatedAsyncioTestCase):
+    async def test_checks_links_once(self):
+        hits: Counter[tuple[str, str]] = Counter()
+        async with serve(external_app(hits)) as external:
+            async with serve(site_app(external)) as base_url:
+                checker = LinkChecker(base_url)
+                _ = await crawl_site_async(
+                    base_url, 2, 10, ParseExecutor.INLINE, sinks=[checker]
+                )
+                results = await checker.check(retry=RetryPolicy(max_retries=0))
+                again = await asyncio.wait_for(checker.check(), timeout=1)
+
+        self.assertEqual(results, again)
+        self.assertEqual(hits["HEAD", "/gone"], 1)
+        self.assertEqual(hits["GET", "/gone"], 0)
+        self.assertEqual(hits["HEAD", "/ok"], 2)  # once itself, once via /moved
+        self.assertEqual(hits["GET", "/no-head"], 1)
+
+        self.assertEqual(results[external + "ok"].status, 200)
+        self.assertNotIn(external + "ok#top", results)
+        moved = results[external + "moved"]
+        self.assertEqual(moved.status, 200)
+        self.assertEqual(moved.redirects, (external + "moved", external + "ok"))
+        self.assertEqual(results[external + "no-head"].status, 200)
+        self.assertEqual(results[external + "loop"].error, "too many redirects")
+
+        broken = {status.url: status for status in checker.broken()}
+        self.assertEqual(
+            sorted(broken), ["127.0.0.1/missing", external + "gone", external + "loop"]
+        )
+        self.assertEqual(broken["127.0.0.1/missing"].status, 404)
+        self.assertEqual(
+            checker.referrers("127.0.0.1/missing"), ["127.0.0.1", "127.0.0.1/a"]
+        )
+
+    async def test_report(self):
+        hits: Counter[tuple[str, str]] = Counter()
+        async with serve(external_app(hits)) as external:
+            async with serve(site_app(external)) as base_url:
+                checker = LinkChecker(base_url)
+                _ = await crawl_site_async(
+                    base_url, 2, 10, ParseExecutor.INLINE, sinks=[checker]
+                )
+                _ = await checker.check()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_link_check_report(checker, Path(tmp, "link_check.csv"))
+            with open(path, encoding="utf-8-sig", newline="") as f:
+                rows = {row["link_url"]: row for row in csv.DictReader(f)}
+
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows["127.0.0.1/missing"]["internal"], "True")
+        self.assertEqual(rows["127.0.0.1/missing"]["error"], "HTTP 404")
+        gone = rows[external + "gone"]
+        self.assertEqual(gone["status"], "404")
+        self.assertEqual(gone["broken"], "True")
+        self.assertEqual(gone["referring_pages"], "127.0.0.1;127.0.0.1/a")
+        self.assertEqual(
+            rows[external + "moved"]["redirect_chain"],
+            f"{external}moved -> {external}ok",
+        )
+
+    async def test_reachable_non_html_target_is_not_broken(self):
+        async def handler(request: web.Request) -> web.Response:
+            match request.path:
+                case "/":
+                    html = "<a href='/doc.pdf'>doc</a><a href='/missing'>gone</a>"
+                    return web.Response(text=html, content_type="text/html")
+                case "/doc.pdf":
+                    return web.Response(
+                        body=b"%PDF-1.7", content_type="application/pdf"
+                    )
+                case _:
+                    raise web.HTTPNotFound()
+
+        app = web.Application()
+        _ = app.router.add_get("/{tail:.*}", handler)
+        async with serve(app) as base_url:
+            checker = LinkChecker(base_url)
+            _ = await crawl_site_async(
+                base_url, 2, 10, ParseExecutor.INLINE, sinks=[checker]
+            )
+
+        self.assertIn("127.0.0.1/doc.pdf", checker.internal)
+        self.assertEqual(
+            [status.url for status in checker.broken()], ["127.0.0.1/missing"]
+        )
+
+    async def test_waits_for_open_circuit_breaker(self):
+        async def handler(request: web.Request) -> web.Response:
+            if request.path == "/down":
+                raise web.HTTPServiceUnavailable()
+            return web.Response(text="ok")
+
+        app = web.Application()
+        _ = app.router.add_route("*", "/{tail:.*}", handler)
+        # the 503 opens the breaker, so /ok is first refused without a request
+        policy = HostPolicy(breaker_threshold=1, breaker_cooldown=0.2)
+        retry = RetryPolicy(max_retries=0)
+        async with serve(app) as external:
+            statuses: list[LinkStatus] = []
+            for deadline in (None, 0.0):
+                checker = LinkChecker("http://site.invalid/")
+                page: PageData = {
+                    "h1": "",
+                    "first_paragraph": "",
+                    "outgoing_links": [external + "down", external + "ok"],
+                    "image_urls": [],
+                }
+                checker.write("site.invalid", page)
+                results = await checker.check(1, policy, retry=retry, deadline=deadline)
+                statuses.append(results[external + "ok"])
+
+        self.assertEqual(statuses[0].status, 200)
+        self.assertIsNone(statuses[1].status)
+        self.assertIn("circuit breaker open", statuses[1].error or "")
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
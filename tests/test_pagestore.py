@@ -0,0 +1,58 @@
+import unittest
+
+from web_scraper.html_parse import PageData
+from web_scraper.pagestore import PageStore
+
+NAV = ["https://blog.boot.dev/", "https://blog.boot.dev/about"]
+
+
+def make_page(n: int) -> PageData:
+    return {
+        "h1": f"Post {n}",
+        "first_paragraph": "Boot.dev blog.",
+        "outgoing_links": [*NAV, f"https://blog.boot.dev/{n}"],
+        "image_urls": [f"https://blog.boot.dev/{n}.png"],
+    }
+
+
+class TestPageStore(unittest.TestCase):
+    def test_round_trips_page_data(self):
+        store = PageStore()
+        pages = {f"blog.boot.dev/{n}": make_page(n) for n in range(3)}
+        canonical = make_page(3)
+        canonical["canonical_url"] = "https://blog.boot.dev/0"
+        pages["blog.boot.dev/3"] = canonical
+        for url, page in pages.items():
+            store.add(url, page)
+
+        self.assertEqual(store, pages)
+        self.assertEqual(dict(store), pages)
+        self.assertEqual(list(store), list(pages))
+        self.assertIn("blog.boot.dev/3", store)
+        self.assertNotIn("https://blog.boot.dev/", store)
+
+    def test_urls_and_link_lists_are_shared(self):
+        store = PageStore()
+        for n in range(3):
+            page = make_page(n)
+            page["outgoing_links"] = list(NAV)
+            store.add(f"blog.boot.dev/{n}", page)
+
+        compact = [store.compact(f"blog.boot.dev/{n}") for n in range(3)]
+        self.assertIs(compact[0].links, compact[2].links)
+        self.assertIs(compact[0].first_paragraph, compact[1].first_paragraph)
+        self.assertEqual(len(store.urls), 3 + len(NAV) + 3)
+
+    def test_failures_are_not_pages(self):
+        store = PageStore()
+        store.add("blog.boot.dev", make_page(0))
+        store.add("blog.boot.dev/gone", None)
+
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.failed, {store.urls.ids["blog.boot.dev/gone"]})
+        with self.assertRaises(KeyError):
+            _ = store["blog.boot.dev/gone"]
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
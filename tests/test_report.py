@@ -0,0 +1,71 @@
+import csv
+import gzip
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from web_scraper.html_parse import PageData
+from web_scraper.report import ReportFormat, ReportWriter, report_filename
+
+PAGE: PageData = {
+    "h1": "Title",
+    "first_paragraph": "Paragraph.",
+    "outgoing_links": ["https://blog.boot.dev/a", "https://blog.boot.dev/b"],
+    "image_urls": ["https://blog.boot.dev/logo.png"],
+}
+
+
+class TestReportWriter(unittest.TestCase):
+    def test_csv(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "report.csv")
+            with ReportWriter(path) as report:
+                report.write("blog.boot.dev", PAGE)
+
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["page_url"], "blog.boot.dev")
+        self.assertEqual(
+            rows[0]["outgoing_link_urls"],
+            "https://blog.boot.dev/a;https://blog.boot.dev/b",
+        )
+
+    def test_failures_record_reason(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "report.csv")
+            with ReportWriter(path) as report:
+                report.write("blog.boot.dev", PAGE)
+                report.write_failure("blog.boot.dev/gone", "HTTP 404")
+
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(rows[0]["error"], "")
+        self.assertEqual(rows[1]["page_url"], "blog.boot.dev/gone")
+        self.assertEqual(rows[1]["error"], "HTTP 404")
+        self.assertEqual(rows[1]["h1"], "")
+
+    def test_ndjson_gzip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, report_filename(ReportFormat.NDJSON, compress=True))
+            with ReportWriter(path, ReportFormat.NDJSON, compress=True) as report:
+                report.write("blog.boot.dev", PAGE)
+                report.write("blog.boot.dev/a", PAGE)
+
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                rows = [json.loads(line) for line in f]
+        self.assertEqual(path.name, "report.ndjson.gz")
+        self.assertEqual(rows[1], {"page_url": "blog.boot.dev/a", **PAGE})
+
+    def test_flushed_rows_are_readable_before_close(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "report.ndjson")
+            with ReportWriter(path, ReportFormat.NDJSON, flush_interval=0) as report:
+                report.write("blog.boot.dev", PAGE)
+                with open(path, encoding="utf-8") as f:
+                    self.assertEqual(len(f.readlines()), 1)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
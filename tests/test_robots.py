@@ -0,0 +1,70 @@
+import unittest
+
+from web_scraper.robots import RobotsRules, parse_robots, robots_url
+
+ROBOTS = """
+User-agent: *
+Disallow: /private/
+Allow: /private/public$
+
+# comments and unknown lines are ignored
+User-agent: BootCrawler
+User-agent: OtherBot
+Disallow: /*.pdf$
+Disallow: /search
+Allow: /search/about
+Crawl-delay: 5
+
+Sitemap: https://example.com/sitemap.xml
+"""
+
+
+class TestRobotsRules(unittest.TestCase):
+    def test_longest_match_wins(self):
+        rules = RobotsRules([(False, "/a"), (True, "/a/b"), (False, "/a/b/c")])
+        self.assertFalse(rules.allowed("https://example.com/a"))
+        self.assertTrue(rules.allowed("https://example.com/a/b"))
+        self.assertFalse(rules.allowed("https://example.com/a/b/c/d"))
+        self.assertTrue(rules.allowed("https://example.com/other"))
+
+    def test_allow_wins_tie(self):
+        rules = RobotsRules([(False, "/page"), (True, "/page")])
+        self.assertTrue(rules.allowed("https://example.com/page"))
+
+    def test_wildcards_and_anchor(self):
+        rules = RobotsRules([(False, "/*.pdf$"), (False, "/*?sort=")])
+        self.assertFalse(rules.allowed("https://example.com/docs/a.pdf"))
+        self.assertTrue(rules.allowed("https://example.com/docs/a.pdf.html"))
+        self.assertFalse(rules.allowed("https://example.com/list?sort=asc"))
+        self.assertTrue(rules.allowed("https://example.com/list?page=2"))
+
+    def test_empty_rules(self):
+        self.assertTrue(RobotsRules([(False, "")]).allowed("https://example.com/"))
+        self.assertFalse(RobotsRules.disallow_all().allowed("https://example.com/"))
+
+
+class TestParseRobots(unittest.TestCase):
+    def test_selects_our_group(self):
+        rules = parse_robots(ROBOTS, "BootCrawler/1.0")
+        self.assertTrue(rules.allowed("https://example.com/private/x"))
+        self.assertFalse(rules.allowed("https://example.com/file.pdf"))
+        self.assertFalse(rules.allowed("https://example.com/search?q=1"))
+        self.assertTrue(rules.allowed("https://example.com/search/about"))
+        self.assertEqual(rules.sitemaps, ["https://example.com/sitemap.xml"])
+
+    def test_falls_back_to_wildcard_group(self):
+        rules = parse_robots(ROBOTS, "SomeoneElse/2.0")
+        self.assertFalse(rules.allowed("https://example.com/private/x"))
+        self.assertTrue(rules.allowed("https://example.com/private/public"))
+        self.assertFalse(rules.allowed("https://example.com/private/public/x"))
+        self.assertTrue(rules.allowed("https://example.com/file.pdf"))
+
+    def test_robots_url(self):
+        self.assertEqual(
+            robots_url("https://blog.boot.dev/posts/1?x=y"),
+            "https://blog.boot.dev/robots.txt",
+        )
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
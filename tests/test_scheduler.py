@@ -0,0 +1,117 @@
+import asyncio
+import unittest
+
+from web_scraper.scheduler import HostPolicy, HostScheduler, HostUnavailable
+
+URL = "https://blog.boot.dev/page"
+
+
+class TestHostScheduler(unittest.IsolatedAsyncioTestCase):
+    async def test_limits_concurrency_per_host(self):
+        scheduler = HostScheduler(HostPolicy(initial_connections=2, max_connections=2))
+        active = 0
+        peak = 0
+
+        async def request():
+            nonlocal active, peak
+            async with scheduler.slot(URL) as slot:
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+                slot.observe(200)
+
+        _ = await asyncio.gather(*(request() for _ in range(6)))
+        self.assertEqual(peak, 2)
+
+    async def test_other_hosts_are_independent(self):
+        scheduler = HostScheduler(HostPolicy(initial_connections=1, max_connections=1))
+        async with scheduler.slot(URL):
+            async with asyncio.timeout(1):
+                async with scheduler.slot("https://example.com/"):
+                    pass
+
+    async def test_additive_increase(self):
+        scheduler = HostScheduler(HostPolicy(initial_connections=1, max_connections=4))
+        for _ in range(20):
+            async with scheduler.slot(URL) as slot:
+                slot.observe(200)
+        self.assertEqual(scheduler.limit("blog.boot.dev"), 4)
+
+    async def test_multiplicative_decrease_once_per_round(self):
+        scheduler = HostScheduler(HostPolicy(initial_connections=8, max_connections=8))
+
+        async def throttled():
+            async with scheduler.slot(URL) as slot:
+                await asyncio.sleep(0.01)
+                slot.observe(429)
+
+        _ = await asyncio.gather(*(throttled() for _ in range(8)))
+        self.assertEqual(scheduler.limit("blog.boot.dev"), 4)
+
+    async def test_transport_error_backs_off(self):
+        scheduler = HostScheduler(HostPolicy(initial_connections=4))
+        with self.assertRaises(ConnectionError):
+            async with scheduler.slot(URL):
+                raise ConnectionError()
+        self.assertEqual(scheduler.limit("blog.boot.dev"), 2)
+
+    async def test_honours_retry_after(self):
+        scheduler = HostScheduler()
+        async with scheduler.slot(URL) as slot:
+            slot.observe(429, "1")
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        async with scheduler.slot(URL):
+            pass
+        self.assertGreaterEqual(loop.time() - start, 0.9)
+
+    async def test_paces_requests(self):
+        scheduler = HostScheduler(HostPolicy(requests_per_second=20))
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(5):
+            async with scheduler.slot(URL) as slot:
+                slot.observe(200)
+        self.assertGreaterEqual(loop.time() - start, 0.19)
+
+    async def test_breaker_opens_after_consecutive_failures(self):
+        policy = HostPolicy(breaker_threshold=3, breaker_cooldown=0.1)
+        scheduler = HostScheduler(policy)
+        for _ in range(3):
+            async with scheduler.slot(URL) as slot:
+                slot.observe(503)
+
+        with self.assertRaises(HostUnavailable):
+            async with scheduler.slot(URL):
+                pass
+        async with scheduler.slot("https://example.com/"):
+            pass
+
+        await asyncio.sleep(0.1)
+        async with scheduler.slot(URL) as slot:
+            slot.observe(200)
+        for _ in range(2):
+            async with scheduler.slot(URL) as slot:
+                slot.observe(503)
+        async with scheduler.slot(URL) as slot:
+            slot.observe(200)
+
+    async def test_breaker_reopens_after_failed_probe(self):
+        policy = HostPolicy(breaker_threshold=2, breaker_cooldown=0.05)
+        scheduler = HostScheduler(policy)
+        for _ in range(2):
+            async with scheduler.slot(URL) as slot:
+                slot.observe(500)
+
+        await asyncio.sleep(0.05)
+        async with scheduler.slot(URL) as slot:
+            slot.observe(500)
+        with self.assertRaises(HostUnavailable):
+            async with scheduler.slot(URL):
+                pass
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
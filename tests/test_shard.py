@@ -0,0 +1,78 @@
+import asyncio
+import multiprocessing
+import unittest
+from collections import Counter
+
+from web_scraper.bench import SiteConfig, SiteServer, is_error_page
+from web_scraper.crawl import ParseExecutor, crawl_site_async
+from web_scraper.html_parse import PageData
+from web_scraper.shard import CrawlBudget, ShardCrawler, crawl_sharded, shard_of
+from web_scraper.stats import CrawlStats
+from web_scraper.visited import BloomFilter, VisitedMode
+
+
+class RecordingSink:
+    def __init__(self) -> None:
+        self.urls: Counter[str] = Counter()
+        self.pages: dict[str, PageData] = {}
+
+    def write(self, url: str, page: PageData) -> None:
+        self.urls[url] += 1
+        self.pages[url] = page
+
+
+class TestShardOf(unittest.TestCase):
+    def test_stable_and_in_range(self):
+        urls = [f"http://example.com/p/{i}" for i in range(200)]
+        owners = [shard_of(url, 4) for url in urls]
+        self.assertEqual(owners, [shard_of(url, 4) for url in urls])
+        self.assertEqual(set(owners), {0, 1, 2, 3})
+        self.assertEqual({shard_of(url, 1) for url in urls}, {0})
+
+
+class TestCrawlSharded(unittest.TestCase):
+    site: SiteConfig = SiteConfig(
+        pages=60, links_per_page=4, page_size=2000, latency=0.001, error_rate=0.1
+    )
+
+    def test_matches_single_process_crawl(self):
+        with SiteServer(self.site) as url:
+            expected = asyncio.run(
+                crawl_site_async(url, 4, self.site.pages, ParseExecutor.INLINE)
+            )
+            sink = RecordingSink()
+            stats = CrawlStats()
+            pages = crawl_sharded(url, 3, 6, self.site.pages, sinks=[sink], stats=stats)
+
+        errors = sum(is_error_page(self.site, page) for page in range(self.site.pages))
+        self.assertEqual(len(pages), self.site.pages - errors)
+        self.assertEqual(pages, expected)
+        self.assertEqual(sink.pages, pages)
+        self.assertEqual(max(sink.urls.values()), 1)
+        self.assertEqual(stats.pages, len(pages))
+        self.assertEqual(stats.failures, errors)
+
+    def test_max_pages_is_global(self):
+        with SiteServer(self.site) as url:
+            stats = CrawlStats()
+            pages = crawl_sharded(url, 3, 6, 10, stats=stats)
+
+        self.assertLessEqual(len(pages), 10)
+        self.assertEqual(stats.pages + stats.failures, 10)
+
+    def test_visited_mode(self):
+        with SiteServer(self.site) as url:
+            expected = crawl_sharded(url, 2, 4, self.site.pages)
+            pages = crawl_sharded(url, 2, 4, self.site.pages, visited=VisitedMode.SET)
+        self.assertEqual(pages, expected)
+
+        ctx = multiprocessing.get_context("spawn")
+        crawler = ShardCrawler(
+            0, url, 2, CrawlBudget(ctx, 10), [], ctx.Queue(), visited=VisitedMode.BLOOM
+        )
+        self.assertIsInstance(crawler.routed, BloomFilter)
+        self.assertIsInstance(crawler.frontier.seen, BloomFilter)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
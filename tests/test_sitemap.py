@@ -0,0 +1,61 @@
+import gzip
+import unittest
+
+from web_scraper.sitemap import SitemapParser, SitemapUrl
+
+URLSET = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc> https://example.com/a </loc><priority>0.8</priority></url>
+  <url><loc>https://example.com/b</loc><priority>high</priority></url>
+  <url><priority>0.5</priority></url>
+</urlset>
+"""
+
+INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/s1.xml.gz</loc></sitemap>
+  <sitemap><loc>https://example.com/s2.xml</loc></sitemap>
+</sitemapindex>
+"""
+
+EXPECTED = [
+    SitemapUrl("https://example.com/a", 0.8),
+    SitemapUrl("https://example.com/b", None),
+]
+
+
+def parse(body: bytes, chunk_size: int = 7, max_bytes: int = 2**20) -> SitemapParser:
+    parser = SitemapParser(max_bytes)
+    for i in range(0, len(body), chunk_size):
+        parser.feed(body[i : i + chunk_size])
+    parser.close()
+    return parser
+
+
+class TestSitemapParser(unittest.TestCase):
+    def test_urlset(self):
+        parser = parse(URLSET)
+        self.assertEqual(parser.urls, EXPECTED)
+        self.assertEqual(parser.sitemaps, [])
+
+    def test_index(self):
+        parser = parse(INDEX)
+        self.assertEqual(parser.urls, [])
+        self.assertEqual(
+            parser.sitemaps,
+            ["https://example.com/s1.xml.gz", "https://example.com/s2.xml"],
+        )
+
+    def test_gzipped(self):
+        self.assertEqual(parse(gzip.compress(URLSET)).urls, EXPECTED)
+
+    def test_size_cap(self):
+        body = b"<urlset>" + b"<url><loc>https://example.com/p</loc></url>" * 10000
+        parser = parse(gzip.compress(body), chunk_size=4096, max_bytes=1000)
+        self.assertTrue(parser.full)
+        self.assertEqual(parser.size, 1000)
+        self.assertLess(len(parser.urls), 30)
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
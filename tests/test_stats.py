@@ -0,0 +1,49 @@
+import unittest
+
+from web_scraper.stats import CrawlStats, Histogram
+
+
+class TestHistogram(unittest.TestCase):
+    def test_quantiles(self):
+        hist = Histogram()
+        for ms in range(1, 1001):
+            hist.record(ms / 1000)
+
+        self.assertEqual(hist.count, 1000)
+        self.assertAlmostEqual(hist.total, 500.5)
+        self.assertAlmostEqual(hist.quantile(0.5), 0.5, delta=0.5 * 0.03)
+        self.assertAlmostEqual(hist.quantile(0.99), 0.99, delta=0.99 * 0.03)
+        self.assertEqual(hist.quantile(0.0), 0.001)
+        self.assertEqual(hist.quantile(1.0), 1.0)
+
+    def test_zero_and_empty(self):
+        hist = Histogram()
+        self.assertEqual(hist.quantile(0.5), 0.0)
+        self.assertEqual(hist.summary(), {"count": 0})
+
+        hist.record(0.0)
+        hist.record(-1.0)
+        self.assertEqual(hist.quantile(0.99), 0.0)
+        self.assertEqual(hist.summary()["max"], 0.0)
+
+
+class TestCrawlStats(unittest.TestCase):
+    def test_snapshot_and_summary(self):
+        stats = CrawlStats()
+        stats.pages = 3
+        stats.counters["queued"] = 5
+        stats.status_codes[200] += 3
+        stats.record("page", 0.25)
+
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot["pages"], 3)
+        self.assertEqual(snapshot["queued"], 5)
+        self.assertEqual(snapshot["p50_page"], 0.25)
+
+        summary = stats.summary()
+        self.assertEqual(summary["status_codes"], {"200": 3})
+        self.assertEqual(summary["counters"], {"queued": 5})
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
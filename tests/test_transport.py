@@ -0,0 +1,34 @@
+import unittest
+
+from web_scraper.transport import TransportConfig, accept_encoding
+
+
+class TestTransportConfig(unittest.TestCase):
+    def test_timeouts(self):
+        timeout = TransportConfig(read_timeout=0).timeout()
+        self.assertEqual(timeout.total, 60.0)
+        self.assertEqual(timeout.connect, 10.0)
+        self.assertIsNone(timeout.sock_read)
+
+    def test_accept_encoding(self):
+        self.assertEqual(accept_encoding(False), "identity")
+        self.assertIn("gzip", accept_encoding(True))
+        self.assertEqual(
+            TransportConfig(compression=False).headers(),
+            {"Accept-Encoding": "identity"},
+        )
+
+
+class TestConnector(unittest.IsolatedAsyncioTestCase):
+    async def test_connector_limits(self):
+        connector = TransportConfig(limit=7, limit_per_host=3, dns_ttl=0).connector()
+        try:
+            self.assertEqual(connector.limit, 7)
+            self.assertEqual(connector.limit_per_host, 3)
+            self.assertFalse(connector.use_dns_cache)
+        finally:
+            await connector.close()
+
+
+if __name__ == "__main__":
+    _ = unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from web_scraper.frontier import Frontier
+from web_scraper.visited import (
+    BloomFilter,
+    FingerprintSet,
+    VisitedMode,
+    make_visited_set,
+)
+
+
+class TestFingerprintSet(unittest.TestCase):
+    def test_add_and_contains_across_growth(self):
+        visited = FingerprintSet()
+        urls = [f"blog.boot.dev/{i}" for i in range(5000)]
+        for url in urls:
+            visited.add(url)
+        visited.add(urls[0])
+
+        self.assertEqual(len(visited), 5000)
+        self.assertTrue(all(url in visited for url in urls))
+        self.assertFalse(any(f"other.dev/{i}" in visited for i in range(5000)))
+        self.assertNotIn(42, visited)
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        visited = BloomFilter(10000, 0.01)
+        for i in range(10000):
+            visited.add(f"blog.boot.dev/{i}")
+
+        # keys whose bits were all set already are not counted
+        self.assertGreater(len(visited), 9800)
+        self.assertTrue(all(f"blog.boot.dev/{i}" in visited for i in range(10000)))
+        false_positives = sum(f"other.dev/{i}" in visited for i in range(10000))
+        self.assertLess(false_positives, 200)
+        self.assertAlmostEqual(visited.false_positive_rate(), 0.01, delta=0.002)
+
+
+class TestFrontierVisited(unittest.TestCase):
+    def test_modes_dedup_alike(self):
+        links = [f"https://blog.boot.dev/{i % 50}/" for i in range(200)]
+        for mode in VisitedMode:
+            frontier = Frontier("https://blog.boot.dev", 100, visited=mode)
+            self.assertEqual(len(frontier.add_all(links)), 50, mode)
+            self.assertEqual(len(frontier.seen), 50)
+            self.assertIsInstance(make_visited_set(mode, 10), type(frontier.seen))
+
+
+if __name__ == "__main__":
+    _ = unittest.main()